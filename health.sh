@@ -6,8 +6,8 @@ python3 - <<'PY'
 import sys
 print("[ok] python:", sys.version)
 try:
-    import httpx, bs4, lxml, tldextract, readability
-    print("[ok] deps: httpx, bs4, lxml, tldextract, readability")
+    import httpx, lxml, tldextract
+    print("[ok] deps: httpx, lxml, tldextract")
 except Exception as e:
     print("[err] deps:", e); raise
 try:
@@ -0,0 +1,33 @@
+"""
+python -m pipeline [run|serve]
+
+  run    one pass over sources/incoming.ndjson (the cron entry point; default)
+  serve  long-running daemon that syncs new lines as they arrive (pipeline.serve)
+"""
+import argparse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m pipeline", description="Normalize, archive and sync jobs.")
+    sub = ap.add_subparsers(dest="command")
+    run = sub.add_parser("run", help="One pass over sources/incoming.ndjson (default).")
+    run.add_argument("--workers", type=int, default=1, help="Normalize on N processes (default 1).")
+    srv = sub.add_parser("serve", help="Watch the sources and sync new rows continuously.")
+    srv.add_argument("--incoming", default="sources/incoming.ndjson", help="NDJSON file to tail.")
+    srv.add_argument("--spool", default="sources/spool", help="Directory of *.ndjson files to consume.")
+    srv.add_argument("--no-enrich", action="store_true", help="Skip company vibe enrichment.")
+    srv.add_argument("--queue-size", type=int, default=10000, help="Bound of each stage queue.")
+    args = ap.parse_args(argv)
+
+    # imported here so `--help` and the other command stay cheap
+    if args.command == "serve":
+        from .serve import serve
+        serve(incoming=args.incoming, spool=args.spool, enrich=not args.no_enrich,
+              queue_size=max(1, args.queue_size))
+    else:
+        from .main import run as run_once
+        run_once(workers=max(1, getattr(args, "workers", 1)))
+
+
+if __name__ == "__main__":
+    main()
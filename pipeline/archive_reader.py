@@ -0,0 +1,303 @@
+"""
+Point lookups and company slices over the NDJSON archive without scanning it.
+
+    with ArchiveReader() as archive:          # indexes new/changed day files
+        row = archive.get("job-123")
+        rows = archive.get_many(ids)
+        for row in archive.company("acme", since="2026-10-18"):
+            ...
+
+A line-offset index in data/state/archive_index.sqlite maps every
+external_id to (day file, byte offset, length), and a posting list keyed by
+normalized company (with first_seen) lists the lines of each company. A
+lookup reads just those lines out of the mmapped day file and decodes them;
+.gz/.zst days are read forward to each hit instead.
+
+The archive is only ever appended to, blanked in place by the dedupe index
+or compacted (which shrinks the file), so refresh() indexes just the bytes
+added since the last pass and re-indexes a file from the top when it
+shrank. A job archived on several days resolves to its latest line; an entry
+whose line was since blanked is skipped on read. Rows come back as archived:
+the dedupe index, not the line, has the authoritative last_seen.
+
+    python -m pipeline.archive_reader job-123 job-456
+    python -m pipeline.archive_reader --company acme --since 2026-10-01
+"""
+import mmap
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .codec import BUF, get_codec, open_read
+from .io_utils import ARCHIVE_ROOT, day_files
+
+INDEX_PATH = Path("data/state/archive_index.sqlite")
+BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    indexed     INTEGER NOT NULL   -- bytes indexed: the end of the last complete line
+);
+CREATE TABLE IF NOT EXISTS companies (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE   -- normalized: lower case, single spaces
+);
+CREATE TABLE IF NOT EXISTS lines (
+    external_id TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    pos         INTEGER NOT NULL,
+    length      INTEGER NOT NULL,
+    company_id  INTEGER,
+    first_seen  TEXT
+);
+CREATE INDEX IF NOT EXISTS lines_company ON lines(company_id, first_seen);
+CREATE INDEX IF NOT EXISTS lines_path ON lines(path);
+"""
+
+# a later line (later day file, or further into the same one) wins
+_UPSERT = """
+INSERT INTO lines(external_id, path, pos, length, company_id, first_seen) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(external_id) DO UPDATE SET
+    path = excluded.path, pos = excluded.pos, length = excluded.length,
+    company_id = excluded.company_id, first_seen = excluded.first_seen
+WHERE (excluded.path, excluded.pos) >= (lines.path, lines.pos)
+"""
+
+def norm_company(name: str) -> str:
+    return re.sub(r"\s+", " ", name or "").strip().lower()
+
+
+def _lines(f, start: int) -> Iterator[Tuple[int, bytes]]:
+    """(offset, line without newline) for each complete line from `start`."""
+    pos = start
+    for lines in iter(lambda: f.readlines(BUF), []):
+        for raw in lines:
+            if not raw.endswith(b"\n"):
+                return  # torn last line; picked up once it is completed
+            yield pos, raw[:-1]
+            pos += len(raw)
+
+
+class ArchiveReader:
+    def __init__(self, root: Path = ARCHIVE_ROOT, path: Path = INDEX_PATH, refresh: bool = True):
+        self.root = Path(root)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(_SCHEMA)
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._companies: Dict[str, int] = dict(self.db.execute("SELECT name, id FROM companies"))
+        if refresh:
+            self.refresh()
+
+    def close(self):
+        for m in self._maps.values():
+            m.close()
+        self._maps.clear()
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+
+    # ---- indexing ---------------------------------------------------------------
+
+    def _company_id(self, name) -> Optional[int]:
+        key = norm_company(name) if isinstance(name, str) else ""
+        if not key:
+            return None
+        cid = self._companies.get(key)
+        if cid is None:
+            cid = self.db.execute("INSERT INTO companies(name) VALUES (?)", (key,)).lastrowid
+            self._companies[key] = cid
+        return cid
+
+    def _index_file(self, p: Path, start: int) -> Tuple[int, int]:
+        """Index `p` from byte `start`; returns (lines indexed, bytes indexed)."""
+        path, loads = str(p), get_codec().loads
+        batch, n, end = [], 0, start
+        with open_read(p) as f:
+            f.seek(start)
+            for pos, line in _lines(f, start):
+                end = pos + len(line) + 1
+                if not line.strip():
+                    continue
+                try:
+                    row = loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(row, dict) or not row.get("external_id"):
+                    continue
+                batch.append((str(row["external_id"]), path, pos, len(line),
+                              self._company_id(row.get("company")), row.get("first_seen")))
+                if len(batch) >= BATCH:
+                    self.db.executemany(_UPSERT, batch)
+                    n += len(batch)
+                    batch = []
+        self.db.executemany(_UPSERT, batch)
+        return n + len(batch), end
+
+    def refresh(self) -> int:
+        """Index day files added or changed since the last pass. Returns lines indexed."""
+        known = {path: (size, mtime_ns, indexed) for path, size, mtime_ns, indexed
+                 in self.db.execute("SELECT path, size, mtime_ns, indexed FROM files")}
+        live = {str(p): p for p in day_files(self.root)}
+        n = 0
+        with self.db:
+            for path in known.keys() - live.keys():
+                self.db.execute("DELETE FROM lines WHERE path = ?", (path,))
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+            for path, p in live.items():
+                st = p.stat()
+                old = known.get(path)
+                if old and old[:2] == (st.st_size, st.st_mtime_ns):
+                    continue
+                # appends and in-place blanking keep the indexed prefix valid;
+                # anything else (compaction, a recompressed day) starts over
+                if old and st.st_size >= old[0] and not path.endswith((".gz", ".zst")):
+                    start = old[2]
+                else:
+                    start = 0
+                    self.db.execute("DELETE FROM lines WHERE path = ?", (path,))
+                self._drop_map(path)
+                got, end = self._index_file(p, start)
+                n += got
+                self.db.execute("INSERT OR REPLACE INTO files(path, size, mtime_ns, indexed) VALUES (?, ?, ?, ?)",
+                                (path, st.st_size, st.st_mtime_ns, end))
+        return n
+
+    # ---- reads --------------------------------------------------------------------
+
+    def _drop_map(self, path: str):
+        m = self._maps.pop(path, None)
+        if m is not None:
+            m.close()
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        m = self._maps.get(path)
+        if m is None:
+            try:
+                with open(path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        return None
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                return None
+            self._maps[path] = m
+        return m
+
+    def _read(self, locs: List[Tuple[str, str, int, int]]) -> Dict[str, Dict]:
+        """Decode the lines at `locs` [(external_id, path, pos, length)], grouped by file."""
+        loads = get_codec().loads
+        by_path: Dict[str, List[Tuple[str, int, int]]] = {}
+        for eid, path, pos, length in locs:
+            by_path.setdefault(path, []).append((eid, pos, length))
+        out = {}
+        for path, hits in by_path.items():
+            hits.sort(key=lambda h: h[1])
+            if path.endswith((".gz", ".zst")):
+                raw = self._read_stream(path, hits)
+            else:
+                m = self._map(path)
+                raw = [(eid, m[pos:pos + length]) for eid, pos, length in hits] if m is not None else []
+            for eid, line in raw:
+                try:
+                    row = loads(line)
+                except ValueError:
+                    continue  # blanked since it was indexed
+                if isinstance(row, dict) and row.get("external_id") == eid:
+                    out[eid] = row
+        return out
+
+    @staticmethod
+    def _read_stream(path: str, hits: List[Tuple[str, int, int]]) -> List[Tuple[str, bytes]]:
+        out = []
+        try:
+            with open_read(Path(path)) as f:
+                for eid, pos, length in hits:
+                    f.seek(pos)
+                    out.append((eid, f.read(length)))
+        except OSError:
+            pass
+        return out
+
+    def get(self, external_id: str) -> Optional[Dict]:
+        return self.get_many([external_id]).get(external_id)
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        """external_id -> archived row, for the ids that are archived."""
+        ids, locs = list(dict.fromkeys(ids)), []
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            locs.extend(self.db.execute(
+                f"SELECT external_id, path, pos, length FROM lines "
+                f"WHERE external_id IN ({','.join('?' * len(part))})", part))
+        return self._read(locs)
+
+    def companies(self, pattern: str) -> List[str]:
+        """Normalized company names containing `pattern` (case-insensitive)."""
+        like = "%" + norm_company(pattern).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return [r[0] for r in self.db.execute(
+            "SELECT name FROM companies WHERE name LIKE ? ESCAPE '\\' ORDER BY name", (like,))]
+
+    def company(self, name: str, since: Optional[str] = None, until: Optional[str] = None,
+                exact: bool = False) -> Iterator[Dict]:
+        """
+        Rows of every company whose name contains `name` (or equals it, with
+        exact=True), oldest first_seen first; `since`/`until` bound first_seen
+        (ISO strings, until exclusive).
+        """
+        names = [norm_company(name)] if exact else self.companies(name)
+        ids = [self._companies[n] for n in names if n in self._companies]
+        if not ids:
+            return
+        q = (f"SELECT external_id, path, pos, length FROM lines "
+             f"WHERE company_id IN ({','.join('?' * len(ids))})")
+        args: list = list(ids)
+        if since:
+            q += " AND first_seen >= ?"
+            args.append(since)
+        if until:
+            q += " AND first_seen < ?"
+            args.append(until)
+        q += " ORDER BY first_seen, external_id"
+        cur = self.db.execute(q, args)
+        while True:
+            locs = cur.fetchmany(BATCH)
+            if not locs:
+                return
+            rows = self._read(locs)
+            for eid, *_ in locs:
+                if eid in rows:
+                    yield rows[eid]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .io_utils import dumps
+
+    ap = argparse.ArgumentParser(prog="python -m pipeline.archive_reader",
+                                 description="Print archived rows by external_id or company, as NDJSON.")
+    ap.add_argument("ids", nargs="*", help="External IDs to look up.")
+    ap.add_argument("--company", help="Rows of companies whose name contains this.")
+    ap.add_argument("--since", help="With --company: first_seen on or after this ISO date.")
+    args = ap.parse_args()
+    with ArchiveReader() as archive:
+        found = archive.get_many(args.ids)
+        rows = [found[i] for i in args.ids if i in found]
+        if args.company:
+            rows = archive.company(args.company, since=args.since)
+        for row in rows:
+            print(dumps(row))
@@ -0,0 +1,171 @@
+"""
+JSON codecs and byte streams for the NDJSON archive.
+
+    codec = get_codec()          # orjson, else msgspec, else the json module
+    line = codec.dumps(row)      # bytes, no trailing newline
+    row = codec.loads(line)      # bytes or str; ValueError when malformed
+
+PIPELINE_JSON_CODEC=orjson|msgspec|json picks one explicitly; register()
+adds another. Every codec writes the same compact JSON for an archive row
+(timestamps as fixed-width UTC ISO strings, non-ASCII text unescaped), so
+files do not change shape with whichever library is installed.
+
+open_read()/open_write() pick the compression from the file name:
+*.gz through gzip and *.zst through zstandard (optional; without it .zst
+files raise a RuntimeError), anything else as a plain file, always with a
+BUF-sized buffer.
+"""
+import gzip
+import io
+import json
+import os
+from datetime import date, datetime, timezone
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# orjson, msgspec and zstandard are optional and imported on first use: only
+# the codec get_codec() picks is loaded, and zstandard only for a .zst file.
+
+# Read/write buffer for archive files.
+BUF = 1 << 20
+COMPRESSED = (".gz", ".zst")
+
+
+def json_default(o):
+    # Timestamps are stored as fixed-width UTC ISO strings (…T09:05:00+00:00)
+    if isinstance(o, datetime):
+        if o.tzinfo is None:
+            o = o.replace(tzinfo=timezone.utc)
+        return o.astimezone(timezone.utc).isoformat(timespec="seconds")
+    if isinstance(o, date):
+        return o.isoformat()
+    return str(o)
+
+
+class Codec:
+    __slots__ = ("name", "dumps", "loads")
+
+    def __init__(self, name: str, dumps: Callable[[object], bytes], loads: Callable[[object], object]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+def _json_codec() -> Codec:
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=json_default).encode
+    dec = json.loads
+
+    def loads(b):
+        # json.loads sniffs the encoding of bytes; archive lines are UTF-8
+        return dec(b.decode("utf-8") if isinstance(b, bytes) else b)
+
+    return Codec("json", lambda o: enc(o).encode("utf-8"), loads)
+
+
+def _orjson_codec() -> Codec:
+    import orjson
+    opts = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    enc = orjson.dumps
+    fallback = _json_codec().dumps
+
+    def dumps(o) -> bytes:
+        try:
+            return enc(o, default=json_default, option=opts)
+        except orjson.JSONEncodeError:
+            return fallback(o)  # e.g. integers beyond 64 bits
+
+    return Codec("orjson", dumps, orjson.loads)
+
+
+def _msgspec_codec() -> Codec:
+    # msgspec writes datetimes itself (…Z, with microseconds); route row
+    # values through json_default first so timestamps match the other codecs
+    import msgspec
+    enc = msgspec.json.Encoder(enc_hook=json_default).encode
+    dec = msgspec.json.Decoder().decode
+    fallback = _json_codec().dumps
+
+    def dumps(o) -> bytes:
+        if isinstance(o, dict):
+            o = {k: json_default(v) if isinstance(v, date) else v for k, v in o.items()}
+        try:
+            return enc(o)
+        except (msgspec.EncodeError, OverflowError):
+            return fallback(o)
+
+    def loads(b):
+        try:
+            return dec(b)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from None
+
+    return Codec("msgspec", dumps, loads)
+
+
+CODECS: Dict[str, Callable[[], Codec]] = {"json": _json_codec}
+if find_spec("orjson") is not None:
+    CODECS["orjson"] = _orjson_codec
+if find_spec("msgspec") is not None:
+    CODECS["msgspec"] = _msgspec_codec
+# fastest first
+PREFERENCE = ("orjson", "msgspec", "json")
+
+_cache: Dict[str, Codec] = {}
+
+
+def register(name: str, factory: Callable[[], Codec]):
+    """Make `factory()` available as get_codec(name)."""
+    CODECS[name] = factory
+    _cache.pop(name, None)
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    name = name or os.environ.get("PIPELINE_JSON_CODEC") or next(n for n in PREFERENCE if n in CODECS)
+    if name not in CODECS:
+        raise RuntimeError(f"JSON codec {name!r} is not available (have: {', '.join(sorted(CODECS))})")
+    if name not in _cache:
+        _cache[name] = CODECS[name]()
+    return _cache[name]
+
+
+def zstd_available() -> bool:
+    return find_spec("zstandard") is not None
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:  # pragma: no cover - optional dependency
+        raise RuntimeError("zstandard is required for .zst archives (pip install zstandard)") from None
+    return zstandard
+
+
+def open_read(path: Path) -> io.BufferedIOBase:
+    """Binary stream of `path`'s contents, decompressed by suffix."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return io.BufferedReader(gzip.GzipFile(path, "rb"), BUF)
+    if path.suffix == ".zst":
+        zstandard = _zstd()
+        raw = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_size=BUF, closefd=True), BUF)
+    return open(path, "rb", buffering=BUF)
+
+
+def open_write(path: Path, target: Optional[Path] = None) -> io.BufferedIOBase:
+    """
+    Binary stream writing to `path`, compressed by the suffix of `target`
+    (default `path`), so a temp file can be written for its final name.
+    """
+    suffix = Path(target or path).suffix
+    if suffix == ".gz":
+        return io.BufferedWriter(gzip.GzipFile(path, "wb", compresslevel=6), BUF)
+    if suffix == ".zst":
+        zstandard = _zstd()
+        raw = open(path, "wb")
+        return io.BufferedWriter(zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True), BUF)
+    return open(path, "wb", buffering=BUF)
@@ -0,0 +1,273 @@
+"""
+Columnar (Parquet) copy of the per-day NDJSON archive.
+
+    data/columnar/first_seen_month=YYYY-MM/part.parquet
+
+Partitions are hive-style on the first_seen month and each file is sorted by
+first_seen, so a date predicate skips whole directories and, via row-group
+statistics, the rest of the month; Parquet lets a reader decode just the
+columns it asks for. A year of history is ~12 files instead of 365.
+
+compact() only touches months fed by day archives whose size or mtime changed
+since the last pass (tracked in _manifest.json). Every row carries the
+archive_day it came from, so a month is patched by dropping that day's old
+rows and appending its new ones; unchanged days are never re-parsed.
+
+pyarrow is optional: without it available() is False and the NDJSON archive
+remains the only copy.
+"""
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .io_utils import ARCHIVE_ROOT, day_files, iter_ndjson
+from .records import JobColumns
+
+# pyarrow is imported on first use: it costs more than the rest of the
+# pipeline's imports together
+pa = pc = ds = pq = None
+
+COLUMNAR_ROOT = ARCHIVE_ROOT / "columnar"
+MANIFEST = "_manifest.json"
+PARTITION = "first_seen_month"
+PART_FILE = "part.parquet"
+ROW_GROUP_SIZE = 16_384
+# rows without a first_seen sort before every real month
+UNKNOWN_MONTH = "0000-00"
+# bumped when _schema() changes; a manifest from another version is dropped,
+# so the next compact() rewrites every month in the current schema
+SCHEMA_VERSION = 2
+
+
+def _load() -> bool:
+    global pa, pc, ds, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:  # pragma: no cover - optional dependency
+            return False
+        pa, pc, ds, pq = pyarrow, pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+    return True
+
+
+def available() -> bool:
+    return _load()
+
+
+def _require():
+    if not _load():
+        raise RuntimeError("pyarrow is required for the columnar archive (pip install pyarrow)")
+
+
+def _schema():
+    ts = pa.timestamp("s", tz="UTC")
+    return pa.schema([
+        ("external_id", pa.string()),
+        ("canonical_id", pa.string()),
+        ("title", pa.string()),
+        ("company", pa.string()),
+        ("location", pa.string()),
+        ("remote", pa.bool_()),
+        ("url", pa.string()),
+        ("posted_at", ts),
+        ("salary_min", pa.float64()),
+        ("salary_max", pa.float64()),
+        ("currency", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+        ("source", pa.string()),
+        ("first_seen", ts),
+        ("last_seen", ts),
+        ("archive_day", pa.string()),
+    ])
+
+
+def _to_table(rows: JobColumns, archive_day: str):
+    import pandas as pd
+    schema = _schema()
+    cols = {}
+    for field in schema:
+        if field.name == "archive_day":
+            cols[field.name] = pa.array([archive_day] * len(rows), type=field.type)
+            continue
+        if pa.types.is_floating(field.type):
+            # NaN marks a missing salary in the column; Arrow stores it as null
+            cols[field.name] = pa.array(rows.floats(field.name), type=field.type, from_pandas=True)
+            continue
+        vals = rows.column(field.name)
+        if pa.types.is_timestamp(field.type):
+            # ISO8601 accepts each value's own shape (fractions, offsets, bare
+            # dates); the default infers one format from the first value. The
+            # archive keeps seconds precision, so fractions are floored.
+            vals = pd.to_datetime(pd.Series(vals, dtype=object), utc=True, errors="coerce",
+                                  format="ISO8601").dt.floor("s")
+            cols[field.name] = pa.array(vals, type=field.type, from_pandas=True)
+        elif pa.types.is_list(field.type):
+            cols[field.name] = pa.array([list(v) if v else [] for v in vals], type=field.type)
+        elif pa.types.is_boolean(field.type):
+            cols[field.name] = pa.array([v if isinstance(v, bool) else None for v in vals], type=field.type)
+        else:
+            cols[field.name] = pa.array([str(v) if v is not None else None for v in vals], type=field.type)
+    return pa.table(cols, schema=schema)
+
+
+def _month_of(row: Dict) -> str:
+    fs = row.get("first_seen")
+    if not fs:
+        return UNKNOWN_MONTH
+    return fs[:7] if isinstance(fs, str) else fs.strftime("%Y-%m")
+
+
+def _day_start(d: str) -> datetime:
+    return datetime.combine(date.fromisoformat(d), datetime.min.time(), tzinfo=timezone.utc)
+
+
+class ColumnarArchive:
+    def __init__(self, root: Path = COLUMNAR_ROOT):
+        _require()
+        self.root = Path(root)
+        self.archives: Dict[str, Dict] = {}
+        mpath = self.root / MANIFEST
+        if mpath.exists():
+            try:
+                manifest = json.loads(mpath.read_text(encoding="utf-8"))
+            except Exception:
+                manifest = {}
+            if manifest.get("schema", 1) == SCHEMA_VERSION:
+                self.archives = manifest.get("archives", {})
+
+    def _save_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps({"schema": SCHEMA_VERSION, "archives": self.archives}, indent=1), encoding="utf-8")
+        tmp.replace(self.root / MANIFEST)
+
+    def _month_path(self, month: str) -> Path:
+        return self.root / f"{PARTITION}={month}" / PART_FILE
+
+    def _write_month(self, month: str, parts: List):
+        path = self._month_path(month)
+        table = pa.concat_tables(parts).sort_by("first_seen") if parts else None
+        if table is None or table.num_rows == 0:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(table, tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+        tmp.replace(path)
+
+    def _read_month(self, month: str):
+        path = self._month_path(month)
+        return pq.read_table(path, schema=_schema()) if path.exists() else None
+
+    def _rewrite_month(self, month: str, drop_days: List[str], add: List):
+        parts = []
+        old = self._read_month(month)
+        if old is not None:
+            keep = pc.invert(pc.is_in(old["archive_day"], value_set=pa.array(drop_days, pa.string())))
+            parts.append(old.filter(keep))
+        self._write_month(month, parts + add)
+
+    def apply_journal(self, journal: Dict[str, Dict]) -> int:
+        """
+        Drop rows the dedupe index retired from past day files
+        (DedupeIndex.pending_journal()) from their months, without re-reading
+        the day files. Files this copy was not current on are left to compact().
+        """
+        n = 0
+        for key, j in journal.items():
+            a = self.archives.get(key)
+            if not a or a.get("sig") != j["before"] or not os.path.exists(key):
+                continue
+            by_month: Dict[str, set] = {}
+            for r in j["retired"]:
+                by_month.setdefault(_month_of(r), set()).add(str(r.get("external_id")))
+            for month, ids in sorted(by_month.items()):
+                old = self._read_month(month)
+                if old is None:
+                    continue
+                hit = pc.and_(pc.equal(old["archive_day"], a["day"]),
+                              pc.is_in(old["external_id"], value_set=pa.array(sorted(ids), pa.string())))
+                self._write_month(month, [old.filter(pc.invert(hit))])
+            st = os.stat(key)
+            a["sig"] = [st.st_size, st.st_mtime_ns]
+            n += 1
+        if n:
+            self._save_manifest()
+        return n
+
+    def compact(self, archive_root: Path = ARCHIVE_ROOT) -> int:
+        """Bring the Parquet copy in line with the NDJSON archive. Returns day files re-read."""
+        paths = {str(p): p for p in day_files(archive_root)}
+        changed = [k for k in self.archives if k not in paths]
+        for key, p in paths.items():
+            st = p.stat()
+            old = self.archives.get(key)
+            if not old or old.get("sig") != [st.st_size, st.st_mtime_ns]:
+                changed.append(key)
+        if not changed:
+            return 0
+
+        affected = set()
+        drop_days = []
+        add: Dict[str, List] = {}
+        for key in changed:
+            old = self.archives.pop(key, None)
+            if old:
+                affected.update(old["months"])
+                drop_days.append(old["day"])
+            p = paths.get(key)
+            if p is None:
+                continue
+            st = p.stat()
+            # a day's rows are held as columns with interned strings, not dicts
+            by_month: Dict[str, JobColumns] = {}
+            for r in iter_ndjson(p):
+                month = _month_of(r)
+                if month not in by_month:
+                    by_month[month] = JobColumns()
+                by_month[month].append(r)
+            day = p.parent.name
+            drop_days.append(day)
+            for month, rows in by_month.items():
+                add.setdefault(month, []).append(_to_table(rows, day))
+            affected.update(by_month)
+            self.archives[key] = {"sig": [st.st_size, st.st_mtime_ns], "day": day, "months": sorted(by_month)}
+
+        for month in sorted(affected):
+            self._rewrite_month(month, sorted(set(drop_days)), add.get(month, []))
+        self._save_manifest()
+        return sum(1 for k in changed if k in paths)
+
+    def read(self, columns: Optional[Sequence[str]] = None,
+             since: Optional[str] = None, until: Optional[str] = None):
+        """
+        DataFrame of archived rows, reading only `columns` and only rows whose
+        first_seen date is in [since, until] (ISO dates, inclusive).
+        """
+        import pandas as pd
+        schema = _schema()
+        columns = list(columns or schema.names)
+        files = sorted(self.root.glob(f"{PARTITION}=*/{PART_FILE}"))
+        if not files:
+            return pd.DataFrame({c: [] for c in columns})
+        part = ds.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+        dataset = ds.dataset(files, format="parquet", partitioning=part,
+                             partition_base_dir=str(self.root),
+                             schema=schema.append(pa.field(PARTITION, pa.string())))
+        ts = schema.field("first_seen").type
+        conds = []
+        if since:
+            conds += [ds.field(PARTITION) >= since[:7],
+                      ds.field("first_seen") >= pa.scalar(_day_start(since), ts)]
+        if until:
+            conds += [ds.field(PARTITION) <= until[:7],
+                      ds.field("first_seen") < pa.scalar(_day_start(until) + timedelta(days=1), ts)]
+        expr = None
+        for c in conds:
+            expr = c if expr is None else expr & c
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
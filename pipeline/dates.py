@@ -0,0 +1,210 @@
+"""
+Timestamp parsing for feed values (posted_at and the like).
+
+    parse("2026-10-01T09:00:00Z", source="lever")    # aware UTC datetime or None
+    parse_column(df["posted_at"], source="lever")    # pandas datetime64[us, UTC] Series
+
+A value goes through the cheapest parser that takes it:
+
+  1. numbers are epoch seconds;
+  2. datetime.fromisoformat, which covers nearly every ISO 8601 string;
+  3. compiled detectors for the other shapes feeds repeat (RFC 2822,
+     "10/01/2026", "Oct 1, 2026", "2026-10-01 09:00:00 UTC"), tried in the
+     order each source has matched them so far;
+  4. dateutil, for anything else.
+
+A source whose last MISS_LIMIT values matched no detector goes straight
+from fromisoformat to dateutil, trying the detectors again on one value in
+REPROBE_EVERY, so a free-form feed does not pay for every regex per value.
+
+The results are the same as dateutil.parser.parse(value).astimezone(UTC): a
+detector only claims a string it reads exactly as dateutil does, and a
+naive result is taken as local time, as astimezone() does. (ISO week
+dates such as "2026-W40-1", which dateutil rejects, now parse.) Strings are
+memoized in a bounded LRU keyed by (value, source); feeds repeat the same
+posted_at across many rows.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Distinct (value, source) strings kept parsed.
+CACHE_SIZE = 1 << 16
+# Consecutive detector misses after which a source skips the detectors, and
+# how often (in values) such a source tries them again.
+MISS_LIMIT = 32
+REPROBE_EVERY = 256
+
+_MONTHS = {m: i for i, m in enumerate(
+    "jan feb mar apr may jun jul aug sep oct nov dec".split(), 1)}
+_MONTHS.update({m: i for i, m in enumerate(
+    "january february march april may june july august september october november december".split(), 1)})
+_MONTHS["sept"] = 9
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+
+class Detector(NamedTuple):
+    name: str
+    pattern: "re.Pattern"
+    build: Callable[["re.Match"], datetime]  # ValueError: not this detector's value after all
+
+
+@lru_cache(maxsize=None)
+def _offset(tz: str) -> timezone:
+    if tz in ("GMT", "UTC", "Z"):
+        return timezone.utc
+    sign = -1 if tz[0] == "-" else 1
+    return timezone(sign * timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5])))
+
+
+def _rfc2822(m) -> datetime:
+    day, mon, year, hh, mm, ss, tz = m.groups()
+    return datetime(int(year), _MONTHS[mon.lower()], int(day), int(hh), int(mm), int(ss or 0),
+                    tzinfo=_offset(tz))
+
+
+def _us_date(m) -> datetime:
+    month, day, year = m.groups()
+    return datetime(int(year), int(month), int(day))  # day > 12: dateutil swaps; we fall through
+
+
+def _month_name(m) -> datetime:
+    mon, day, year = m.groups()
+    return datetime(int(year), _MONTHS[mon.lower()], int(day))
+
+
+def _iso_named_utc(m) -> datetime:
+    return datetime.fromisoformat(m.group(1)).replace(tzinfo=timezone.utc)
+
+
+DETECTORS: List[Detector] = [
+    Detector("rfc2822", re.compile(
+        rf"(?:(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s*)?(\d{{1,2}})\s+({_MONTH_RE})\s+(\d{{4}})\s+"
+        r"(\d{2}):(\d{2})(?::(\d{2}))?\s+((?-i:GMT|UTC|Z)|[+-]\d{4})", re.IGNORECASE), _rfc2822),
+    Detector("us_date", re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), _us_date),
+    Detector("month_name", re.compile(rf"({_MONTH_RE})\.?\s+(\d{{1,2}}),?\s+(\d{{4}})", re.IGNORECASE),
+             _month_name),
+    Detector("iso_named_utc", re.compile(
+        r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)\s*(?:UTC|GMT)"), _iso_named_utc),
+]
+
+# source -> detectors it has matched, most hits first
+_learned: Dict[Optional[str], List[Detector]] = {}
+_hits: Dict[Optional[str], Dict[str, int]] = {}
+# source -> values since its last detector match
+_misses: Dict[Optional[str], int] = {}
+
+
+def _detect(text: str, source: Optional[str]) -> Optional[datetime]:
+    misses = _misses.get(source, 0)
+    _misses[source] = misses + 1
+    if misses >= MISS_LIMIT and misses % REPROBE_EVERY:
+        return None
+    learned = _learned.setdefault(source, [])
+    for tier in (learned, DETECTORS):
+        for d in tier:
+            if tier is DETECTORS and d in learned:
+                continue
+            m = d.pattern.fullmatch(text)
+            if m is None:
+                continue
+            try:
+                dt = d.build(m)
+            except (ValueError, OverflowError):
+                continue
+            _misses[source] = 0
+            hits = _hits.setdefault(source, {})
+            hits[d.name] = n = hits.get(d.name, 0) + 1
+            if tier is DETECTORS:
+                learned.append(d)
+            else:
+                # keep the most matched detector first
+                i = learned.index(d)
+                while i and hits[learned[i - 1].name] < n:
+                    learned[i - 1], learned[i] = learned[i], learned[i - 1]
+                    i -= 1
+            return dt
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(value: str, source: Optional[str]) -> Optional[datetime]:
+    text = value.strip()
+    try:
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            dt = _detect(text, source)
+            if dt is None:
+                from dateutil import parser as dateparse
+                dt = dateparse.parse(text)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def parse(value, source: Optional[str] = None) -> Optional[datetime]:
+    """Aware UTC datetime for an ISO/RFC/free-form string or epoch seconds; None when unparseable."""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(float(value), tz=timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            return None
+    if isinstance(value, str):
+        return _parse_text(value, source)
+    return None
+
+
+def cache_info():
+    return _parse_text.cache_info()
+
+
+def cache_clear():
+    """Forget memoized strings, learned detector orders and miss counts."""
+    _parse_text.cache_clear()
+    _learned.clear()
+    _hits.clear()
+    _misses.clear()
+
+
+def learned() -> Dict[Optional[str], List[str]]:
+    """source -> names of the detectors it has matched, in the order they are tried."""
+    return {s: [d.name for d in ds] for s, ds in _learned.items()}
+
+
+def parse_column(values, source: Optional[str] = None):
+    """
+    parse() over a whole column, as a pandas datetime64[us, UTC] Series (NaT
+    for None). The column is reduced to its distinct values first; integer
+    epochs among them go through one pandas.to_datetime call and the rest
+    through parse(). (pandas' ISO 8601 parser is slower than fromisoformat
+    per value once offsets vary, so strings are not handed to it.)
+    """
+    import pandas as pd
+    dtype = "datetime64[us, UTC]"
+    s = pd.Series(values, dtype=object)
+    try:
+        codes, uniques = pd.factorize(s)
+    except TypeError:
+        # lists and dicts cannot be factorized; they parse to None anyway
+        codes, uniques = pd.factorize(s.where(s.map(lambda v: v.__hash__ is not None), None))
+    u = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=u.index, dtype=dtype)
+    truthy = u.astype(bool)
+
+    ints = u[(u.map(type) == int) & truthy]
+    if len(ints):
+        try:
+            parsed[ints.index] = pd.to_datetime(ints.astype("int64"), unit="s", utc=True,
+                                                errors="coerce").astype(dtype)
+        except (OverflowError, ValueError, pd.errors.OutOfBoundsDatetime):
+            pass  # left to parse() below
+
+    rest = u[parsed.isna() & truthy]
+    if len(rest):
+        got = pd.Series([parse(v, source) for v in rest], index=rest.index, dtype=object)
+        parsed[rest.index] = pd.to_datetime(got, utc=True).astype(dtype)
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=s.index)
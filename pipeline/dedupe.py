@@ -0,0 +1,355 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .codec import COMPRESSED, get_codec, open_read
+from .io_utils import ARCHIVE_ROOT, day_files
+
+DEDUPE_PATH = Path("data/state/dedupe.sqlite")
+
+# A day file is rewritten without its blanked lines once they make up this
+# share of it (and at least COMPACT_MIN_BYTES).
+COMPACT_RATIO = 0.25
+COMPACT_MIN_BYTES = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    external_id TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,     -- day archive holding the live copy of the row
+    pos         INTEGER NOT NULL,  -- byte offset of its line
+    length      INTEGER NOT NULL,  -- line length in bytes, without the newline
+    first_seen  TEXT,
+    last_seen   TEXT               -- authoritative; the archived line keeps the value it was written with
+);
+CREATE INDEX IF NOT EXISTS seen_first_seen ON seen(first_seen);
+CREATE TABLE IF NOT EXISTS pending (   -- superseded lines not yet blanked
+    external_id TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    pos         INTEGER NOT NULL,
+    length      INTEGER NOT NULL,
+    first_seen  TEXT,
+    last_seen   TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    blank_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS compacting (
+    path        TEXT PRIMARY KEY
+);
+"""
+
+Loc = Tuple[str, int, int]
+
+
+def merge_into(index: Dict[str, Dict], rows: Iterable[Dict]) -> List[str]:
+    """
+    Fold `rows` into `index` (external_id -> row) in place.
+    A repeated job takes the newer fields but keeps its original first_seen.
+    Returns the external_ids touched, in order of first appearance.
+    """
+    touched = []
+    for r in rows:
+        eid = r["external_id"]
+        old = index.get(eid)
+        if old is None:
+            index[eid] = r
+        else:
+            merged = {**old, **r}
+            merged["first_seen"] = old.get("first_seen") or r.get("first_seen")
+            index[eid] = merged
+        touched.append(eid)
+    return list(dict.fromkeys(touched))
+
+
+def merge(existing: List[Dict], new: List[Dict]) -> List[Dict]:
+    index = {r["external_id"]: r for r in existing if r.get("external_id")}
+    merge_into(index, new)
+    return list(index.values())
+
+
+def _sig(path: str) -> List[int]:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class DedupeIndex:
+    """
+    Persistent external_id -> archive line index across all day files.
+
+    merge() costs O(rows merged), whatever the size of the archive:
+      - an unseen job is appended to the day file;
+      - a repost with unchanged fields only moves last_seen in the index,
+        so older day files are not written to;
+      - a repost with changed fields is appended, merged, to the day file and
+        its old line blanked (readers skip blank lines), so every job lives
+        exactly once in the archive whichever day it reappears on.
+
+    Index entries for appended lines and the lines they supersede are
+    committed before the file is touched; whatever a crash leaves half done
+    is settled the next time the index is opened. Day files whose blanked
+    bytes pass COMPACT_RATIO are rewritten and re-indexed.
+
+    Past day files that were written to are listed in `journal` as
+    {path: {"before": [size, mtime_ns], "retired": [old rows]}} so the
+    columnar archive can drop just those rows instead of re-reading the files.
+    """
+
+    def __init__(self, path: Path = DEDUPE_PATH, compact_ratio: float = COMPACT_RATIO,
+                 compact_min_bytes: int = COMPACT_MIN_BYTES):
+        self.path = Path(path)
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(_SCHEMA)
+        self.counts = {"new": 0, "reposted": 0, "updated": 0}
+        self.journal: Dict[str, Dict] = {}
+        self._appended = set()
+        self._recover()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    # ---- archive file access ------------------------------------------------
+
+    @staticmethod
+    def _read(loc: Loc, eid: Optional[str] = None) -> Optional[Dict]:
+        path, pos, length = loc
+        try:
+            # offsets in a compressed day count decompressed bytes
+            with open_read(path) if path.endswith(COMPRESSED) else open(path, "rb") as f:
+                f.seek(pos)
+                row = get_codec().loads(f.read(length))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(row, dict) or (eid is not None and row.get("external_id") != eid):
+            return None
+        return row
+
+    def _touch(self, path: str):
+        # remember how a past day file looked before its first write this run
+        if path not in self.journal and os.path.exists(path):
+            self.journal[path] = {"before": _sig(path), "retired": []}
+
+    def _blank(self, loc: Loc, eid: str) -> bool:
+        old = self._read(loc, eid) if not loc[0].endswith(COMPRESSED) else None
+        if old is None:
+            return False
+        path, pos, length = loc
+        self._touch(path)
+        with open(path, "r+b") as f:
+            f.seek(pos)
+            f.write(b" " * length)
+        self.journal[path]["retired"].append(old)
+        self.db.execute("INSERT INTO files(path, blank_bytes) VALUES (?, ?) ON CONFLICT(path) "
+                        "DO UPDATE SET blank_bytes = blank_bytes + excluded.blank_bytes", (path, length + 1))
+        return True
+
+    def _settle_pending(self):
+        """Blank superseded lines whose replacement landed; roll back the rest."""
+        paths = set()
+        for eid, path, pos, length, fs, ls in self.db.execute("SELECT * FROM pending").fetchall():
+            cur = self.db.execute("SELECT path, pos, length FROM seen WHERE external_id = ?", (eid,)).fetchone()
+            if cur and self._read(tuple(cur), eid) is not None:
+                if self._blank((path, pos, length), eid):
+                    paths.add(path)
+            else:
+                # the new copy never reached the disk: point back at the old line
+                self.db.execute("INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?, ?, ?)",
+                                (eid, path, pos, length, fs, ls))
+        self.db.execute("DELETE FROM pending")
+        self.db.commit()
+        for path in paths:
+            self._maybe_compact(path)
+
+    def _recover(self):
+        for (path,) in self.db.execute("SELECT path FROM compacting").fetchall():
+            Path(self._compact_tmp(path)).unlink(missing_ok=True)
+            self._reindex(path)
+        self._settle_pending()
+
+    @staticmethod
+    def _compact_tmp(path: str) -> str:
+        p = Path(path)
+        return str(p.with_name(f".{p.name}.compact"))
+
+    def _reindex(self, path: str):
+        """Point every index entry living in `path` at its current line."""
+        updates = []
+        loads = get_codec().loads
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                pos = 0
+                for raw in f:
+                    line = raw.rstrip(b"\r\n")
+                    if line.strip():
+                        try:
+                            row = loads(line)
+                        except ValueError:
+                            row = None
+                        if isinstance(row, dict) and row.get("external_id"):
+                            updates.append((pos, len(line), str(row["external_id"]), path))
+                    pos += len(raw)
+        with self.db:
+            self.db.executemany("UPDATE seen SET pos = ?, length = ? WHERE external_id = ? AND path = ?", updates)
+            self.db.execute("UPDATE files SET blank_bytes = 0 WHERE path = ?", (path,))
+            self.db.execute("DELETE FROM compacting WHERE path = ?", (path,))
+
+    def _maybe_compact(self, path: str) -> bool:
+        row = self.db.execute("SELECT blank_bytes FROM files WHERE path = ?", (path,)).fetchone()
+        if not row or not os.path.exists(path):
+            return False
+        if row[0] < max(self.compact_min_bytes, os.path.getsize(path) * self.compact_ratio):
+            return False
+        self.compact(path)
+        return True
+
+    def compact(self, path: str):
+        """Rewrite `path` without blank lines and re-index the rows it holds."""
+        path = str(path)
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO compacting VALUES (?)", (path,))
+        tmp = self._compact_tmp(path)
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            for raw in src:
+                if raw.strip():
+                    dst.write(raw if raw.endswith(b"\n") else raw + b"\n")
+            dst.flush()
+            os.fsync(dst.fileno())
+        self._touch(path)
+        os.replace(tmp, path)
+        self._reindex(path)
+
+    # ---- merge ----------------------------------------------------------------
+
+    def bootstrap(self, root: Path = ARCHIVE_ROOT) -> int:
+        """
+        Index day archives written before the index existed (only when it is
+        empty). Earlier copies of a job seen on several days are left on disk;
+        the index points at the latest and keeps the earliest first_seen.
+        Compressed days are indexed too, but never rewritten: a job whose
+        latest copy is in one keeps that copy when it is merged again.
+        """
+        if len(self):
+            return 0
+        n = 0
+        loads = get_codec().loads
+        for p in day_files(root):
+            batch = []
+            with open_read(p) as f:
+                pos = 0
+                for raw in f:
+                    line = raw.rstrip(b"\r\n")
+                    try:
+                        row = loads(line) if line.strip() else None
+                    except ValueError:
+                        row = None
+                    if isinstance(row, dict) and row.get("external_id"):
+                        batch.append((str(row["external_id"]), str(p), pos, len(line),
+                                      row.get("first_seen"), row.get("last_seen")))
+                    pos += len(raw)
+            self.db.executemany(
+                "INSERT INTO seen VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(external_id) DO UPDATE SET "
+                "path = excluded.path, pos = excluded.pos, length = excluded.length, "
+                "first_seen = MIN(seen.first_seen, excluded.first_seen), last_seen = excluded.last_seen",
+                batch)
+            n += len(batch)
+        self.db.commit()
+        return n
+
+    def _locate(self, ids: List[str]) -> Dict[str, Tuple[Loc, Optional[str]]]:
+        out = {}
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            q = (f"SELECT external_id, path, pos, length, last_seen FROM seen "
+                 f"WHERE external_id IN ({','.join('?' * len(part))})")
+            for eid, path, pos, length, last_seen in self.db.execute(q, part):
+                out[eid] = ((path, pos, length), last_seen)
+        return out
+
+    def merge(self, rows: Iterable[Dict], day_path: Path) -> List[Dict]:
+        """
+        Merge one chunk of normalized rows into the archive. Returns the
+        current row of every job touched (as on disk, with the indexed
+        last_seen), in order of first appearance.
+        """
+        batch: Dict[str, Dict] = {}
+        touched = merge_into(batch, rows)
+        known = self._locate(touched)
+        day_path = Path(day_path)
+        target = str(day_path)
+
+        end = day_path.stat().st_size if day_path.exists() else 0
+        head = b""
+        if end:
+            with open(day_path, "rb") as f:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":  # torn last line from an interrupted run
+                    head = b"\n"
+                    end += 1
+
+        codec = get_codec()
+        lines, placed, superseded, last_seen, current = [], [], [], [], []
+        for eid in touched:
+            row = codec.loads(codec.dumps(batch[eid]))  # the form it takes on disk
+            loc, indexed_last = known.get(eid, (None, None))
+            old = self._read(loc, eid) if loc else None
+            if old is not None:
+                merged = {**old, **row}
+                merged["first_seen"] = old.get("first_seen") or row.get("first_seen")
+                if all(old.get(k) == v for k, v in merged.items() if k != "last_seen"):
+                    self.counts["reposted"] += 1
+                    last = merged.get("last_seen")
+                    if last and last > (indexed_last or ""):
+                        last_seen.append((last, eid))
+                    else:
+                        merged["last_seen"] = indexed_last or last
+                    current.append(merged)
+                    continue
+                self.counts["updated"] += 1
+                superseded.append((eid, *loc, old.get("first_seen"), indexed_last))
+                row = merged
+            else:
+                self.counts["new"] += 1
+            line = codec.dumps(row)
+            lines.append(line)
+            current.append(row)
+            placed.append((eid, target, end, len(line), row.get("first_seen"), row.get("last_seen")))
+            end += len(line) + 1
+
+        # index first (with the lines being superseded), then bytes
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?, ?, ?)", placed)
+            self.db.executemany("INSERT INTO pending VALUES (?, ?, ?, ?, ?, ?)", superseded)
+            self.db.executemany("UPDATE seen SET last_seen = ? WHERE external_id = ?", last_seen)
+        if lines:
+            day_path.parent.mkdir(parents=True, exist_ok=True)
+            self._appended.add(target)
+            with open(day_path, "ab") as out:
+                out.write(head + b"".join(line + b"\n" for line in lines))
+                out.flush()
+                os.fsync(out.fileno())
+        self._settle_pending()
+        return current
+
+    def pending_journal(self) -> Dict[str, Dict]:
+        """
+        Journal entries for past day files only (files appended to change
+        anyway), and start a new journal: a long-lived index hands each
+        retired row over once.
+        """
+        out = {p: j for p, j in self.journal.items() if p not in self._appended}
+        self.journal, self._appended = {}, set()
+        return out
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+CACHE_PATH = Path("data/state/vibe_cache.sqlite")
+
+# Company facts (mission, themes, brand links) change slowly.
+DEFAULT_TTL = 14 * 86400
+# Failed crawls are retried sooner.
+NEGATIVE_TTL = 86400
+MAX_ENTRIES = 20000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vibes (
+    domain      TEXT PRIMARY KEY,
+    vibe        TEXT,              -- JSON; NULL marks a failed crawl
+    fetched_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vibes_accessed ON vibes(accessed_at);
+CREATE TABLE IF NOT EXISTS aliases (
+    company     TEXT PRIMARY KEY,  -- normalized company name
+    root        TEXT,              -- company site URL; '' when none was found
+    fetched_at  REAL NOT NULL
+);
+"""
+
+MISS = object()
+
+
+def norm_company(name: str) -> str:
+    return re.sub(r"\s+", " ", name or "").strip().lower()
+
+
+class CompanyCache:
+    """
+    Persistent per-company vibe cache keyed by the company's root domain.
+
+    - get(domain) returns the cached vibe dict, None for a cached failure,
+      or MISS when the entry is absent or expired.
+    - Entries live `ttl` seconds (`negative_ttl` for failures); the table is
+      capped at `max_entries`, evicting least recently used rows.
+    - Company name -> site aliases let later jobs at the same company skip
+      the ATS page fetch entirely.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = NEGATIVE_TTL, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fresh(self, fetched_at: float, ok: bool) -> bool:
+        return time.time() - fetched_at < (self.ttl if ok else self.negative_ttl)
+
+    def get(self, domain: str):
+        row = self.db.execute("SELECT vibe, fetched_at FROM vibes WHERE domain = ?", (domain,)).fetchone()
+        if not row or not self._fresh(row[1], row[0] is not None):
+            return MISS
+        self.db.execute("UPDATE vibes SET accessed_at = ? WHERE domain = ?", (time.time(), domain))
+        return json.loads(row[0]) if row[0] is not None else None
+
+    def put(self, domain: str, vibe: dict | None):
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO vibes(domain, vibe, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (domain, json.dumps(vibe) if vibe is not None else None, now, now),
+        )
+        self._evict()
+        self.db.commit()
+
+    def _evict(self):
+        (count,) = self.db.execute("SELECT COUNT(*) FROM vibes").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM vibes WHERE domain IN (SELECT domain FROM vibes ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def root_for(self, company: str):
+        """Cached company site URL for a company name ('' = none found), or MISS."""
+        key = norm_company(company)
+        if not key:
+            return MISS
+        row = self.db.execute("SELECT root, fetched_at FROM aliases WHERE company = ?", (key,)).fetchone()
+        if not row or not self._fresh(row[1], bool(row[0])):
+            return MISS
+        return row[0]
+
+    def set_root(self, company: str, root: str | None):
+        key = norm_company(company)
+        if not key:
+            return
+        self.db.execute(
+            "INSERT OR REPLACE INTO aliases(company, root, fetched_at) VALUES (?, ?, ?)",
+            (key, root or "", time.time()),
+        )
+        self.db.commit()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from urllib.parse import urlparse
+
+import httpx
+
+from .http_cache import HttpCache
+
+# No Cache-Control/Pragma overrides: pages are revalidated with the
+# validators kept in HttpCache instead of being re-downloaded.
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/124 Safari/537.36"
+}
+
+GLOBAL_CONCURRENCY = 32
+PER_HOST_CONCURRENCY = 4
+REQUEST_TIMEOUT = 12.0
+
+
+class Fetcher:
+    """
+    One pooled httpx.AsyncClient shared by every job in a run, with a global
+    cap on in-flight requests and a smaller cap per host so a batch of jobs
+    at the same company does not hammer one site.
+
+        async with Fetcher() as f:
+            res = await f.get(url)   # None on network errors
+
+    With an HttpCache, requests carry If-None-Match / If-Modified-Since and
+    a 304 is answered from disk; such responses have
+    `res.extensions["from_cache"]` set and expose the cached
+    `res.extensions["derived"]` value.
+    """
+
+    def __init__(self, concurrency: int = GLOBAL_CONCURRENCY, per_host: int = PER_HOST_CONCURRENCY,
+                 timeout: float = REQUEST_TIMEOUT, http_cache: HttpCache | None = None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.http_cache = http_cache
+        self._client: httpx.AsyncClient | None = None
+        self._global = asyncio.Semaphore(concurrency)
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "Fetcher":
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=self.timeout,
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def get(self, url: str, started: asyncio.Event | None = None) -> httpx.Response | None:
+        """`started`, if given, is set once the request holds its slots and goes out."""
+        cache = self.http_cache
+        entry = await asyncio.to_thread(cache.load, url) if cache else None
+        async with self._host_sem(url), self._global:
+            if started is not None:
+                started.set()
+            try:
+                res = await self._client.get(url, headers=cache.validators(entry) if cache else None)
+            except Exception:
+                return None
+        if cache is None:
+            return res
+        if res.status_code == 304 and entry:
+            return cache.to_response(url, entry)
+        await asyncio.to_thread(cache.store, url, res)
+        return res
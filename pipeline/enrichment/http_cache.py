@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import httpx
+
+HTTP_CACHE_DIR = Path("data/state/http_cache")
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages for conditional requests.
+
+    One gzip'd JSON file per URL (sharded by hash prefix) holds the body,
+    the validators (ETag / Last-Modified) and an optional `derived` slot
+    where callers keep whatever they computed from the body, so a 304
+    needs neither a download nor a re-parse. Only responses that carry a
+    validator are stored, since nothing else can be revalidated.
+    """
+
+    def __init__(self, root: Path = HTTP_CACHE_DIR):
+        self.root = Path(root)
+
+    def _path(self, url: str) -> Path:
+        h = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.root / h[:2] / f"{h}.json.gz"
+
+    def load(self, url: str) -> dict | None:
+        p = self._path(url)
+        try:
+            with gzip.open(p, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _write(self, url: str, entry: dict):
+        p = self._path(url)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(entry, f)
+        tmp.replace(p)
+
+    def validators(self, entry: dict | None) -> dict:
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, res: httpx.Response):
+        etag = res.headers.get("etag")
+        last_modified = res.headers.get("last-modified")
+        if res.status_code != 200 or not (etag or last_modified):
+            return
+        self._write(url, {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": res.headers.get("content-type", ""),
+            "body": res.text,
+            "stored_at": time.time(),
+            "derived": None,
+        })
+
+    def set_derived(self, url: str, derived):
+        entry = self.load(url)
+        if entry is not None:
+            entry["derived"] = derived
+            self._write(url, entry)
+
+    def to_response(self, url: str, entry: dict) -> httpx.Response:
+        """Rebuild a 200 response from a cache entry (marked from_cache)."""
+        res = httpx.Response(
+            200,
+            headers={"content-type": entry.get("content_type") or "text/html"},
+            text=entry.get("body") or "",
+            request=httpx.Request("GET", url),
+            extensions={"from_cache": True, "derived": entry.get("derived")},
+        )
+        return res
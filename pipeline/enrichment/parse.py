@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, asdict
+from urllib.parse import urljoin
+
+from lxml import etree
+
+# Text under these tags is markup noise or site chrome, not company copy.
+SKIP_TEXT = {"script", "style", "noscript", "template", "svg", "head", "nav", "footer", "aside", "form", "iframe"}
+
+FEED_CHUNK = 64 * 1024
+
+
+@dataclass
+class ParsedPage:
+    """Everything vibe extraction needs from one HTML document."""
+    text: str = ""
+    links: list[str] = field(default_factory=list)
+    title: str = ""
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Collector:
+    """lxml parser target: a single SAX-style pass, no tree is built."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.parts: list[str] = []
+        self.links: list[str] = []
+        self.title: list[str] = []
+        self._buf: list[str] = []
+        self._skip = 0
+        self._in_title = 0
+
+    def _flush(self):
+        if self._buf:
+            s = "".join(self._buf).strip()
+            self._buf = []
+            if s and not self._skip:
+                self.parts.append(s)
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in SKIP_TEXT:
+            self._skip += 1
+        if tag == "title":
+            self._in_title += 1
+        elif tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                href = href.strip()
+                if not (href.startswith("#") or href.startswith("mailto:") or href.startswith("tel:")):
+                    self.links.append(urljoin(self.base_url, href))
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in SKIP_TEXT and self._skip:
+            self._skip -= 1
+        if tag == "title" and self._in_title:
+            self._in_title -= 1
+
+    def data(self, text):
+        if self._in_title:
+            self.title.append(text)
+        self._buf.append(text)
+
+    def close(self) -> ParsedPage:
+        self._flush()
+        return ParsedPage(
+            text=" ".join(self.parts),
+            links=self.links,
+            title=" ".join("".join(self.title).split()),
+        )
+
+
+def parse_page(html: str, base_url: str) -> ParsedPage:
+    """Parse `html` once (streamed through lxml) into text, links and title."""
+    if not html:
+        return ParsedPage()
+    parser = etree.HTMLParser(target=_Collector(base_url), recover=True)
+    try:
+        for i in range(0, len(html), FEED_CHUNK):
+            parser.feed(html[i:i + FEED_CHUNK])
+        return parser.close()
+    except etree.LxmlError:
+        return ParsedPage()
@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 import re
-import httpx
-from bs4 import BeautifulSoup
+import copy
+import asyncio
+from functools import lru_cache
 from urllib.parse import urlparse, urljoin
 import tldextract
 from collections import Counter
-from readability import Document
+
+from .cache import MISS, CompanyCache
+from .fetch import Fetcher, GLOBAL_CONCURRENCY, PER_HOST_CONCURRENCY
+from .http_cache import HttpCache
+from .parse import parse_page
 
 STOPWORDS = set("""
 a an and are as at be by for from has have i in is it its of on or our that the their them there they this to was we with you your
@@ -16,17 +21,11 @@ solutions platform products services team global customer customers enterprise t
 
 CANDIDATE_PATHS = ["", "about", "company", "careers", "values", "mission", "brand", "press", "blog", "design", "design-system"]
 
-DEFAULT_HEADERS = {
-    "Accept": "text/html,application/xhtml+xml",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Cache-Control": "no-cache",
-    "Pragma": "no-cache",
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/124 Safari/537.36"
-}
-
-def _client(timeout=12.0) -> httpx.Client:
-    return httpx.Client(follow_redirects=True, timeout=timeout, headers=DEFAULT_HEADERS)
+# Wall-clock budget for discovering one company's site, and again for crawling
+# it; each budget starts once its first request gets a Fetcher slot.
+COMPANY_TIMEOUT = 30.0
 
+@lru_cache(maxsize=8192)
 def _domain(url: str) -> str:
     p = tldextract.extract(url)
     return f"{p.domain}.{p.suffix}" if p.suffix else p.domain
@@ -37,33 +36,11 @@ def _is_same_domain(a: str, b: str) -> bool:
     except Exception:
         return False
 
-def _textify(html: str) -> str:
-    try:
-        doc = Document(html)
-        html = doc.summary()
-    except Exception:
-        pass
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    return soup.get_text(" ", strip=True)
-
-def _extract_links(html: str, base_url: str) -> list[str]:
-    soup = BeautifulSoup(html, "lxml")
-    out = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        if href.startswith("#") or href.startswith("mailto:") or href.startswith("tel:"):
-            continue
-        absu = urljoin(base_url, href)
-        out.append(absu)
-    return out
-
 def _pick_company_root_from_ats(apply_url: str, html: str) -> str | None:
     # Heuristic: external links not on the ATS domain are likely the company site.
     ats_dom = _domain(apply_url)
     candidates = []
-    for link in _extract_links(html, apply_url):
+    for link in parse_page(html, apply_url).links:
         if not link.startswith("http"):
             continue
         dom = _domain(link)
@@ -101,11 +78,11 @@ def _extract_mission(text: str) -> str | None:
         return re.sub(r"\s+", " ", m.group(0)).strip()
     return None
 
-def _brandish_links(root: str, htmls: dict[str, str]) -> list[str]:
+def _brandish_links(root: str, links_by_path: dict[str, list[str]]) -> list[str]:
     keep = []
     seen = set()
-    for path, html in htmls.items():
-        for link in _extract_links(html, urljoin(root, path)):
+    for path, links in links_by_path.items():
+        for link in links:
             if _is_same_domain(link, root):
                 lower = link.lower()
                 if any(x in lower for x in ["/brand", "/press", "/media", "/blog", "/news", "/design", "design-system", "/careers", "/values", "/mission"]):
@@ -115,6 +92,187 @@ def _brandish_links(root: str, htmls: dict[str, str]) -> list[str]:
     # Dedup to 6 max
     return keep[:6]
 
+def _empty_vibe() -> dict:
+    return {"vibe_mission": None, "vibe_keywords": [], "vibe_links": [], "vibe_talking_points": []}
+
+def _page_facts(html: str, base_url: str) -> dict:
+    # one streaming parse per document; everything below works on its output
+    return parse_page(html, base_url).as_dict()
+
+def _vibe_from_pages(root: str, pages: dict[str, tuple], http_cache: HttpCache | None = None) -> dict:
+    """`pages` maps candidate path -> (url, html, derived facts or None)."""
+    vibe = _empty_vibe()
+
+    # parse each page once; facts of pages answered by a 304 come from the cache
+    facts = {}
+    for path, (url, html, derived) in pages.items():
+        if derived is None:
+            derived = _page_facts(html, urljoin(root, path))
+            if http_cache is not None:
+                http_cache.set_derived(url, derived)
+        facts[path] = derived
+
+    # extract mission + keywords
+    joined_text = " ".join(f["text"] for f in facts.values())
+    mission = _extract_mission(joined_text)
+    keywords = _keywords_from_text(joined_text, k=8)
+    links = _brandish_links(root, {p: f["links"] for p, f in facts.items()})
+
+    # Talking points – keep it short and usable
+    tps = []
+    if mission:
+        tps.append("Mission fit: " + mission[:120].rstrip())
+    if keywords:
+        tps.append("Themes: " + ", ".join(keywords[:6]))
+    if any("careers" in l.lower() for l in links):
+        tps.append("Recent roles & teams on Careers page")
+    if any("blog" in l.lower() or "news" in l.lower() for l in links):
+        tps.append("Pull a recent blog/news win")
+
+    vibe["vibe_mission"] = mission
+    vibe["vibe_keywords"] = keywords
+    vibe["vibe_links"] = links
+    vibe["vibe_talking_points"] = tps[:4]
+    return vibe
+
+async def _fetch_page(fetcher: Fetcher, url: str, ctype: str = "text/html",
+                      started: asyncio.Event | None = None) -> tuple | None:
+    res = await fetcher.get(url, started)
+    if res is not None and res.status_code < 400 and ctype in res.headers.get("content-type", ""):
+        return (url, res.text, res.extensions.get("derived"))
+    return None
+
+async def _discover_root(fetcher: Fetcher, apply_url: str, company_hint: str,
+                         started: asyncio.Event | None = None) -> str | None:
+    # a direct company hint wins; otherwise look for the company site on the ATS page
+    if company_hint:
+        return company_hint.rstrip("/")
+    res = await fetcher.get(apply_url, started)
+    if res is None or res.status_code >= 400 or not res.headers.get("content-type", "").startswith("text/"):
+        return None
+    return _pick_company_root_from_ats(apply_url, res.text)
+
+async def _discover(fetcher: Fetcher, apply_url: str, company_hint: str, budget: float) -> str | None:
+    """
+    _discover_root() capped at `budget` seconds, counted from when the ATS
+    request gets a slot. Raises asyncio.TimeoutError when the budget runs out.
+    """
+    started = asyncio.Event()
+    task = asyncio.ensure_future(_discover_root(fetcher, apply_url, company_hint, started))
+    waiter = asyncio.ensure_future(started.wait())
+    await asyncio.wait([waiter, task], return_when=asyncio.FIRST_COMPLETED)
+    waiter.cancel()
+    return await asyncio.wait_for(task, budget)
+
+async def _crawl(fetcher: Fetcher, root: str, budget: float) -> tuple[dict[str, tuple], bool]:
+    """
+    Fetch the candidate pages in parallel and return (pages, complete).
+    The `budget` clock starts when the first request gets a slot, so time
+    spent queued behind other companies' requests is not charged to this one.
+    `complete` is False when some pages were cut off by the budget.
+    """
+    started = asyncio.Event()
+    tasks = {
+        asyncio.ensure_future(_fetch_page(fetcher, root if p == "" else urljoin(root + "/", p), started=started)): p
+        for p in CANDIDATE_PATHS
+    }
+    waiter = asyncio.ensure_future(started.wait())
+    await asyncio.wait([waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    waiter.cancel()
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for t in pending:
+        t.cancel()
+    pages = {}
+    for t, p in tasks.items():  # keep CANDIDATE_PATHS order
+        if t in done and not t.cancelled() and t.exception() is None and t.result():
+            pages[p] = t.result()
+    return pages, not pending
+
+async def _crawl_company(fetcher: Fetcher, root: str, budget: float,
+                         cache: CompanyCache | None) -> dict | None:
+    pages, complete = await _crawl(fetcher, root, budget)
+    # parsing is CPU-bound; keep it off the event loop
+    vibe = await asyncio.to_thread(_vibe_from_pages, root, pages, fetcher.http_cache) if pages else None
+    # a truncated crawl is used for this run but not cached for the whole TTL
+    if cache is not None and complete:
+        cache.put(_domain(root), vibe)
+    return vibe
+
+async def enrich_vibe_async(job: dict, fetcher: Fetcher, company_timeout: float = COMPANY_TIMEOUT,
+                            cache: CompanyCache | None = None, inflight: dict | None = None) -> dict:
+    """
+    Async enrich_vibe on a shared Fetcher; site discovery and the crawl are
+    each capped at `company_timeout` seconds.
+    With a CompanyCache, each company domain is crawled once per TTL; with an
+    `inflight` dict, concurrent jobs at the same domain share one crawl.
+    """
+    apply_url = job.get("apply_url") or job.get("url") or ""
+    company_hint = job.get("company_url") or ""
+    company = job.get("company") or ""
+    if not (apply_url or company_hint):
+        return _empty_vibe()
+
+    root = company_hint.rstrip("/") if company_hint else MISS
+    if root is MISS and cache is not None:
+        root = cache.root_for(company)
+    if root is MISS:
+        try:
+            root = await _discover(fetcher, apply_url, company_hint, company_timeout)
+        except asyncio.TimeoutError:
+            # out of time is not a miss: try again next run
+            root = None
+        else:
+            if cache is not None:
+                cache.set_root(company, root)
+    if not root:
+        return _empty_vibe()
+
+    domain = _domain(root)
+    vibe = cache.get(domain) if cache is not None else MISS
+    if vibe is MISS:
+        task = inflight.get(domain) if inflight is not None else None
+        if task is None:
+            task = asyncio.ensure_future(_crawl_company(fetcher, root, company_timeout, cache))
+            if inflight is not None:
+                inflight[domain] = task
+        vibe = await asyncio.shield(task)
+    return copy.deepcopy(vibe) if vibe else _empty_vibe()
+
+async def enrich_vibe_many_async(jobs: list[dict], concurrency: int = GLOBAL_CONCURRENCY,
+                                 per_host: int = PER_HOST_CONCURRENCY,
+                                 company_timeout: float = COMPANY_TIMEOUT,
+                                 cache: CompanyCache | bool | None = True,
+                                 http_cache: HttpCache | bool | None = True) -> list:
+    own_cache = cache is True
+    if own_cache:
+        cache = CompanyCache()
+    cache = cache or None
+    if http_cache is True:
+        http_cache = HttpCache()
+    sem = asyncio.Semaphore(concurrency)
+    inflight: dict = {}
+    try:
+        async with Fetcher(concurrency=concurrency, per_host=per_host, http_cache=http_cache or None) as fetcher:
+            async def one(job):
+                async with sem:
+                    return await enrich_vibe_async(job, fetcher, company_timeout, cache, inflight)
+            return await asyncio.gather(*(one(j) for j in jobs), return_exceptions=True)
+    finally:
+        if own_cache:
+            cache.close()
+
+def enrich_many(jobs: list[dict], **kwargs) -> list:
+    """
+    Enrich many jobs concurrently over one connection pool.
+    Returns one entry per job, in order: the vibe dict, or the exception
+    raised while enriching that job. Company results are cached on disk
+    (pipeline.enrichment.cache); pass cache=False to always crawl. Pages are
+    revalidated against the HTTP cache; http_cache=False fetches them in full.
+    """
+    if not jobs:
+        return []
+    return asyncio.run(enrich_vibe_many_async(jobs, **kwargs))
+
 def enrich_vibe(job: dict) -> dict:
     """
     Returns a dict with:
@@ -124,65 +282,7 @@ def enrich_vibe(job: dict) -> dict:
       - vibe_talking_points: list[str]
     Uses job['apply_url'] when available; optionally job['company_url'] if present.
     """
-    apply_url = job.get("apply_url") or job.get("url") or ""
-    company_hint = job.get("company_url") or ""
-
-    vibe = {"vibe_mission": None, "vibe_keywords": [], "vibe_links": [], "vibe_talking_points": []}
-    if not (apply_url or company_hint):
-        return vibe
-
-    with _client() as client:
-        root = None
-        htmls = {}
-
-        # Step 1: if we have a direct company hint, use it as root
-        if company_hint:
-            root = company_hint.rstrip("/")
-        else:
-            # Fetch the ATS page and try to discover the company root site
-            try:
-                r = client.get(apply_url)
-                if r.status_code < 400 and (r.headers.get("content-type","").startswith("text/")):
-                    html = r.text
-                    root = _pick_company_root_from_ats(apply_url, html)
-            except Exception:
-                root = None
-
-        if not root:
-            return vibe
-
-        # Step 2: fetch candidate pages
-        for p in CANDIDATE_PATHS:
-            url = root if p == "" else urljoin(root + "/", p)
-            try:
-                res = client.get(url)
-                if res.status_code < 400 and ("text/html" in res.headers.get("content-type", "")):
-                    htmls[p] = res.text
-            except Exception:
-                continue
-
-        if not htmls:
-            return vibe
-
-        # Step 3: extract mission + keywords
-        joined_text = " ".join(_textify(h) for h in htmls.values())
-        mission = _extract_mission(joined_text)
-        keywords = _keywords_from_text(joined_text, k=8)
-        links = _brandish_links(root, htmls)
-
-        # Talking points – keep it short and usable
-        tps = []
-        if mission:
-            tps.append("Mission fit: " + mission[:120].rstrip())
-        if keywords:
-            tps.append("Themes: " + ", ".join(keywords[:6]))
-        if any("careers" in l.lower() for l in links):
-            tps.append("Recent roles & teams on Careers page")
-        if any("blog" in l.lower() or "news" in l.lower() for l in links):
-            tps.append("Pull a recent blog/news win")
-
-        vibe["vibe_mission"] = mission
-        vibe["vibe_keywords"] = keywords
-        vibe["vibe_links"] = links
-        vibe["vibe_talking_points"] = tps[:4]
-        return vibe
+    res = enrich_many([job])[0]
+    if isinstance(res, Exception):
+        raise res
+    return res
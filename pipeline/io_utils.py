@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from .codec import BUF, COMPRESSED, get_codec, open_read, open_write
+
+ARCHIVE_ROOT = Path("data")
+# rows encoded per writelines() call
+WRITE_BATCH = 1024
+
+
+def dumps(row: Dict) -> str:
+    return get_codec().dumps(row).decode("utf-8")
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict]:
+    """
+    Lazily yield one dict per line; blank and malformed lines are skipped.
+    Lines are read BUF bytes at a time; .gz and .zst files are decompressed
+    on the fly.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    loads = get_codec().loads
+    with open_read(path) as f:
+        for lines in iter(lambda: f.readlines(BUF), []):
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    row = loads(line)
+                except ValueError:
+                    continue
+                if isinstance(row, dict):
+                    yield row
+
+
+def read_ndjson(path: Path) -> List[Dict]:
+    return list(iter_ndjson(path))
+
+
+def write_ndjson(path: Path, rows: Iterable[Dict]):
+    """
+    Atomically replace `path` with `rows` (streamed; any iterable works),
+    compressed when the name ends in .gz or .zst.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    enc = get_codec().dumps
+    with open_write(tmp, target=path) as f:
+        for batch in chunked(rows, WRITE_BATCH):
+            f.writelines([enc(r) + b"\n" for r in batch])
+    tmp.replace(path)
+
+
+def day_files(root: Path = ARCHIVE_ROOT) -> List[Path]:
+    """
+    Every day archive under `root`, oldest day first: data/<day>/jobs.ndjson,
+    or jobs.ndjson.gz / jobs.ndjson.zst for days compressed once they stopped
+    changing (a day with both keeps the plain file).
+    """
+    by_day: Dict[Path, Path] = {}
+    for suffix in COMPRESSED + ("",):
+        for p in Path(root).glob(f"*/jobs.ndjson{suffix}"):
+            by_day[p.parent] = p
+    return [by_day[d] for d in sorted(by_day, key=lambda d: d.name)]
+
+
+def archive_path_for(dt: datetime) -> Path:
+    return ARCHIVE_ROOT / dt.astimezone(timezone.utc).date().isoformat() / "jobs.ndjson"
+
+
+def chunked(it: Iterable, size: int) -> Iterator[List]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
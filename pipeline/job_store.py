@@ -0,0 +1,333 @@
+"""
+Local job store: one row per live job in data/state/jobs.sqlite (WAL).
+
+The archive step writes every merged row here with executemany; the
+dashboard and the Notion sync read from it instead of re-scanning day files.
+Columns the pipeline filters or aggregates on (company, first_seen, remote,
+salary midpoint) are real, indexed columns; the full row is kept as JSON.
+
+  - "today's jobs" / "last 7 days" are range scans on the first_seen index;
+  - all-time totals (rows, remote/on-site, salary sum + count) are kept in a
+    one-row table by triggers, so the dashboard never counts the whole table.
+
+Outbox: a trigger appends a 'job' entry whenever a canonical row is inserted
+or its archived form changes (not while bootstrap() loads history, which is
+already in Notion), and enrichment queues 'vibe' entries with enqueue().
+notion_sync.drain_outbox() works through pending entries oldest first and acks each with the Notion page_id it landed on, so an interrupted
+sync resumes at the first unacknowledged entry. A pending entry of the same
+kind for the same job is updated rather than duplicated.
+
+This store supersedes StatsStore (data/state/stats.json), which kept running
+aggregates per archive file. Those were a second copy of the rows' counts:
+any change to an archive meant subtracting and refolding the whole file, and
+per-day counters had to be pruned by hand. Here the totals are maintained by
+triggers on the rows themselves and the 7-day window is an index range scan,
+so they cannot drift from the data. bootstrap() deletes the old stats.json.
+"""
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .io_utils import ARCHIVE_ROOT, chunked, day_files, iter_ndjson
+from .stats import most_common, salary_mid
+
+JOBS_PATH = Path("data/state/jobs.sqlite")
+# StatsStore's aggregates, retired by this store
+RETIRED_STATS = "stats.json"
+
+# Rows per executemany / per page read back.
+BATCH = 1000
+# Acknowledged outbox entries are kept this long for inspection.
+OUTBOX_RETAIN = timedelta(days=7)
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS jobs (
+    external_id  TEXT PRIMARY KEY,
+    canonical_id TEXT,
+    company      TEXT,
+    title        TEXT,
+    remote       INTEGER,          -- 1 / 0 / NULL (unknown)
+    salary_min   REAL,
+    salary_max   REAL,
+    salary_mid   REAL,             -- stats.salary_mid() of the row
+    keywords     TEXT,             -- JSON array
+    first_seen   TEXT,
+    last_seen    TEXT,
+    data         TEXT NOT NULL     -- the full row as archived
+);
+CREATE INDEX IF NOT EXISTS jobs_company ON jobs(company, first_seen);
+CREATE INDEX IF NOT EXISTS jobs_first_seen ON jobs(first_seen);
+CREATE INDEX IF NOT EXISTS jobs_remote ON jobs(remote);
+CREATE INDEX IF NOT EXISTS jobs_salary ON jobs(salary_mid);
+
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL, remote INTEGER NOT NULL, onsite INTEGER NOT NULL,
+    salary_sum REAL NOT NULL, salary_n INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (0, 0, 0, 0, 0, 0);
+
+CREATE TRIGGER IF NOT EXISTS jobs_totals_ins AFTER INSERT ON jobs BEGIN
+    UPDATE totals SET total = total + 1, remote = remote + (NEW.remote IS 1), onsite = onsite + (NEW.remote IS 0),
+        salary_sum = salary_sum + IFNULL(NEW.salary_mid, 0), salary_n = salary_n + (NEW.salary_mid IS NOT NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_totals_del AFTER DELETE ON jobs BEGIN
+    UPDATE totals SET total = total - 1, remote = remote - (OLD.remote IS 1), onsite = onsite - (OLD.remote IS 0),
+        salary_sum = salary_sum - IFNULL(OLD.salary_mid, 0), salary_n = salary_n - (OLD.salary_mid IS NOT NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_totals_upd AFTER UPDATE OF remote, salary_mid ON jobs BEGIN
+    UPDATE totals SET remote = remote - (OLD.remote IS 1) + (NEW.remote IS 1),
+        onsite = onsite - (OLD.remote IS 0) + (NEW.remote IS 0),
+        salary_sum = salary_sum - IFNULL(OLD.salary_mid, 0) + IFNULL(NEW.salary_mid, 0),
+        salary_n = salary_n - (OLD.salary_mid IS NOT NULL) + (NEW.salary_mid IS NOT NULL);
+END;
+
+CREATE TABLE IF NOT EXISTS outbox (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    external_id  TEXT NOT NULL,
+    kind         TEXT NOT NULL,    -- 'job' (sync the stored row) or 'vibe'
+    payload      TEXT,             -- JSON for 'vibe' entries
+    page_id      TEXT,             -- Notion page the entry was written to
+    error        TEXT,             -- why an acked entry was not written
+    acked_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox(seq) WHERE acked_at IS NULL;
+CREATE INDEX IF NOT EXISTS outbox_pending_id ON outbox(external_id, kind) WHERE acked_at IS NULL;
+
+
+-- loading = 1 while bootstrap() bulk-loads history: those rows are already in Notion
+CREATE TABLE IF NOT EXISTS load_state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    loading INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO load_state VALUES (0, 0);
+"""
+
+# Outbox triggers, (re)created when the store's user_version is behind
+# OUTBOX_VERSION, so stores made before the loading flag pick it up.
+OUTBOX_VERSION = 1
+_OUTBOX_TRIGGERS = """
+DROP TRIGGER IF EXISTS jobs_outbox_ins;
+DROP TRIGGER IF EXISTS jobs_outbox_upd;
+CREATE TRIGGER jobs_outbox_ins AFTER INSERT ON jobs
+WHEN NEW.canonical_id = NEW.external_id AND (SELECT loading FROM load_state) = 0 BEGIN
+    INSERT INTO outbox(external_id, kind) SELECT NEW.external_id, 'job' WHERE NOT EXISTS (
+        SELECT 1 FROM outbox WHERE external_id = NEW.external_id AND kind = 'job' AND acked_at IS NULL);
+END;
+CREATE TRIGGER jobs_outbox_upd AFTER UPDATE OF data ON jobs
+WHEN NEW.canonical_id = NEW.external_id AND OLD.data IS NOT NEW.data AND (SELECT loading FROM load_state) = 0 BEGIN
+    INSERT INTO outbox(external_id, kind) SELECT NEW.external_id, 'job' WHERE NOT EXISTS (
+        SELECT 1 FROM outbox WHERE external_id = NEW.external_id AND kind = 'job' AND acked_at IS NULL);
+END;
+"""
+
+Entry = Tuple[int, str, str, Optional[str]]  # seq, external_id, kind, payload
+
+_UPSERT = """
+INSERT INTO jobs (external_id, canonical_id, company, title, remote, salary_min, salary_max,
+                  salary_mid, keywords, first_seen, last_seen, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(external_id) DO UPDATE SET
+    canonical_id = excluded.canonical_id, company = excluded.company, title = excluded.title,
+    remote = excluded.remote, salary_min = excluded.salary_min, salary_max = excluded.salary_max,
+    salary_mid = excluded.salary_mid, keywords = excluded.keywords, first_seen = excluded.first_seen,
+    last_seen = excluded.last_seen, data = excluded.data
+"""
+
+
+def _num(v) -> Optional[float]:
+    try:
+        return float(v) if v is not None and v != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _record(r: Dict) -> tuple:
+    remote = r.get("remote")
+    kws = r.get("keywords")
+    return (
+        str(r["external_id"]), r.get("canonical_id") or str(r["external_id"]),
+        r.get("company"), r.get("title"),
+        1 if remote is True else (0 if remote is False else None),
+        _num(r.get("salary_min")), _num(r.get("salary_max")), salary_mid(r),
+        json.dumps(kws if isinstance(kws, list) else [], ensure_ascii=False),
+        r.get("first_seen"), r.get("last_seen"),
+        json.dumps(r, ensure_ascii=False, default=str),
+    )
+
+
+class JobStore:
+    def __init__(self, path: Path = JOBS_PATH, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # one connection per thread; `timeout` covers waits on another writer
+        self.db = sqlite3.connect(str(self.path), timeout=timeout)
+        self.db.executescript(_SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < OUTBOX_VERSION:
+            self.db.executescript(f"BEGIN IMMEDIATE; {_OUTBOX_TRIGGERS} PRAGMA user_version = {OUTBOX_VERSION}; COMMIT;")
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT total FROM totals").fetchone()[0]
+
+    # ---- writes ---------------------------------------------------------------
+
+    def upsert(self, rows: Iterable[Dict]) -> int:
+        """Insert or replace rows (already merged by the archive step). Returns rows written."""
+        n, batch = 0, []
+        for r in rows:
+            batch.append(_record(r))
+            if len(batch) >= BATCH:
+                n += self._write(batch)
+                batch = []
+        return n + self._write(batch)
+
+    def _write(self, batch) -> int:
+        if batch:
+            with self.db:
+                self.db.executemany(_UPSERT, batch)
+        return len(batch)
+
+    def bootstrap(self, root: Path = ARCHIVE_ROOT) -> int:
+        """
+        Load the day archives when the store is empty. Files go oldest day
+        first, so a job archived on several days ends up with its latest row.
+        History is already in Notion, so nothing is queued in the outbox; the
+        load is one transaction, and a crash leaves the store empty for the
+        next run to retry. A leftover StatsStore file next to the store is
+        removed.
+        """
+        (self.path.parent / RETIRED_STATS).unlink(missing_ok=True)
+        if len(self):
+            return 0
+        n = 0
+        with self.db:
+            self.db.execute("UPDATE load_state SET loading = 1")
+            for p in day_files(root):
+                rows = (r for r in iter_ndjson(p) if r.get("external_id"))
+                for batch in chunked(rows, BATCH):
+                    self.db.executemany(_UPSERT, [_record(r) for r in batch])
+                    n += len(batch)
+            self.db.execute("UPDATE load_state SET loading = 0")
+        return n
+
+    # ---- outbox ---------------------------------------------------------------
+
+    def enqueue(self, external_id: str, kind: str, payload: Optional[Dict] = None):
+        """Queue a Notion write for `external_id`; replaces the payload of a pending one of the same kind."""
+        blob = json.dumps(payload, ensure_ascii=False, default=str) if payload is not None else None
+        with self.db:
+            cur = self.db.execute("UPDATE outbox SET payload = ? WHERE external_id = ? AND kind = ? "
+                                  "AND acked_at IS NULL", (blob, external_id, kind))
+            if not cur.rowcount:
+                self.db.execute("INSERT INTO outbox(external_id, kind, payload) VALUES (?, ?, ?)",
+                                (external_id, kind, blob))
+
+    def pending(self, limit: int = BATCH) -> List[Entry]:
+        """Oldest unacknowledged outbox entries."""
+        return self.db.execute("SELECT seq, external_id, kind, payload FROM outbox WHERE acked_at IS NULL "
+                               "ORDER BY seq LIMIT ?", (limit,)).fetchall()
+
+    def pending_count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM outbox WHERE acked_at IS NULL").fetchone()[0]
+
+    def ack(self, acks: Iterable[Tuple[int, Optional[str], Optional[str]]]):
+        """Mark entries done: (seq, page_id, error or None)."""
+        stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.db:
+            self.db.executemany("UPDATE outbox SET page_id = ?, error = ?, acked_at = ? WHERE seq = ?",
+                                [(page_id, error, stamp, seq) for seq, page_id, error in acks])
+
+    def prune_outbox(self, now: Optional[datetime] = None) -> int:
+        """Drop entries acknowledged more than OUTBOX_RETAIN ago."""
+        cutoff = ((now or datetime.now(timezone.utc)) - OUTBOX_RETAIN).isoformat(timespec="seconds")
+        with self.db:
+            return self.db.execute("DELETE FROM outbox WHERE acked_at < ?", (cutoff,)).rowcount
+
+    # ---- reads ----------------------------------------------------------------
+
+    def _pages(self, where: str, args: tuple, page: int = BATCH) -> Iterator[Dict]:
+        last = 0
+        while True:
+            found = self.db.execute(f"SELECT rowid, data FROM jobs WHERE {where} AND rowid > ? "
+                                    f"ORDER BY rowid LIMIT ?", (*args, last, page)).fetchall()
+            if not found:
+                return
+            last = found[-1][0]
+            for _, data in found:
+                yield json.loads(data)
+
+    def known(self, ids: Iterable[str]) -> set:
+        """The subset of `ids` already stored."""
+        ids, out = list(ids), set()
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            q = f"SELECT external_id FROM jobs WHERE external_id IN ({','.join('?' * len(part))})"
+            out.update(eid for (eid,) in self.db.execute(q, part))
+        return out
+
+    def rows(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        """Stored row per external_id (unknown ids are left out)."""
+        ids, out = list(ids), {}
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            q = f"SELECT external_id, data FROM jobs WHERE external_id IN ({','.join('?' * len(part))})"
+            out.update((eid, json.loads(data)) for eid, data in self.db.execute(q, part))
+        return out
+
+    def rows_first_seen_on(self, day, canonical_only: bool = False) -> Iterator[Dict]:
+        """Rows whose first_seen falls on `day` (UTC), via the first_seen index."""
+        lo, hi = day.isoformat(), (day + timedelta(days=1)).isoformat()
+        where = "first_seen >= ? AND first_seen < ?" + (" AND canonical_id = external_id" if canonical_only else "")
+        return self._pages(where, (lo, hi))
+
+    def count_since(self, column: str, since: str) -> Counter:
+        """Non-empty `column` values (company or title) of rows first seen on or after `since`."""
+        if column not in ("company", "title"):
+            raise ValueError(f"not a countable column: {column}")
+        return Counter(dict(self.db.execute(
+            # without ANALYZE stats the planner prefers a full scan of jobs_company
+            f"SELECT {column}, COUNT(*) FROM jobs INDEXED BY jobs_first_seen "
+            f"WHERE first_seen >= ? AND {column} != '' GROUP BY {column}",
+            (since,))))
+
+    def keywords_since(self, since: str) -> Counter:
+        return Counter(dict(self.db.execute(
+            "SELECT k.value, COUNT(*) FROM jobs, json_each(jobs.keywords) AS k "
+            "WHERE jobs.first_seen >= ? GROUP BY k.value", (since,))))
+
+    def dashboard(self, now: Optional[datetime] = None) -> Dict:
+        """Same dict as stats.compute_dashboard() over every stored row."""
+        now = now or datetime.now(timezone.utc)
+        today = now.date()
+        since = (now - timedelta(days=7)).date().isoformat()
+        total, remote, onsite, salary_sum, salary_n = self.db.execute(
+            "SELECT total, remote, onsite, salary_sum, salary_n FROM totals").fetchone()
+        today_count = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE first_seen >= ? AND first_seen < ?",
+            (today.isoformat(), (today + timedelta(days=1)).isoformat())).fetchone()[0]
+        return {
+            "total_roles": total,
+            "today_count": today_count,
+            "remote_count": remote,
+            "onsite_count": onsite,
+            "top_companies": most_common(self.count_since("company", since), 5),
+            "top_titles": most_common(self.count_since("title", since), 5),
+            "top_keywords": most_common(self.keywords_since(since), 10),
+            "avg_salary": round(salary_sum / salary_n, 2) if salary_n else None,
+            "today_date": str(today),
+        }
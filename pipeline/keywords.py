@@ -0,0 +1,122 @@
+"""
+Keyword tagging rules (keywords.yml) compiled once into a single matcher.
+
+keywords.yml is a list of rules:
+
+    - name: python
+      match: [python, django, fastapi]
+
+A rule tags a text when any of its terms occurs as a whole word
+(case-insensitive, same semantics as `\\bterm\\b`). All terms are folded
+into one character trie, rendered as a single regex that is scanned over the
+text once, instead of one regex search per term per rule.
+"""
+from __future__ import annotations
+
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+RULES_PATH = Path("keywords.yml")
+# How often tagger() looks at the rules file's mtime, in seconds.
+RECHECK_EVERY = 1.0
+
+_END = ""  # trie key marking the end of a term
+
+
+def load_rules(path: Path = RULES_PATH) -> List[Dict]:
+    try:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or []
+    except Exception:
+        return []
+
+
+def _trie_pattern(node: Dict) -> str:
+    # Children first and the end-of-term branch last (greedy `?`): at any
+    # position the longest term that ends on a word boundary wins.
+    alts = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch != _END]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if _END in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class KeywordTagger:
+    def __init__(self, rules: List[Dict]):
+        self.names = [r.get("name") for r in rules]
+        self._rules_for: Dict[str, List[int]] = {}
+        for i, r in enumerate(rules):
+            for term in r.get("match") or []:
+                self._rules_for.setdefault(str(term).lower(), []).append(i)
+
+        terms = [t for t in self._rules_for if t]
+        trie: Dict = {}
+        for t in terms:
+            node = trie
+            for ch in t:
+                node = node.setdefault(ch, {})
+            node[_END] = True
+        # zero-width scan so matches that overlap or nest are all seen
+        self._rx = re.compile(r"\b(?=(" + _trie_pattern(trie) + r")\b)") if terms else None
+
+        # A term that is a proper prefix of another can be hidden by the
+        # longer one at the same position; those few get their own check.
+        self._shadowed = []
+        for t in self._rules_for:
+            if not t or any(o != t and o.startswith(t) for o in terms):
+                self._shadowed.append((re.compile(r"\b" + re.escape(t) + r"\b"), self._rules_for[t]))
+
+    def tag(self, text: str) -> List[str]:
+        if not text: return []
+        t = text.lower()
+        hit = set()
+        if self._rx is not None:
+            for m in self._rx.finditer(t):
+                hit.update(self._rules_for[m.group(1)])
+        for rx, idxs in self._shadowed:
+            if not hit.issuperset(idxs) and rx.search(t):
+                hit.update(idxs)
+        seen = set(); out = []
+        for i in sorted(hit):
+            name = self.names[i]
+            if name not in seen:
+                seen.add(name); out.append(name)
+        return out
+
+
+# str(path) -> (checked at, (mtime_ns, size) or None, tagger)
+_taggers: Dict[str, Tuple[float, Optional[Tuple[int, int]], KeywordTagger]] = {}
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def tagger(path: Path = RULES_PATH) -> KeywordTagger:
+    """
+    The compiled tagger for the rules at `path`, built on first use and
+    rebuilt when the file's mtime or size changes (looked at no more than
+    every RECHECK_EVERY seconds), so a long-running process picks up edits
+    to keywords.yml without compiling it per row.
+    """
+    key = str(path)
+    now = time.monotonic()
+    cached = _taggers.get(key)
+    if cached is not None and now - cached[0] < RECHECK_EVERY:
+        return cached[2]
+    stamp = _stamp(Path(path))
+    if cached is None or cached[1] != stamp:
+        cached = (now, stamp, KeywordTagger(load_rules(path)))
+    else:
+        cached = (now, stamp, cached[2])
+    _taggers[key] = cached
+    return cached[2]
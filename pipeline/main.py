@@ -1,56 +1,170 @@
+from collections import Counter
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
+import argparse
 import os
+import threading
 
-from .config import load
-from .io_utils import read_ndjson, write_ndjson, archive_path_for
-from .transform import normalize
-from .dedupe import merge
-from .stats import compute_dashboard, render_dashboard_md
-from .notion_sync import upsert_jobs, update_portfolio_blocks
-from notion_client import Client
+from .io_utils import iter_ndjson, archive_path_for, chunked
+from .transform import CLOCK, normalize
+from .dedupe import DedupeIndex
+from .neardup import NearDupIndex, attach_text
+from .job_store import JobStore
+from .stats import render_dashboard_md
+from .notion_sync import drain_outbox, update_portfolio_blocks
+from .notion_api import RateLimitedNotion
+from .notion_index import NotionIndex
+from .parallel import iter_normalized_parallel
+from .stages import StageGraph
+from . import columnar
 
-def run():
-    cfg = load()
-
-    # 1) Read incoming (one JSON per line)
-    incoming = Path("sources/incoming.ndjson")
-    raw_rows: List[Dict] = read_ndjson(incoming)
-
-    # 2) Normalize
-    normalized = [normalize(r) for r in raw_rows]
-    normalized = [r for r in normalized if r]
-
-    # 3) Archive (idempotent per-day)
-    today_path = archive_path_for(datetime.now(timezone.utc))
-    existing = read_ndjson(today_path)
-    merged = merge(existing, normalized)
-    write_ndjson(today_path, merged)
+# Rows normalized and merged per step; bounds memory regardless of input size.
+CHUNK_SIZE = 5000
+# Normalized chunks waiting for the archive stage before normalize blocks.
+CHUNK_QUEUE = 4
 
-    # 4) Stats across ALL history
-    all_rows: List[Dict] = []
-    for p in Path("data").rglob("jobs.ndjson"):
-        all_rows.extend(read_ndjson(p))
-    stats = compute_dashboard(all_rows)
+def iter_normalized(path: Path, now: datetime) -> Iterator[Dict]:
+    for raw in iter_ndjson(path):
+        row = normalize(raw, now=now)
+        if row:
+            yield attach_text(row, raw)
 
+def dashboard_content(jobs: JobStore, now: datetime) -> Tuple[Dict, str, List[Dict]]:
+    """Stats, rendered dashboard markdown and today's list, all from the job store."""
+    stats = jobs.dashboard(now)
     links = {
         "today": os.environ.get("NOTION_TODAY_LINK",""),
         "all": os.environ.get("NOTION_DB_LINK",""),
     }
-    markdown = render_dashboard_md(stats, links)
+    # "today's list" = items harvested today; each line shows the listing's Posted date
+    todays_jobs = list(jobs.rows_first_seen_on(now.date(), canonical_only=True))
+    return stats, render_dashboard_md(stats, links), todays_jobs
 
-    # 5) Notion: upsert DB + infographic blocks
-    notion = Client(auth=cfg.notion_token)
-    upsert_jobs(notion, cfg.notion_db_id, merged)
+def publish_dashboard(notion, page_id: str, jobs: JobStore, now: datetime) -> Dict:
+    """Render the job store's dashboard and today's list onto the portfolio page. Returns the stats."""
+    stats, markdown, todays_jobs = dashboard_content(jobs, now)
+    update_portfolio_blocks(notion, page_id, markdown, todays_jobs)
+    return stats
 
-    # "today's list" = items harvested today; each line shows the listing's Posted date
-    today_iso = datetime.now(timezone.utc).date().isoformat()
-    todays_jobs = [r for r in merged if str(r.get("first_seen",""))[:10] == today_iso]
+def run(workers: int = 1):
+    """
+    One pass over sources/incoming.ndjson as a stage graph:
+
+        normalize --chunks--> archive --> columnar
+                                      --> stats --> portfolio
+        notion (drains the outbox while archive fills it)
+
+    Stages run on their own threads; each run ends with a per-stage timing report.
+    """
+    from .config import load  # settings (and .env) are read per run, not on import
+    cfg = load()
+    now = CLOCK.start(datetime.now(timezone.utc))
+    notion = RateLimitedNotion(auth=cfg.notion_token)
+    g = StageGraph()
+    chunks = g.channel(CHUNK_QUEUE)
+    archived = threading.Event()  # a chunk reached the job store (and its outbox)
+
+    # 1+2) Stream incoming (one JSON per line) through normalize, chunk by chunk
+    def read():
+        incoming = Path("sources/incoming.ndjson")
+        if workers > 1:
+            rows = iter_normalized_parallel(incoming, workers, now)
+        else:
+            rows = iter_normalized(incoming, now)
+        for chunk in chunked(rows, CHUNK_SIZE):
+            chunks.put(chunk)
+        chunks.close()
+
+    # 3) Archive: new jobs are appended to today's file; reposts of jobs already
+    #    archived (any day) are merged in place through the persistent index
+    def archive():
+        today_path = archive_path_for(now)
+        dedupe = DedupeIndex()
+        boot = dedupe.bootstrap()
+        if boot:
+            print(f"[info] Dedupe index: bootstrapped {boot} archived rows")
+        near = NearDupIndex()
+        # every merged row lands in the job store, which later stages read from;
+        # new and changed canonical rows are queued in its outbox for Notion
+        jobs = JobStore()
+        boot = jobs.bootstrap()
+        if boot:
+            print(f"[info] Job store: bootstrapped {boot} archived rows")
+        try:
+            for chunk in chunks:
+                # reposts of the same role under other ids share a canonical_id
+                jobs.upsert(dedupe.merge(near.assign(chunk), today_path))
+                archived.set()
+            # rows retired from past day files; the Parquet copy drops just those
+            journal = dedupe.pending_journal()
+        finally:
+            near.close()
+            dedupe.close()
+            jobs.close()
+            archived.set()
+        c = dedupe.counts
+        print(f"[info] Archive: +{c['new']} new, ~{c['updated']} updated, ={c['reposted']} reposted")
+        print(f"[info] Near-duplicates: {near.counts['duplicate']} rows folded into an earlier posting")
+        return journal
+
+    def parquet():
+        if not columnar.available():
+            return
+        # keep the Parquet copy current; unchanged day files are skipped by signature
+        archive_copy = columnar.ColumnarArchive()
+        archive_copy.apply_journal(g.results["archive"])
+        rewritten = archive_copy.compact()
+        print(f"[info] Columnar archive: rewrote {rewritten} day file(s)")
+
+    # 4) Notion: drain the outbox as archive chunks land, plus any entries an
+    #    interrupted run did not ack
+    def sync():
+        index = NotionIndex.load(cfg.notion_db_id)
+        counts = Counter()
+        with JobStore() as jobs:
+            refresh = True  # later drains see our own writes through the index
+            while True:
+                last = g.finished("archive").is_set()
+                if archived.wait(1.0):
+                    archived.clear()
+                g.check()
+                counts.update(drain_outbox(notion, cfg.notion_db_id, jobs, index=index, refresh=refresh))
+                refresh = False
+                if last:
+                    break
+        print(f"[ok] Notion: +{counts['created']} created, ~{counts['updated']} updated, "
+              f"={counts['unchanged']} unchanged, {counts['vibes']} vibe updates")
+
+    # 5) Stats across ALL history: trigger-kept totals plus indexed first_seen
+    #    range queries on the job store; no archive is re-read
+    def stats():
+        with JobStore() as jobs:
+            content = dashboard_content(jobs, now)
+        print(f"[info] Stats: {content[0]['total_roles']} roles total")
+        return content
+
+    def portfolio():
+        _, markdown, todays_jobs = g.results["stats"]
+        update_portfolio_blocks(notion, cfg.notion_portfolio_page_id, markdown, todays_jobs)
 
-    update_portfolio_blocks(notion, cfg.notion_portfolio_page_id, markdown, todays_jobs)
+    g.stage("normalize", read)
+    g.stage("archive", archive)
+    g.stage("notion", sync)
+    g.stage("columnar", parquet, after=["archive"])
+    g.stage("stats", stats, after=["archive"])
+    g.stage("portfolio", portfolio, after=["stats"])
+    try:
+        g.run()
+    finally:
+        notion.close()
+        print(g.report())
+    print(f"[info] Notion API: {notion.metrics_line()}")
 
     print("[ok] Pipeline finished.")
 
 if __name__ == "__main__":
-    run()
+    ap = argparse.ArgumentParser(description="Normalize, archive and sync today's jobs.")
+    ap.add_argument("--workers", type=int, default=1, help="Normalize on N processes (default 1).")
+    args = ap.parse_args()
+    run(workers=max(1, args.workers))
@@ -0,0 +1,153 @@
+"""
+Near-duplicate postings (the same role from Greenhouse, Lever, RemoteOK and
+aggregators under different external_ids).
+
+Each posting gets a MinHash signature over word 3-shingles of
+title + company + description. Signatures are split into LSH bands and
+stored in data/state/neardup.sqlite, so finding the postings that share a
+band with a new one is a few indexed lookups rather than a scan. Candidates
+whose estimated Jaccard similarity passes SIMILARITY join the existing
+cluster, and the cluster's canonical_id is the first posting seen in it.
+Clusters persist across runs, so tomorrow's aggregator copy of a role maps
+to the same canonical row.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NEARDUP_PATH = Path("data/state/neardup.sqlite")
+
+# Transient field carrying the raw description from normalize to assign().
+TEXT_KEY = "_neardup_text"
+
+NUM_PERM = 128
+BANDS = 16            # 16 bands x 8 rows: candidate pairs from ~0.7 similarity up
+SIMILARITY = 0.8      # estimated Jaccard needed to join a cluster
+SHINGLE = 3
+MIN_SHINGLES = 8      # title + company alone are too short to judge
+MAX_TOKENS = 2000
+
+_PRIME = (1 << 31) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    external_id  TEXT PRIMARY KEY,
+    canonical_id TEXT NOT NULL,
+    sig          BLOB              -- NULL when the posting was too short to sign
+);
+CREATE TABLE IF NOT EXISTS bands (
+    key          INTEGER NOT NULL, -- hash of (band number, band values)
+    external_id  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_key ON bands(key);
+"""
+
+
+def attach_text(row: Dict, raw: Dict) -> Dict:
+    """Carry the description normalize() drops along to the near-dup stage."""
+    if row:
+        row[TEXT_KEY] = raw.get("description") or raw.get("body") or ""
+    return row
+
+
+@lru_cache(maxsize=None)
+def _perms():
+    # numpy is imported on the first signature, not with the module
+    import numpy as np
+    rng = np.random.RandomState(20240611)  # fixed: signatures are persisted
+    a = rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+    b = rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+    return a, b
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    tokens = _TOKEN.findall((text or "").lower())[:MAX_TOKENS]
+    if len(tokens) < SHINGLE + MIN_SHINGLES - 1:
+        return None
+    import numpy as np
+    a, b = _perms()
+    th = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+    # combine consecutive token hashes into shingle hashes, reduced below the prime
+    sh = (th[:-2] * np.uint64(1000003) + th[1:-1] * np.uint64(8191) + th[2:]) % np.uint64(_PRIME)
+    sh = np.unique(sh)
+    return ((a[:, None] * sh[None, :] + b[:, None]) % np.uint64(_PRIME)).min(axis=1).astype(np.uint32)
+
+
+def _band_keys(sig: np.ndarray) -> List[int]:
+    rows = NUM_PERM // BANDS
+    keys = []
+    for b in range(BANDS):
+        h = hashlib.blake2b(sig[b * rows:(b + 1) * rows].tobytes(), digest_size=8, person=b"band%04d" % b)
+        keys.append(int.from_bytes(h.digest(), "big", signed=True))
+    return keys
+
+
+class NearDupIndex:
+    def __init__(self, path: Path = NEARDUP_PATH, similarity: float = SIMILARITY):
+        self.path = Path(path)
+        self.similarity = similarity
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(_SCHEMA)
+        self.counts = {"canonical": 0, "duplicate": 0}
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _match(self, sig: np.ndarray, keys: List[int]) -> Optional[str]:
+        import numpy as np
+        q = f"SELECT DISTINCT external_id FROM bands WHERE key IN ({','.join('?' * len(keys))})"
+        cands = [eid for (eid,) in self.db.execute(q, keys)]
+        best, best_sim = None, self.similarity
+        for i in range(0, len(cands), 500):
+            part = cands[i:i + 500]
+            q = f"SELECT canonical_id, sig FROM postings WHERE external_id IN ({','.join('?' * len(part))})"
+            for canonical, blob in self.db.execute(q, part):
+                sim = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == sig))
+                if sim >= best_sim:
+                    best, best_sim = canonical, sim
+        return best
+
+    def canonical_id(self, row: Dict, text: str = "") -> str:
+        """Cluster one normalized row; returns its canonical external_id."""
+        eid = row["external_id"]
+        known = self.db.execute("SELECT canonical_id FROM postings WHERE external_id = ?", (eid,)).fetchone()
+        if known:
+            return known[0]
+        sig = signature(" ".join([str(row.get("title") or ""), str(row.get("company") or ""), text or ""]))
+        canonical = eid
+        if sig is not None:
+            keys = _band_keys(sig)
+            canonical = self._match(sig, keys) or eid
+            self.db.executemany("INSERT INTO bands VALUES (?, ?)", [(k, eid) for k in keys])
+        self.db.execute("INSERT INTO postings VALUES (?, ?, ?)",
+                        (eid, canonical, sig.tobytes() if sig is not None else None))
+        return canonical
+
+    def assign(self, rows: Iterable[Dict]) -> List[Dict]:
+        """Set canonical_id on each row (dropping the carried text) and commit."""
+        out = []
+        for r in rows:
+            cid = self.canonical_id(r, r.pop(TEXT_KEY, ""))
+            r["canonical_id"] = cid
+            self.counts["canonical" if cid == r["external_id"] else "duplicate"] += 1
+            out.append(r)
+        self.db.commit()
+        return out
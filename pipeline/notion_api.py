@@ -0,0 +1,265 @@
+"""
+Shared, rate-limited Notion client.
+
+Wraps `notion_client.Client` so every call goes through one token bucket
+sized to Notion's limit (~3 requests/s averaged), retries 429/5xx/timeouts
+with jittered exponential backoff (honouring Retry-After), and can run calls
+concurrently on a small thread pool. Creates and appends (NON_IDEMPOTENT)
+are only retried when Notion rejected them outright, so a timeout cannot
+produce a duplicate page:
+
+    notion = RateLimitedNotion(auth=token)
+    notion.pages.update(page_id=..., properties=...)          # blocking
+    fut = notion.submit(notion.pages.create, parent=..., properties=...)
+    print(notion.metrics())
+
+Endpoints mirror the wrapped client (databases/pages/blocks/...), so code
+written against `Client` works unchanged.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+# httpx and notion_client are imported on first use (creating the client,
+# classifying an error), not with the module
+if TYPE_CHECKING:
+    from notion_client import Client
+
+NOTION_RPS = 3.0
+RETRY_STATUSES = {409, 429, 500, 502, 503, 504}
+# Calls that add something on every success: a timeout or 5xx may still have
+# been applied server-side, so they are only retried when Notion says the
+# request was rejected before it ran (rate limited / conflicting transaction).
+NON_IDEMPOTENT = {"pages.create", "databases.create", "blocks.children.append", "comments.create"}
+REJECTED_STATUSES = {409, 429}
+
+
+class TokenBucket:
+    def __init__(self, rate: float = NOTION_RPS, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NotionMetrics:
+    def __init__(self, window: int = 2000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.queued = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def _add(self, field: str, n: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def _observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = sorted(self._latencies)
+            out = {
+                "queue_depth": self.queued,
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+            }
+
+        def pct(p):
+            if not lat: return None
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1)
+        out["p50_ms"] = pct(0.50)
+        out["p95_ms"] = pct(0.95)
+        return out
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    headers = getattr(err, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(err: Exception, idempotent: bool = True) -> bool:
+    import httpx
+    from notion_client.errors import HTTPResponseError, RequestTimeoutError
+    if isinstance(err, HTTPResponseError):
+        return err.status in (RETRY_STATUSES if idempotent else REJECTED_STATUSES)
+    if not idempotent:
+        return isinstance(err, httpx.ConnectError)  # never reached the server
+    return isinstance(err, (RequestTimeoutError, httpx.TransportError))
+
+
+class _Endpoint:
+    """Attribute proxy: callables are routed through the owner's limiter."""
+
+    def __init__(self, owner: "RateLimitedNotion", target: Any, path: str = ""):
+        self._owner = owner
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._target, name)
+        path = f"{self._path}.{name}" if self._path else name
+        if callable(attr):
+            idempotent = path not in NON_IDEMPOTENT
+            def call(*args, **kwargs):
+                return self._owner._call(attr, idempotent, args, kwargs)
+            call.__name__ = name
+            return call
+        return _Endpoint(self._owner, attr, path)
+
+
+class RateLimitedNotion:
+    def __init__(
+        self,
+        auth: Optional[str] = None,
+        client: Optional[Client] = None,
+        rate: float = NOTION_RPS,
+        burst: Optional[float] = None,
+        workers: int = 8,
+        max_retries: int = 6,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+    ):
+        if client is None:
+            from notion_client import Client
+            client = Client(auth=auth)
+        self.client = client
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = NotionMetrics()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # --- mirrored endpoints
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name == "client":
+            raise AttributeError(name)
+        return _Endpoint(self, getattr(self.client, name), name)
+
+    # --- core
+    def call(self, fn: Callable, *args, **kwargs):
+        """Rate-limited call of an idempotent `fn`, retried on 429/5xx/timeouts."""
+        return self._call(fn, True, args, kwargs)
+
+    def _call(self, fn: Callable, idempotent: bool, args, kwargs):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.stats._add("in_flight")
+            t0 = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                self.stats._observe(time.monotonic() - t0)
+                return result
+            except Exception as e:
+                self.stats._observe(time.monotonic() - t0)
+                if not _is_retryable(e, idempotent) or attempt >= self.max_retries:
+                    self.stats._add("errors")
+                    raise
+                wait = _retry_after(e)
+                if wait is not None:
+                    # server-imposed cool-down applies to every thread
+                    self.bucket.pause(wait)
+                else:
+                    wait = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+                    time.sleep(wait)
+                attempt += 1
+                self.stats._add("retries")
+            finally:
+                self.stats._add("in_flight", -1)
+                self.stats._add("requests")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run `fn(*args, **kwargs)` on the worker pool. `fn` is typically one of
+        this client's endpoints (already limited) or a helper that calls them.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="notion")
+        self.stats._add("queued")
+
+        def run():
+            self.stats._add("queued", -1)
+            return fn(*args, **kwargs)
+        return self._pool.submit(run)
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.stats.snapshot()
+
+    def metrics_line(self) -> str:
+        m = self.metrics()
+        return " ".join(f"{k}={v}" for k, v in m.items())
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_now(fn: Callable, *args, **kwargs) -> Future:
+    """Completed Future for `fn(...)`; lets callers treat plain clients like pooled ones."""
+    fut: Future = Future()
+    try:
+        fut.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+def submit(notion, fn: Callable, *args, **kwargs) -> Future:
+    """`notion.submit(...)` when pooled, otherwise run inline."""
+    if isinstance(notion, RateLimitedNotion):
+        return notion.submit(fn, *args, **kwargs)
+    return run_now(fn, *args, **kwargs)
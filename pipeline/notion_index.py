@@ -0,0 +1,208 @@
+"""
+Local External ID -> page_id index for a Notion jobs database.
+
+The index is built once by paging through the whole database and persisted
+under data/state/, so later runs only pull pages edited since the last sync
+(Notion's `last_edited_time` filter) instead of querying per job. A full
+pull every FULL_REFRESH_EVERY forgets pages deleted on the Notion side.
+
+It also keeps a hash of every property we last wrote per External ID, so a
+writer can skip unchanged pages and send only the properties that changed.
+Pages first seen in a pull are hashed from the properties Notion returns,
+so an index rebuilt from scratch does not rewrite every page.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+STATE_DIR = Path("data/state")
+ID_PROP = "External ID"
+
+# Notion rounds last_edited_time down to the minute; re-read a small overlap
+# so edits made in the same minute as the previous sync are not missed.
+REFRESH_OVERLAP = timedelta(minutes=2)
+# databases.query never returns archived/trashed pages, so an incremental
+# pull cannot see deletions; a periodic full pull drops them.
+FULL_REFRESH_EVERY = timedelta(days=7)
+
+
+def _default_path(db_id: str) -> Path:
+    return STATE_DIR / f"notion_index_{db_id.replace('-', '')}.json"
+
+
+def _id_text(page: Dict, prop: str) -> str:
+    # the id property is the title, or a rich_text column
+    p = (page.get("properties") or {}).get(prop) or {}
+    return "".join(t.get("plain_text", "") for t in p.get("title") or p.get("rich_text") or []).strip()
+
+
+def prop_hashes(props: Dict, day_props: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Stable per-property hash of a Notion properties payload.
+    Date properties listed in `day_props` are hashed at day granularity so a
+    timestamp that moves within the same day does not count as a change.
+    """
+    day_props = set(day_props)
+    out = {}
+    for name, value in props.items():
+        if name in day_props:
+            start = ((value or {}).get("date") or {}).get("start")
+            value = {"date": {"start": str(start)[:10] if start else None}}
+        # Notion reads 120000.0 back as 120000, and an empty text run as []
+        kind = next(iter(value or {}), None)
+        if kind == "number" and isinstance(value[kind], float) and value[kind].is_integer():
+            value = {kind: int(value[kind])}
+        elif kind in ("title", "rich_text") and not _text(value[kind]):
+            value = {kind: []}
+        blob = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        out[name] = hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+    return out
+
+
+def _text(parts) -> str:
+    return "".join(t.get("plain_text", (t.get("text") or {}).get("content", "")) for t in parts or [])
+
+
+_WRITTEN_TYPES = ("title", "rich_text", "url", "checkbox", "number", "select", "multi_select", "date")
+
+
+def written_form(props: Dict) -> Dict:
+    """
+    Notion's read format of page properties, reduced to the payload shape a
+    writer sends (one text run, bare option names, date start only), so
+    prop_hashes() of both agree. Types we never write are left out.
+    """
+    out = {}
+    for name, p in props.items():
+        p = p or {}
+        kind = p.get("type") or next((k for k in _WRITTEN_TYPES if k in p), None)
+        if kind in ("title", "rich_text"):
+            text = _text(p[kind])
+            out[name] = {kind: [{"type": "text", "text": {"content": text}}] if text else []}
+        elif kind in ("url", "checkbox", "number"):
+            out[name] = {kind: p[kind]}
+        elif kind == "select":
+            if p["select"]:
+                out[name] = {"select": {"name": p["select"].get("name")}}
+        elif kind == "multi_select":
+            out[name] = {kind: [{"name": o.get("name")} for o in p[kind] or []]}
+        elif kind == "date":
+            start = (p["date"] or {}).get("start")
+            if start and "T" in start:
+                start = datetime.fromisoformat(start).astimezone(timezone.utc).isoformat()
+            out[name] = {"date": {"start": start}}
+    return out
+
+
+def changed_props(props: Dict, new_hashes: Dict[str, str], old_hashes: Optional[Dict[str, str]]) -> Dict:
+    """Subset of `props` whose hash differs from what was last written."""
+    if not old_hashes:
+        return dict(props)
+    return {k: v for k, v in props.items() if old_hashes.get(k) != new_hashes.get(k)}
+
+
+class NotionIndex:
+    def __init__(self, db_id: str, path: Optional[Path] = None, id_prop: str = ID_PROP):
+        self.db_id = db_id
+        self.path = Path(path) if path else _default_path(db_id)
+        self.id_prop = id_prop
+        self.pages: Dict[str, str] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.synced_at: Optional[str] = None
+        self.full_synced_at: Optional[str] = None
+
+    @classmethod
+    def load(cls, db_id: str, path: Optional[Path] = None, id_prop: str = ID_PROP) -> "NotionIndex":
+        idx = cls(db_id, path, id_prop)
+        if idx.path.exists():
+            try:
+                data = json.loads(idx.path.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            if data.get("db_id") == db_id:
+                idx.pages = data.get("pages") or {}
+                idx.hashes = data.get("hashes") or {}
+                idx.synced_at = data.get("synced_at")
+                idx.full_synced_at = data.get("full_synced_at")
+        return idx
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "db_id": self.db_id,
+            "synced_at": self.synced_at,
+            "full_synced_at": self.full_synced_at,
+            "pages": self.pages,
+            "hashes": self.hashes,
+        }), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def get(self, external_id: str) -> Optional[str]:
+        return self.pages.get(external_id)
+
+    def set(self, external_id: str, page_id: str):
+        self.pages[external_id] = page_id
+
+    def drop(self, external_id: str):
+        self.pages.pop(external_id, None)
+        self.hashes.pop(external_id, None)
+
+    def written(self, external_id: str, page_id: str, hashes: Dict[str, str]):
+        """Record a successful write of `hashes` (merged over what was there)."""
+        self.pages[external_id] = page_id
+        self.hashes[external_id] = {**self.hashes.get(external_id, {}), **hashes}
+
+    def refresh(self, notion, full: bool = False, day_props: Iterable[str] = ()) -> int:
+        """
+        Pull pages into the index. The first call, and one every
+        FULL_REFRESH_EVERY (or `full=True`), pages through the whole database
+        and forgets entries whose page is gone; the others only ask for pages
+        edited since the last sync. A page not in the index yet gets its
+        hashes from the pulled properties (`day_props` as for prop_hashes);
+        one whose page_id changed loses them. Returns the number of pages read.
+        """
+        started = datetime.now(timezone.utc)
+        if not full and self.full_synced_at:
+            full = started - datetime.fromisoformat(self.full_synced_at) >= FULL_REFRESH_EVERY
+        full = full or not self.synced_at or not self.full_synced_at
+        payload: Dict = {"database_id": self.db_id, "page_size": 100}
+        if not full:
+            since = datetime.fromisoformat(self.synced_at) - REFRESH_OVERLAP
+            payload["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": since.isoformat()},
+            }
+
+        seen = 0
+        live: Dict[str, str] = {}
+        while True:
+            resp = notion.databases.query(**payload)
+            for page in resp.get("results", []):
+                seen += 1
+                eid = _id_text(page, self.id_prop)
+                if not eid:
+                    continue
+                live[eid] = page["id"]
+                known = self.pages.get(eid)
+                if known is None:
+                    self.hashes[eid] = prop_hashes(written_form(page.get("properties") or {}), day_props)
+                elif known != page["id"]:
+                    # a page we did not write: its content is unknown to us
+                    self.hashes.pop(eid, None)
+                self.set(eid, page["id"])
+            cursor = resp.get("next_cursor")
+            if not resp.get("has_more") or not cursor:
+                break
+            payload["start_cursor"] = cursor
+
+        if full:
+            for eid in [e for e in self.pages if e not in live]:
+                self.drop(eid)
+            self.full_synced_at = started.isoformat()
+        self.synced_at = started.isoformat()
+        return seen
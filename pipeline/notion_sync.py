@@ -1,46 +1,194 @@
-from notion_client import Client
-from typing import Dict, List
+from __future__ import annotations
+import json
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 from datetime import datetime, timezone
-from dateutil import tz
+
+# notion_client is imported where it is used, not with the module
+if TYPE_CHECKING:
+    from notion_client import Client
+    from notion_client.errors import APIResponseError
+
+from .notion_api import submit
+from .notion_index import NotionIndex, prop_hashes, changed_props
 
 MARKER = "Jobs Dashboard (auto-updated)"
 
+# Re-stamped on every run; only a change of day is worth a write.
+DAY_GRANULAR_PROPS = ("First Seen", "Last Seen")
+
 def _iso(dt):
     if not dt: return None
     if isinstance(dt, str): return dt
     if isinstance(dt, datetime):
-        return dt.astimezone(tz.UTC).isoformat()
+        return dt.astimezone(timezone.utc).isoformat()
     return None
 
-def upsert_jobs(notion: Client, db_id: str, jobs: List[Dict]):
-    # One-by-one upsert by External ID (simple + robust)
-    for j in jobs:
-        eid = j["external_id"]
-        q = notion.databases.query(
-            database_id=db_id,
-            filter={"property":"External ID","title":{"equals":eid}}
-        )
-        page_id = q["results"][0]["id"] if q["results"] else None
-        props = {
-          "External ID": {"title": [{"type":"text","text":{"content": eid}}]},
-          "Company": {"rich_text":[{"type":"text","text":{"content": j.get("company","")}}]},
-          "Title": {"rich_text":[{"type":"text","text":{"content": j.get("title","")}}]},
-          "URL": {"url": j.get("url")},
-          "Location": {"rich_text":[{"type":"text","text":{"content": j.get("location","") or ""}}]},
-          "Remote": {"checkbox": bool(j.get("remote")) if j.get("remote") is not None else False},
-          "Posted": {"date": {"start": _iso(j.get("posted_at"))}},
-          "Salary Min": {"number": j.get("salary_min")},
-          "Salary Max": {"number": j.get("salary_max")},
-          "Currency": {"select": {"name": j.get("currency")}} if j.get("currency") else None,
-          "First Seen": {"date": {"start": _iso(j.get("first_seen"))}},
-          "Last Seen": {"date": {"start": _iso(j.get("last_seen"))}},
-        }
-        props = {k:v for k,v in props.items() if v is not None}
+def job_props(j: Dict) -> Dict:
+    eid = j["external_id"]
+    props = {
+      "External ID": {"title": [{"type":"text","text":{"content": eid}}]},
+      "Company": {"rich_text":[{"type":"text","text":{"content": j.get("company","")}}]},
+      "Title": {"rich_text":[{"type":"text","text":{"content": j.get("title","")}}]},
+      "URL": {"url": j.get("url")},
+      "Location": {"rich_text":[{"type":"text","text":{"content": j.get("location","") or ""}}]},
+      "Remote": {"checkbox": bool(j.get("remote")) if j.get("remote") is not None else False},
+      "Posted": {"date": {"start": _iso(j.get("posted_at"))}},
+      "Salary Min": {"number": j.get("salary_min")},
+      "Salary Max": {"number": j.get("salary_max")},
+      "Currency": {"select": {"name": j.get("currency")}} if j.get("currency") else None,
+      "First Seen": {"date": {"start": _iso(j.get("first_seen"))}},
+      "Last Seen": {"date": {"start": _iso(j.get("last_seen"))}},
+    }
+    return {k:v for k,v in props.items() if v is not None}
+
+def _page_gone(e: APIResponseError) -> bool:
+    # deleted pages 404; archived/trashed ones reject edits with a validation error
+    from notion_client.errors import APIErrorCode
+    if e.code == APIErrorCode.ObjectNotFound:
+        return True
+    return e.code == APIErrorCode.ValidationError and "archived" in str(e).lower()
+
+def upsert_jobs(notion: Client, db_id: str, jobs: List[Dict], index: Optional[NotionIndex] = None,
+                max_pending: int = 256, refresh: bool = True,
+                on_written: Optional[Callable[[str, str], None]] = None) -> Dict[str, int]:
+    """
+    Upsert by External ID using a local External ID -> page_id index.
+    The index is refreshed once per call (full pull the first time, then only
+    pages edited since the last sync), so each job costs at most one write.
+    Jobs whose properties hash the same as the last write are skipped, and
+    updates carry only the properties that changed.
+    With a RateLimitedNotion client, writes run concurrently on its pool;
+    at most `max_pending` are outstanding at a time.
+    `on_written(external_id, page_id)` is called for every job once its page
+    is known to be current (written or unchanged). Pass refresh=False when
+    the caller already refreshed `index`.
+    """
+    from notion_client.errors import APIResponseError
+    if index is None:
+        index = NotionIndex.load(db_id)
+    if refresh:
+        index.refresh(notion, day_props=DAY_GRANULAR_PROPS)
+
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    pending = {}  # future -> (op, eid, props sent, full props, hashes)
+
+    def create(eid, props, hashes):
+        fut = submit(notion, notion.pages.create, parent={"database_id": db_id}, properties=props)
+        pending[fut] = ("create", eid, props, props, hashes)
+
+    def settle(fut):
+        op, eid, sent, props, hashes = pending.pop(fut)
+        try:
+            page = fut.result()
+        except APIResponseError as e:
+            # page deleted or archived on the Notion side since we indexed it
+            if op != "update" or not _page_gone(e):
+                raise
+            index.drop(eid)
+            create(eid, props, hashes)
+            return
+        index.written(eid, page["id"], {k: hashes[k] for k in sent})
+        counts["created" if op == "create" else "updated"] += 1
+        if on_written:
+            on_written(eid, page["id"])
+
+    try:
+        for j in jobs:
+            eid = j["external_id"]
+            props = job_props(j)
+            hashes = prop_hashes(props, DAY_GRANULAR_PROPS)
+            page_id = index.get(eid)
+            if page_id:
+                delta = changed_props(props, hashes, index.hashes.get(eid))
+                if not delta:
+                    counts["unchanged"] += 1
+                    if on_written:
+                        on_written(eid, page_id)
+                    continue
+                fut = submit(notion, notion.pages.update, page_id=page_id, properties=delta)
+                pending[fut] = ("update", eid, delta, props, hashes)
+            else:
+                create(eid, props, hashes)
+            while len(pending) >= max_pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    settle(fut)
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                settle(fut)
+    finally:
+        index.save()
+    return counts
+
+def drain_outbox(notion: Client, db_id: str, store, batch: int = 500,
+                 index: Optional[NotionIndex] = None, refresh: bool = True) -> Dict[str, int]:
+    """
+    Write the job store's pending outbox entries to Notion, oldest first, in
+    batches of `batch`. 'job' entries upsert the stored row; 'vibe' entries
+    update the job's page with build_vibe_properties(). Every entry is acked
+    with its page_id as soon as its write settles, so a run that dies part
+    way leaves only the unwritten entries for the next one.
+    Callers draining repeatedly with one `index` (which tracks its own
+    writes) only need refresh=True on the first call.
+    """
+    from notion_client.errors import APIResponseError
+    if index is None:
+        index = NotionIndex.load(db_id)
+    if refresh:
+        index.refresh(notion, day_props=DAY_GRANULAR_PROPS)
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "vibes": 0, "skipped": 0}
+
+    while True:
+        entries = store.pending(batch)
+        if not entries:
+            break
+        acks = []
+        try:
+            jobs = [(seq, eid) for seq, eid, kind, _ in entries if kind == "job"]
+            rows = store.rows(eid for _, eid in jobs)
+            seqs = {}
+            for seq, eid in jobs:
+                if eid in rows:
+                    seqs.setdefault(eid, []).append(seq)
+                else:
+                    acks.append((seq, None, "not in job store"))
+
+            def written(eid, page_id):
+                acks.extend((seq, page_id, None) for seq in seqs.pop(eid, ()))
+
+            c = upsert_jobs(notion, db_id, [rows[eid] for eid in seqs], index=index,
+                            refresh=False, on_written=written)
+            for k, v in c.items():
+                counts[k] += v
 
-        if page_id:
-            notion.pages.update(page_id=page_id, properties=props)
-        else:
-            notion.pages.create(parent={"database_id": db_id}, properties=props)
+            # vibe entries come after the job writes, so their pages exist
+            updates = []
+            for seq, eid, kind, payload in entries:
+                if kind != "vibe":
+                    continue
+                page_id = index.get(eid)
+                props = build_vibe_properties(json.loads(payload or "{}"))
+                if not page_id or not props:
+                    acks.append((seq, page_id, "no page" if not page_id else "empty"))
+                    continue
+                updates.append((seq, page_id, submit(notion, notion.pages.update, page_id=page_id, properties=props)))
+            for seq, page_id, fut in updates:
+                try:
+                    fut.result()
+                except APIResponseError as e:
+                    if not _page_gone(e):
+                        raise
+                    acks.append((seq, page_id, "page gone"))
+                    continue
+                acks.append((seq, page_id, None))
+                counts["vibes"] += 1
+            counts["skipped"] += sum(1 for _, _, err in acks if err)
+        finally:
+            store.ack(acks)
+    store.prune_outbox()
+    return counts
 
 def update_portfolio_blocks(notion: Client, page_id: str, markdown_summary: str, todays_jobs: List[Dict]):
     """
@@ -52,6 +200,7 @@ def update_portfolio_blocks(notion: Client, page_id: str, markdown_summary: str,
     """
     # delete prior blocks that contain the marker
     blocks = notion.blocks.children.list(block_id=page_id)["results"]
+    deletes = []
     for b in blocks:
         plain = ""
         t = b["type"]
@@ -59,7 +208,9 @@ def update_portfolio_blocks(notion: Client, page_id: str, markdown_summary: str,
         if t in ("callout","paragraph","heading_2","toggle","bulleted_list_item"):
             rich = b[t].get("rich_text")
         if rich and len(rich)>0 and MARKER in (rich[0].get("plain_text") or ""):
-            notion.blocks.delete(block_id=b["id"])
+            deletes.append(submit(notion, notion.blocks.delete, block_id=b["id"]))
+    for fut in deletes:
+        fut.result()
 
     # Build new content
     callout = {
@@ -0,0 +1,104 @@
+"""
+Multiprocess normalize for large incoming batches.
+
+The input file is cut into byte ranges aligned to line starts; each worker
+process normalizes its ranges into a shard file and the parent streams the
+shard files back in input order, so output order is the same as a serial run.
+"""
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from .codec import get_codec
+from .io_utils import iter_ndjson, dumps
+
+SHARDS_PER_WORKER = 4
+
+# the archive codec's loads, resolved once per worker by _init_worker()
+_loads = None
+
+
+def shard_ranges(path: Path, shards: int) -> List[Tuple[int, int]]:
+    """Split `path` into up to `shards` [start, end) byte ranges on line boundaries."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    cuts = [0]
+    with open(path, "rb") as f:
+        for i in range(1, shards):
+            pos = size * i // shards
+            if pos <= cuts[-1]:
+                continue
+            f.seek(pos - 1)
+            f.readline()  # finish the line that straddles the cut
+            cut = f.tell()
+            if cut >= size:
+                break
+            if cut > cuts[-1]:
+                cuts.append(cut)
+    cuts.append(size)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _init_worker():
+    # compile keywords.yml and pick the JSON codec once per worker process,
+    # before its first shard
+    global _loads
+    from .keywords import tagger
+    tagger()
+    _loads = get_codec().loads
+
+
+def _normalize_shard(args) -> Dict:
+    idx, path, start, end, out_dir, now_iso = args
+    from .transform import normalize
+    from .neardup import attach_text
+    now = datetime.fromisoformat(now_iso)
+    stats = {"shard": idx, "ok": 0, "rejected": 0, "malformed": 0}
+    out_path = Path(out_dir) / f"shard-{idx:05d}.ndjson"
+    with open(path, "rb") as src, open(out_path, "w", encoding="utf-8") as out:
+        src.seek(start)
+        while src.tell() < end:
+            line = src.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = _loads(line)
+            except ValueError:
+                stats["malformed"] += 1
+                continue
+            row = normalize(raw, now=now) if isinstance(raw, dict) else {}
+            if not row:
+                stats["rejected"] += 1
+                continue
+            out.write(dumps(attach_text(row, raw)) + "\n")
+            stats["ok"] += 1
+    stats["out"] = str(out_path)
+    return stats
+
+
+def iter_normalized_parallel(path: Path, workers: int, now: datetime) -> Iterator[Dict]:
+    """
+    Normalize `path` on `workers` processes; yields rows in input order.
+    Prints one line per shard with its ok/rejected/malformed counts.
+    """
+    from multiprocessing import Pool
+    path = Path(path)
+    if not path.exists():
+        return
+    ranges = shard_ranges(path, workers * SHARDS_PER_WORKER)
+    with tempfile.TemporaryDirectory(prefix=".normalize-", dir=path.parent) as tmp:
+        tasks = [(i, str(path), a, b, tmp, now.isoformat()) for i, (a, b) in enumerate(ranges)]
+        with Pool(processes=workers, initializer=_init_worker) as pool:
+            # imap keeps input order and lets us stream shard 0 while others run
+            for stats in pool.imap(_normalize_shard, tasks):
+                print(f"[info] shard {stats['shard']}: {stats['ok']} ok, "
+                      f"{stats['rejected']} rejected, {stats['malformed']} malformed")
+                out = Path(stats["out"])
+                yield from iter_ndjson(out)
+                out.unlink()
@@ -0,0 +1,215 @@
+"""
+Compact in-memory batches of archive rows.
+
+A list of row dicts costs a dict, a key table and a fresh str per field for
+every job. JobColumns keeps a batch as one column per field instead:
+
+  - title, company, location, currency, source and the timestamps are
+    interned, so a company or a run's first_seen seen 10,000 times is
+    stored once;
+  - salaries sit in array('d') (NaN for missing) and remote in a bytearray;
+  - keyword lists become shared tuples, one per distinct set;
+  - canonical_id is only stored when it differs from external_id.
+
+Rows go in and come out in their on-disk form (what io_utils.dumps writes
+and iter_ndjson reads back), so row(i) equals the decoded archive line.
+Fields outside FIELDS, fields a row lacks and values a column cannot hold
+(an int salary, say) are kept per row in `extra`. Validation is
+normalize()'s job (pydantic at ingest); this only holds rows that passed it.
+"""
+import math
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .codec import json_default
+
+FIELDS = ("external_id", "title", "company", "location", "remote", "url", "posted_at",
+          "salary_min", "salary_max", "currency", "keywords", "source", "first_seen", "last_seen",
+          "canonical_id")
+INTERNED = ("title", "company", "location", "currency", "source", "posted_at", "first_seen", "last_seen")
+FLOATS = ("salary_min", "salary_max")
+_FIELD_SET = frozenset(FIELDS)
+_REMOTE = {False: 0, True: 1, None: 2}  # remote column codes
+_REMOTE_OUT = (False, True, None)
+_MISSING = object()
+
+
+def _text(v):
+    if v is None or v.__class__ is str:
+        return v
+    return json_default(v)  # datetimes and dates, as io_utils.dumps writes them
+
+
+def _intern(v):
+    if v.__class__ is str:
+        return sys.intern(v)
+    return None if v is None else sys.intern(_text(v))
+
+
+class JobColumns:
+    __slots__ = ("external_id", "url", "canonical_id", "remote", "keywords", "extra", "_tuples") + INTERNED + FLOATS
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        self.external_id: List[str] = []
+        self.url: List[Optional[str]] = []
+        self.canonical_id: List[Optional[str]] = []  # None: same as external_id
+        for name in INTERNED:
+            setattr(self, name, [])
+        for name in FLOATS:
+            setattr(self, name, array("d"))
+        self.remote = bytearray()
+        self.keywords: List[Optional[tuple]] = []
+        self.extra: Dict[int, Dict] = {}
+        self._tuples: Dict[tuple, tuple] = {}
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self.external_id)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self.row(i) for i in range(len(self)))
+
+    def extend(self, rows: Iterable[Dict]):
+        for r in rows:
+            self.append(r)
+
+    def append(self, r: Dict):
+        i = len(self.external_id)
+        # archive rows carry exactly FIELDS; anything else is noted in `extra`
+        extra = {} if r.keys() == _FIELD_SET else self._odd_keys(r)
+        get = r.get
+
+        eid = _text(get("external_id"))
+        self.external_id.append(eid)
+        cid = get("canonical_id")
+        self.canonical_id.append(None if cid is None or cid == eid else _text(cid))
+        if cid is None and "canonical_id" in r:
+            extra["canonical_id"] = None
+        self.url.append(_text(get("url")))
+
+        self.title.append(_intern(get("title")))
+        self.company.append(_intern(get("company")))
+        self.location.append(_intern(get("location")))
+        self.currency.append(_intern(get("currency")))
+        self.source.append(_intern(get("source")))
+        self.posted_at.append(_intern(get("posted_at")))
+        self.first_seen.append(_intern(get("first_seen")))
+        self.last_seen.append(_intern(get("last_seen")))
+
+        v = get("salary_min")
+        if v.__class__ is float and v == v:
+            self.salary_min.append(v)
+        else:
+            self.salary_min.append(math.nan)
+            if v is not None:
+                extra["salary_min"] = v  # ints, NaN, strings: kept as they are
+        v = get("salary_max")
+        if v.__class__ is float and v == v:
+            self.salary_max.append(v)
+        else:
+            self.salary_max.append(math.nan)
+            if v is not None:
+                extra["salary_max"] = v
+
+        v = get("remote")
+        if v is None or v.__class__ is bool:
+            self.remote.append(_REMOTE[v])
+        else:
+            extra["remote"] = v
+            self.remote.append(2)
+
+        kws = get("keywords")
+        if kws.__class__ is list and all(k.__class__ is str for k in kws):
+            t = tuple(kws)
+            shared = self._tuples.get(t)
+            if shared is None:
+                shared = self._tuples[t] = tuple(map(sys.intern, kws))
+            self.keywords.append(shared)
+        else:
+            if kws is not None:
+                extra["keywords"] = kws
+            self.keywords.append(None)
+
+        if extra:
+            self.extra[i] = extra
+
+    @staticmethod
+    def _odd_keys(r: Dict) -> Dict:
+        extra = {k: v for k, v in r.items() if k not in _FIELD_SET}
+        for k in FIELDS:
+            if k not in r:
+                extra[k] = _MISSING
+        return extra
+
+    def row(self, i: int) -> Dict:
+        kws = self.keywords[i]
+        lo = self.salary_min[i]
+        hi = self.salary_max[i]
+        out = {
+            "external_id": self.external_id[i],
+            "title": self.title[i],
+            "company": self.company[i],
+            "location": self.location[i],
+            "remote": _REMOTE_OUT[self.remote[i]],
+            "url": self.url[i],
+            "posted_at": self.posted_at[i],
+            "salary_min": None if lo != lo else lo,
+            "salary_max": None if hi != hi else hi,
+            "currency": self.currency[i],
+            "keywords": list(kws) if kws is not None else None,
+            "source": self.source[i],
+            "first_seen": self.first_seen[i],
+            "last_seen": self.last_seen[i],
+            "canonical_id": self.canonical_id[i] or self.external_id[i],
+        }
+        extra = self.extra.get(i)
+        if extra:
+            for k, v in extra.items():
+                if v is _MISSING:
+                    del out[k]
+                else:
+                    out[k] = v
+        return out
+
+    def column(self, name: str) -> List:
+        """One field for every row, as row(i)[name] would give it (None when absent)."""
+        if name in INTERNED or name in ("external_id", "url"):
+            out = list(getattr(self, name))
+        elif name == "canonical_id":
+            out = [c or e for c, e in zip(self.canonical_id, self.external_id)]
+        elif name in FLOATS:
+            out = [None if v != v else v for v in getattr(self, name)]
+        elif name == "remote":
+            out = [_REMOTE_OUT[b] for b in self.remote]
+        elif name == "keywords":
+            out = [list(k) if k is not None else None for k in self.keywords]
+        else:
+            out = [None] * len(self)
+        for i, extra in self.extra.items():
+            if name in extra:
+                v = extra[name]
+                out[i] = None if v is _MISSING else v
+        return out
+
+    def floats(self, name: str):
+        """A salary column as a float64 numpy array (NaN for missing), without copying."""
+        import numpy as np
+        if any(name in e for e in self.extra.values()):
+            import pandas as pd
+            vals = pd.Series(self.column(name), dtype=object)
+            return pd.to_numeric(vals, errors="coerce").to_numpy(dtype=float)
+        return np.frombuffer(getattr(self, name), dtype=float)
+
+    def frame(self, columns: Sequence[str] = FIELDS):
+        """pandas DataFrame of `columns`, e.g. stats.DASHBOARD_COLUMNS for compute_dashboard_frame."""
+        import pandas as pd
+        data = {}
+        for name in columns:
+            if name in FLOATS:
+                data[name] = self.floats(name)
+            elif name == "remote":
+                data[name] = pd.array(self.column(name), dtype="boolean")
+            else:
+                data[name] = self.column(name)
+        return pd.DataFrame(data, columns=list(columns))
@@ -0,0 +1,365 @@
+"""
+Long-running sync daemon: `python -m pipeline serve`.
+
+Instead of a cron job re-running the whole pipeline, one process keeps its
+imports, SQLite handles and Notion client warm and moves rows through the
+stages as they arrive:
+
+    watch -> normalize -> archive -> enrich -> (job store outbox) -> notion
+
+The watcher tails sources/incoming.ndjson and picks up *.ndjson files
+dropped into sources/spool/ (write them elsewhere, then rename them in).
+Each stage runs on its own thread and hands off through a bounded queue, so
+a slow stage makes the ones upstream block instead of buffering without
+limit. Archived rows reach the outbox right away and the Notion stage is
+woken to drain it.
+
+How far each source has been read is saved in data/state/serve.json only
+once its rows are archived, so a restart neither skips nor re-reads lines;
+a spool file is deleted once archived. SIGINT/SIGTERM stop reading, finish
+what is queued and drain the outbox one last time.
+"""
+import json
+import queue
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .io_utils import archive_path_for
+from .transform import normalize
+from .dedupe import DedupeIndex
+from .neardup import NearDupIndex, attach_text
+from .job_store import JobStore
+from .notion_api import RateLimitedNotion
+from .notion_index import NotionIndex
+from .notion_sync import drain_outbox
+from .main import publish_dashboard
+from . import columnar
+
+INCOMING = Path("sources/incoming.ndjson")
+SPOOL_DIR = Path("sources/spool")
+SERVE_STATE = Path("data/state/serve.json")
+
+QUEUE_SIZE = 10000      # items a stage queue holds before its producer blocks
+BATCH = 500             # rows archived / enriched per step
+LINGER = 1.0            # seconds a partial batch waits for more rows
+POLL = 1.0              # seconds between looks at idle sources
+REFRESH_EVERY = 300.0   # Parquet copy and portfolio dashboard, at most this often
+RETRY_AFTER = 30.0      # pause after a failed Notion drain
+STATUS_EVERY = 60.0
+
+_STOP = object()        # end of a stage's input
+_EOF = object()         # a spool file has been read to the end
+
+Item = Tuple[str, int, int, object]  # source path, inode, offset after the line, payload
+
+
+class Daemon:
+    def __init__(self, incoming: Path = INCOMING, spool: Path = SPOOL_DIR, enrich: bool = True,
+                 queue_size: int = QUEUE_SIZE, batch: int = BATCH, linger: float = LINGER,
+                 poll: float = POLL, refresh_every: float = REFRESH_EVERY, state_path: Path = SERVE_STATE):
+        from .config import load
+        self.cfg = load()
+        self.incoming = Path(incoming)
+        self.spool = Path(spool)
+        self.enrich = enrich
+        self.batch = batch
+        self.linger = linger
+        self.poll = poll
+        self.refresh_every = refresh_every
+        self.state_path = Path(state_path)
+
+        self.stop = threading.Event()           # stop reading; finish what is queued
+        self.abort = threading.Event()          # a stage failed; everyone exits now
+        self.upstream_done = threading.Event()  # nothing more will reach the outbox
+        self.wake = threading.Event()           # the outbox has new entries
+        self.wake.set()                         # entries an earlier process left behind
+        self.errors: List[BaseException] = []
+
+        self.raw_q: queue.Queue = queue.Queue(queue_size)
+        self.norm_q: queue.Queue = queue.Queue(queue_size)
+        self.enrich_q: queue.Queue = queue.Queue(queue_size)
+        self.counts = {"read": 0, "archived": 0, "enriched": 0, "synced": 0}
+
+        self.offsets: Dict[str, Dict] = self._load_state()  # owned by the archive stage
+        self._pos = {k: dict(v) for k, v in self.offsets.items()}  # owned by the watcher
+        self._finished = set()  # spool files read to the end, waiting to be archived
+        self._threads: List[threading.Thread] = []
+
+    # ---- plumbing ---------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.offsets), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up (returns False) if the daemon aborts."""
+        while not self.abort.is_set():
+            try:
+                q.put(item, timeout=self.poll)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _batch(self, q: queue.Queue) -> Tuple[List, bool]:
+        """
+        Up to self.batch items, waiting at most `linger` after the first one.
+        Returns (items, done); an idle queue returns ([], False) after `poll`.
+        """
+        items, deadline = [], None
+        while len(items) < self.batch and not self.abort.is_set():
+            timeout = self.poll if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.linger
+        return items, self.abort.is_set()
+
+    def _spawn(self, name: str, fn):
+        def run():
+            try:
+                fn()
+            except BaseException as e:
+                self.errors.append(e)
+                print(f"[err] serve: {name} stage failed: {e!r}")
+                self.abort.set()
+                self.stop.set()
+        t = threading.Thread(target=run, name=f"serve-{name}", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    # ---- stages -----------------------------------------------------------------
+
+    def _tail(self, path: Path, spool: bool) -> bool:
+        """Queue the complete lines added to `path` since the last look. Returns True if any were."""
+        key = str(path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        pos = self._pos.get(key)
+        if pos is None or pos["ino"] != st.st_ino or st.st_size < pos["offset"]:
+            pos = self._pos[key] = {"ino": st.st_ino, "offset": 0}  # new, replaced or truncated
+        read = False
+        if st.st_size > pos["offset"]:
+            with open(path, "rb") as f:
+                f.seek(pos["offset"])
+                for raw in f:
+                    # incoming.ndjson may be mid-write; spool files arrive complete
+                    if not raw.endswith(b"\n") and not spool:
+                        break
+                    pos["offset"] += len(raw)
+                    try:
+                        row = json.loads(raw) if raw.strip() else None
+                    except ValueError:
+                        row = None
+                    if not self._put(self.raw_q, (key, pos["ino"], pos["offset"], row)):
+                        return False
+                    read = True
+                    self.counts["read"] += 1
+                    if self.stop.is_set():
+                        return read
+        if spool and pos["offset"] >= st.st_size:
+            self._finished.add(key)
+            self._put(self.raw_q, (key, pos["ino"], pos["offset"], _EOF))
+        return read
+
+    def _watch(self):
+        while not self.stop.is_set():
+            for key in [k for k in self._finished if not Path(k).exists()]:
+                # archived and deleted; a new file may take its name (and inode)
+                self._finished.discard(key)
+                self._pos.pop(key, None)
+            busy = self._tail(self.incoming, spool=False)
+            if self.spool.is_dir():
+                for p in sorted(self.spool.glob("*.ndjson")):
+                    if str(p) not in self._finished and not self.stop.is_set():
+                        busy |= self._tail(p, spool=True)
+            if not busy:
+                self.stop.wait(self.poll)
+        self._put(self.raw_q, _STOP)
+
+    def _normalize(self):
+        while True:
+            try:
+                item = self.raw_q.get(timeout=self.poll)
+            except queue.Empty:
+                if self.abort.is_set():
+                    return
+                continue
+            if item is _STOP:
+                break
+            key, ino, offset, raw = item
+            if isinstance(raw, dict):
+                row = normalize(raw, now=datetime.now(timezone.utc))
+                raw = attach_text(row, raw) if row else None
+            if not self._put(self.norm_q, (key, ino, offset, raw)):
+                return
+        self._put(self.norm_q, _STOP)
+
+    def _archive(self):
+        dedupe, near, jobs = DedupeIndex(), NearDupIndex(), JobStore()
+        dedupe.bootstrap()
+        jobs.bootstrap()
+        parquet = columnar.ColumnarArchive() if columnar.available() else None
+        refreshed = time.monotonic()
+        try:
+            done = False
+            while not done:
+                items, done = self._batch(self.norm_q)
+                rows = [r for *_, r in items if isinstance(r, dict)]
+                if rows:
+                    known = jobs.known(r["external_id"] for r in rows)
+                    merged = dedupe.merge(near.assign(rows), archive_path_for(datetime.now(timezone.utc)))
+                    jobs.upsert(merged)
+                    self.counts["archived"] += len(merged)
+                    self.wake.set()
+                    if self.enrich:
+                        for r in merged:
+                            eid = r["external_id"]
+                            if eid not in known and r.get("canonical_id", eid) == eid:
+                                job = {"external_id": eid, "company": r.get("company"), "url": r.get("url")}
+                                if not self._put(self.enrich_q, job):
+                                    return
+                if items:
+                    self._checkpoint(items)
+                if parquet and (done or time.monotonic() - refreshed >= self.refresh_every):
+                    parquet.apply_journal(dedupe.pending_journal())
+                    parquet.compact()
+                    refreshed = time.monotonic()
+        finally:
+            near.close()
+            dedupe.close()
+            jobs.close()
+        if self.enrich:
+            self._put(self.enrich_q, _STOP)
+        else:
+            self.upstream_done.set()
+            self.wake.set()
+
+    def _checkpoint(self, items: List[Item]):
+        gone = []
+        for key, ino, offset, payload in items:
+            if payload is _EOF:
+                gone.append(key)
+            else:
+                self.offsets[key] = {"ino": ino, "offset": offset}
+        for key in gone:
+            Path(key).unlink(missing_ok=True)
+            self.offsets.pop(key, None)
+        self._save_state()
+
+    def _enrich(self):
+        from .enrichment.vibe import enrich_many  # httpx, lxml, tldextract: only when enriching
+        jobs = JobStore()
+        try:
+            done = False
+            while not done:
+                items, done = self._batch(self.enrich_q)
+                if not items:
+                    continue
+                for job, res in zip(items, enrich_many(items)):
+                    if isinstance(res, Exception):
+                        print(f"[warn] serve: vibe:{res.__class__.__name__} for {job['external_id']}")
+                        continue
+                    jobs.enqueue(job["external_id"], "vibe", res)
+                    self.counts["enriched"] += 1
+                self.wake.set()
+        finally:
+            jobs.close()
+        self.upstream_done.set()
+        self.wake.set()
+
+    def _sync(self):
+        notion = RateLimitedNotion(auth=self.cfg.notion_token)
+        index = NotionIndex.load(self.cfg.notion_db_id)
+        jobs = JobStore()
+        dirty, published, refreshed = False, 0.0, None
+        try:
+            while not self.abort.is_set():
+                last = self.upstream_done.is_set()
+                if not self.wake.wait(self.poll) and not last:
+                    continue
+                self.wake.clear()
+                # the index tracks our own writes; re-read Notion's side now and then
+                refresh = refreshed is None or time.monotonic() - refreshed >= self.refresh_every
+                try:
+                    c = drain_outbox(notion, self.cfg.notion_db_id, jobs, index=index, refresh=refresh)
+                except Exception as e:
+                    if last:
+                        raise
+                    # entries stay in the outbox; try again later
+                    print(f"[warn] serve: Notion sync failed, retrying in {RETRY_AFTER:.0f}s: {e!r}")
+                    self.abort.wait(RETRY_AFTER)
+                    self.wake.set()
+                    continue
+                if refresh:
+                    refreshed = time.monotonic()
+                n = c["created"] + c["updated"] + c["vibes"]
+                self.counts["synced"] += n
+                dirty = dirty or n > 0
+                if dirty and (last or time.monotonic() - published >= self.refresh_every):
+                    publish_dashboard(notion, self.cfg.notion_portfolio_page_id, jobs, datetime.now(timezone.utc))
+                    dirty, published = False, time.monotonic()
+                if last:
+                    break
+        finally:
+            jobs.close()
+            notion.close()
+
+    # ---- control ----------------------------------------------------------------
+
+    def status_line(self) -> str:
+        c = self.counts
+        return (f"read={c['read']} archived={c['archived']} enriched={c['enriched']} synced={c['synced']} "
+                f"queued raw={self.raw_q.qsize()} normalized={self.norm_q.qsize()} enrich={self.enrich_q.qsize()}")
+
+    def run(self):
+        self._spawn("notion", self._sync)
+        if self.enrich:
+            self._spawn("enrich", self._enrich)
+        self._spawn("archive", self._archive)
+        self._spawn("normalize", self._normalize)
+        self._spawn("watch", self._watch)
+        status = time.monotonic()
+        while any(t.is_alive() for t in self._threads):
+            for t in self._threads:
+                t.join(timeout=0.5)
+            if time.monotonic() - status >= STATUS_EVERY:
+                print(f"[info] serve: {self.status_line()}")
+                status = time.monotonic()
+        if self.errors:
+            raise self.errors[0]
+
+
+def serve(**kwargs):
+    """Run the daemon until SIGINT/SIGTERM (see Daemon for the options)."""
+    daemon = Daemon(**kwargs)
+
+    def stop(signum, frame):
+        print(f"[info] serve: signal {signum}, finishing queued work")
+        daemon.stop.set()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, stop)
+    print(f"[info] serve: watching {daemon.incoming} and {daemon.spool}/")
+    daemon.run()
+    print(f"[ok] serve stopped: {daemon.status_line()}")
@@ -0,0 +1,139 @@
+"""
+Small stage-graph runner.
+
+    g = StageGraph()
+    chunks = g.channel(4)
+    g.stage("read", lambda: produce(chunks))        # chunks.put(...); chunks.close()
+    g.stage("archive", lambda: consume(chunks))     # for chunk in chunks: ...
+    g.stage("stats", compute, after=["archive"])
+    g.run()                                         # re-raises the first failure
+    print(g.report())
+
+Each stage runs on its own thread. A stage starts once the stages named in
+`after` have finished; stages without dependencies start together and can
+stream to one another through bounded channels, so a fast producer blocks
+instead of buffering. Return values land in `g.results`. When a stage
+fails, stages waiting on it are skipped and channel calls in the running
+ones raise Cancelled, so nothing blocks forever.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_CLOSED = object()
+_TICK = 0.5
+
+
+class Cancelled(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class Channel:
+    def __init__(self, graph: "StageGraph", maxsize: int):
+        self._graph = graph
+        self._q: queue.Queue = queue.Queue(maxsize)
+
+    def put(self, item):
+        while True:
+            self._graph.check()
+            try:
+                self._q.put(item, timeout=_TICK)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        self.put(_CLOSED)
+
+    def __iter__(self):
+        while True:
+            self._graph.check()
+            try:
+                item = self._q.get(timeout=_TICK)
+            except queue.Empty:
+                continue
+            if item is _CLOSED:
+                return
+            yield item
+
+
+class StageGraph:
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Callable[[], Any], List[str]]] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._failed = threading.Event()
+        self._errors: List[Tuple[str, BaseException]] = []
+        self._t0 = 0.0
+        self._wall = 0.0
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Optional[Tuple[float, float]]] = {}
+
+    def stage(self, name: str, fn: Callable[[], Any], after: Iterable[str] = ()):
+        after = list(after)
+        for dep in after:
+            if dep not in self._stages:
+                raise ValueError(f"stage {name!r} depends on unknown stage {dep!r}")
+        self._stages[name] = (fn, after)
+        self._done[name] = threading.Event()
+
+    def channel(self, maxsize: int) -> Channel:
+        return Channel(self, maxsize)
+
+    def finished(self, name: str) -> threading.Event:
+        """Set once `name` has returned, failed or been skipped."""
+        return self._done[name]
+
+    def check(self):
+        """Raise Cancelled if any stage has failed; long loops in a stage call this."""
+        if self._failed.is_set():
+            raise Cancelled()
+
+    def _run_stage(self, name: str):
+        fn, after = self._stages[name]
+        for dep in after:
+            self._done[dep].wait()
+        if self._failed.is_set():
+            self.timings[name] = None
+            self._done[name].set()
+            return
+        start = time.perf_counter() - self._t0
+        try:
+            self.results[name] = fn()
+        except Cancelled:
+            pass
+        except BaseException as e:
+            self._errors.append((name, e))
+            self._failed.set()
+        finally:
+            self.timings[name] = (start, time.perf_counter() - self._t0)
+            self._done[name].set()
+
+    def run(self) -> Dict[str, Any]:
+        self._t0 = time.perf_counter()
+        threads = [threading.Thread(target=self._run_stage, args=(name,), name=f"stage-{name}", daemon=True)
+                   for name in self._stages]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._wall = time.perf_counter() - self._t0
+        if self._errors:
+            name, err = self._errors[0]
+            print(f"[err] stage {name} failed: {err!r}")
+            raise err
+        return self.results
+
+    def report(self) -> str:
+        """Per-stage wall time, when each ran, and the total against the serial sum."""
+        lines, busy = [], 0.0
+        for name in self._stages:
+            t = self.timings.get(name)
+            if t is None:
+                lines.append(f"[time] {name:<10} skipped")
+                continue
+            start, end = t
+            busy += end - start
+            lines.append(f"[time] {name:<10} {end - start:7.2f}s  ({start:.2f}s -> {end:.2f}s)")
+        lines.append(f"[time] {'total':<10} {self._wall:7.2f}s  (stages add up to {busy:.2f}s)")
+        return "\n".join(lines)
@@ -1,36 +1,46 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from collections import Counter
 from statistics import mean
 from datetime import datetime, timezone, timedelta
 
-def compute_dashboard(rows: List[Dict]) -> Dict:
-    now = datetime.now(timezone.utc)
+# Columns compute_dashboard looks at; everything else stays on disk
+DASHBOARD_COLUMNS = ["first_seen", "company", "title", "keywords", "remote", "salary_min", "salary_max"]
+
+# first_seen is stored as ISO string by our I/O helpers; handle both str/datetime
+def iso_date(v) -> str:
+    if not v: return ""
+    if isinstance(v, str): return v[:10]
+    try: return v.date().isoformat()
+    except Exception: return ""
+
+def salary_mid(r: Dict) -> Optional[float]:
+    lo = r.get("salary_min"); hi = r.get("salary_max")
+    if lo and hi: return (float(lo)+float(hi))/2.0
+    if lo: return float(lo)
+    if hi: return float(hi)
+    return None
+
+def most_common(counts: Counter, n: int) -> List:
+    # ties broken by key so every dashboard backend orders them the same way
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+def compute_dashboard(rows: List[Dict], now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.now(timezone.utc)
     today = now.date()
     last7 = now - timedelta(days=7)
 
     total = len(rows)
-    # first_seen is stored as ISO string by our I/O helpers; handle both str/datetime
-    def iso_date(v):
-        if not v: return ""
-        if isinstance(v, str): return v[:10]
-        try: return v.date().isoformat()
-        except Exception: return ""
     today_count = sum(1 for r in rows if iso_date(r.get("first_seen")) == str(today))
     last7_rows = [r for r in rows if iso_date(r.get("first_seen")) >= str(last7.date())]
 
-    companies = Counter([r.get("company") for r in last7_rows if r.get("company")]).most_common(5)
-    titles = Counter([r.get("title") for r in last7_rows if r.get("title")]).most_common(5)
-    keywords = Counter([kw for r in last7_rows for kw in (r.get("keywords") or [])]).most_common(10)
+    companies = most_common(Counter([r.get("company") for r in last7_rows if r.get("company")]), 5)
+    titles = most_common(Counter([r.get("title") for r in last7_rows if r.get("title")]), 5)
+    keywords = most_common(Counter([kw for r in last7_rows for kw in (r.get("keywords") or [])]), 10)
 
     remotes = sum(1 for r in rows if r.get("remote") is True)
     onsite  = sum(1 for r in rows if r.get("remote") is False)
 
-    pays = []
-    for r in rows:
-        lo = r.get("salary_min"); hi = r.get("salary_max")
-        if lo and hi: pays.append((float(lo)+float(hi))/2.0)
-        elif lo: pays.append(float(lo))
-        elif hi: pays.append(float(hi))
+    pays = [p for p in map(salary_mid, rows) if p is not None]
     avg_pay = round(mean(pays), 2) if pays else None
 
     return {
@@ -45,6 +55,65 @@ def compute_dashboard(rows: List[Dict]) -> Dict:
         "today_date": str(today),
     }
 
+def _top(values, n: int) -> List:
+    vc = values.value_counts()
+    order = sorted(zip(vc.index, vc.to_numpy()), key=lambda kv: (-kv[1], kv[0]))
+    return [(k, int(v)) for k, v in order[:n]]
+
+def compute_dashboard_frame(df, now: Optional[datetime] = None) -> Dict:
+    """
+    compute_dashboard on a pandas DataFrame (one row per job, at least
+    DASHBOARD_COLUMNS); same result, but each column is processed once with
+    array ops instead of per-row Python.
+    """
+    import numpy as np
+    import pandas as pd
+    now = now or datetime.now(timezone.utc)
+    today = now.date()
+    since = (now - timedelta(days=7)).date()
+
+    fs = df["first_seen"]
+    if pd.api.types.is_datetime64_any_dtype(fs):
+        day = fs.dt.floor("D")
+        is_today = (day == pd.Timestamp(today, tz=fs.dt.tz)).to_numpy(dtype=bool)
+        recent = (day >= pd.Timestamp(since, tz=fs.dt.tz)).to_numpy(dtype=bool)
+    else:
+        day = fs.astype("string").str.slice(0, 10)
+        is_today = (day == str(today)).fillna(False).to_numpy(dtype=bool)
+        recent = (day >= str(since)).fillna(False).to_numpy(dtype=bool)
+
+    last7 = df.loc[recent, ["company", "title", "keywords"]]
+    companies = last7["company"][last7["company"].notna() & (last7["company"] != "")]
+    titles = last7["title"][last7["title"].notna() & (last7["title"] != "")]
+    keywords = last7["keywords"].explode().dropna()
+
+    remote = df["remote"].astype("boolean")
+
+    lo = pd.to_numeric(df["salary_min"], errors="coerce").to_numpy(dtype=float)
+    hi = pd.to_numeric(df["salary_max"], errors="coerce").to_numpy(dtype=float)
+    lo_ok = ~np.isnan(lo) & (lo != 0)
+    hi_ok = ~np.isnan(hi) & (hi != 0)
+    mid = np.where(lo_ok & hi_ok, (lo + hi) / 2.0, np.where(lo_ok, lo, hi))
+    pays = mid[lo_ok | hi_ok]
+
+    return {
+        "total_roles": int(len(df)),
+        "today_count": int(is_today.sum()),
+        "remote_count": int(remote.eq(True).sum()),
+        "onsite_count": int(remote.eq(False).sum()),
+        "top_companies": _top(companies, 5),
+        "top_titles": _top(titles, 5),
+        "top_keywords": _top(keywords, 10),
+        "avg_salary": round(float(pays.mean()), 2) if len(pays) else None,
+        "today_date": str(today),
+    }
+
+def dashboard_from_columnar(archive=None, now: Optional[datetime] = None) -> Dict:
+    """compute_dashboard over the Parquet archive, decoding only DASHBOARD_COLUMNS."""
+    from .columnar import ColumnarArchive
+    archive = archive or ColumnarArchive()
+    return compute_dashboard_frame(archive.read(DASHBOARD_COLUMNS), now=now)
+
 def _pairs_to_text(pairs):
     if not pairs: return "—"
     return ", ".join([f"{k} ({v})" for k, v in pairs])
@@ -1,46 +1,40 @@
 from datetime import datetime, timezone
 from typing import Dict, Any, List
-from .schema import Job
-import yaml, re
-from dateutil import parser as dateparse
+from .keywords import tagger
+from . import dates
 
-NOW = datetime.now(timezone.utc)
+class RunClock:
+    """
+    The harvest time stamped on rows (first_seen/last_seen). A run calls
+    start() once so all of its rows share one instant; outside a run now()
+    is the current time, not the time the process was started.
+    """
+    def __init__(self):
+        self._at: datetime | None = None
 
-# Optional keyword rules for tagging (keywords.yml)
-try:
-    with open("keywords.yml","r",encoding="utf-8") as f:
-        RULES = yaml.safe_load(f) or []
-except Exception:
-    RULES = []
+    def start(self, at: datetime | None = None) -> datetime:
+        self._at = at or datetime.now(timezone.utc)
+        return self._at
 
+    def stop(self):
+        self._at = None
+
+    def now(self) -> datetime:
+        return self._at or datetime.now(timezone.utc)
+
+CLOCK = RunClock()
+
+# Optional keyword rules for tagging (keywords.yml), compiled on first use
+# and again whenever the file changes
 def tag_keywords(text: str) -> List[str]:
-    if not text: return []
-    t = text.lower()
-    tags = []
-    for r in RULES:
-        name = r.get("name"); terms = r.get("match") or []
-        if any(re.search(r"\b"+re.escape(term.lower())+r"\b", t) for term in terms):
-            tags.append(name)
-    seen=set(); out=[]
-    for k in tags:
-        if k not in seen:
-            seen.add(k); out.append(k)
-    return out
+    return tagger().tag(text)
 
-def _parse_posted_at(value) -> datetime | None:
-    if not value:
-        return None
-    # accept ISO strings, RFC, simple dates, or epoch seconds
-    try:
-        if isinstance(value, (int, float)):
-            return datetime.fromtimestamp(float(value), tz=timezone.utc)
-        if isinstance(value, str):
-            return dateparse.parse(value).astimezone(timezone.utc)
-    except Exception:
-        return None
-    return None
+def _parse_posted_at(value, source: str | None = None) -> datetime | None:
+    # accept ISO strings, RFC, simple dates, or epoch seconds (see dates.py)
+    return dates.parse(value, source)
 
-def normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
+def normalize(raw: Dict[str, Any], now: datetime | None = None) -> Dict[str, Any]:
+    from .schema import Job  # pydantic: imported with the first row, not the module
     external_id = (
         raw.get("external_id") or raw.get("id") or raw.get("leverId")
         or raw.get("greenhouseId") or raw.get("url")
@@ -57,6 +51,7 @@ def normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
 
     if not external_id or not title or not company:
         return {}
+    now = now or CLOCK.now()
 
     # Build a text blob for tagging
     desc = raw.get("description") or raw.get("body") or ""
@@ -69,13 +64,13 @@ def normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
         location=(str(location).strip() if location else None),
         remote=bool(remote) if remote is not None else None,
         url=url,
-        posted_at=_parse_posted_at(posted_at),
+        posted_at=_parse_posted_at(posted_at, raw.get("source")),
         salary_min=float(salary_min) if salary_min not in (None, "") else None,
         salary_max=float(salary_max) if salary_max not in (None, "") else None,
         currency=currency,
         keywords=tag_keywords(blob),
         source=raw.get("source"),
-        first_seen=NOW,   # harvest date
-        last_seen=NOW,
+        first_seen=now,   # harvest date
+        last_seen=now,
     )
     return job.model_dump()
@@ -1,8 +1,23 @@
 #!/usr/bin/env python3
+"""
+Backfill company vibes for every archived job, as a checkpointed job.
+
+Jobs stream out of the archive's day files in chunks; each chunk is enriched in
+parallel, queued in the job store's outbox and pushed to Notion before the
+next one starts. A cursor (file + byte offset) and each job's status live in
+data/state/backfill_vibe.sqlite, so after a crash
+
+    scripts/backfill_vibe.py --resume
+
+first retries the jobs that failed, then carries on from the cursor and
+skips jobs already done. `--shard i/n` takes every job whose external_id
+hashes to i mod n, so n machines can split one backfill.
+"""
 from __future__ import annotations
 
-import sys, json, glob
+import sys, json, argparse, sqlite3, time, zlib
 from pathlib import Path
+from typing import Iterator
 
 # --- Find project root (walk up until we see ./pipeline)
 def _find_project_root(start: Path) -> Path:
@@ -18,48 +33,192 @@ ROOT = _find_project_root(SCRIPT_DIR)
 sys.path.insert(0, str(ROOT))
 
 # --- Now safe to import project modules
-from pipeline.enrichment.vibe import enrich_vibe
-import pipeline.notion_sync as notion_sync
-
-# --- Resolve a usable push function regardless of its name
-def _resolve_push(ns):
-    for name in (
-        "push_jobs_to_notion",
-        "sync_jobs_to_notion",
-        "upsert_jobs_to_notion",
-        "create_or_update_jobs",
-        "write_jobs_to_notion",
-        "push",
-    ):
-        fn = getattr(ns, name, None)
-        if callable(fn):
-            return fn
-    raise ImportError(
-        "No Notion push function found. Define one of: "
-        "push_jobs_to_notion / sync_jobs_to_notion / upsert_jobs_to_notion / "
-        "create_or_update_jobs / write_jobs_to_notion / push"
-    )
-
-def iter_jobs():
-    for path in glob.glob(str(ROOT / "data/*.jsonl")):
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    yield json.loads(line)
-                except Exception:
-                    continue
+from pipeline.config import load
+from pipeline.enrichment.vibe import enrich_many
+from pipeline.codec import BUF, get_codec, open_read
+from pipeline.io_utils import ARCHIVE_ROOT, chunked, day_files
+from pipeline.job_store import JobStore
+from pipeline.notion_api import RateLimitedNotion
+from pipeline.notion_index import NotionIndex
+from pipeline.notion_sync import drain_outbox
+
+STATE_PATH = Path("data/state/backfill_vibe.sqlite")
+# Jobs enriched (and pushed) per checkpoint.
+CHUNK = 200
+# A job that failed this many times is left alone by --resume.
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursor (
+    shard       TEXT PRIMARY KEY,  -- "i/n"
+    file        TEXT NOT NULL,     -- day file the cursor is in
+    offset      INTEGER NOT NULL,  -- byte offset of the next unread line
+    mtime       REAL NOT NULL      -- that file's mtime when the cursor was saved
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    external_id TEXT PRIMARY KEY,
+    shard       TEXT NOT NULL,
+    status      TEXT NOT NULL,     -- 'done' | 'failed'
+    attempts    INTEGER NOT NULL,
+    error       TEXT,
+    job         TEXT,              -- JSON of a failed job, for the retry
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_failed ON jobs(shard) WHERE status = 'failed';
+"""
+
+
+def in_shard(external_id: str, shard: tuple[int, int]) -> bool:
+    i, n = shard
+    # crc32 is stable across processes and machines, unlike hash()
+    return zlib.crc32(external_id.encode("utf-8")) % n == i
+
+
+class Checkpoint:
+    """Cursor and per-job status of one shard's backfill."""
+
+    def __init__(self, shard: tuple[int, int], path: Path = STATE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.key = f"{shard[0]}/{shard[1]}"
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def reset(self):
+        with self.db:
+            self.db.execute("DELETE FROM cursor WHERE shard = ?", (self.key,))
+            self.db.execute("DELETE FROM jobs WHERE shard = ?", (self.key,))
+
+    def cursor(self) -> tuple[str, int, float] | None:
+        return self.db.execute("SELECT file, offset, mtime FROM cursor WHERE shard = ?", (self.key,)).fetchone()
+
+    def done(self, ids) -> set:
+        ids = list(ids)
+        marks = ",".join("?" * len(ids))
+        return {r[0] for r in self.db.execute(
+            f"SELECT external_id FROM jobs WHERE status = 'done' AND external_id IN ({marks})", ids)}
+
+    def failed(self) -> list[dict]:
+        rows = self.db.execute("SELECT job FROM jobs WHERE shard = ? AND status = 'failed' AND attempts < ?",
+                               (self.key, MAX_ATTEMPTS))
+        return [json.loads(r[0]) for r in rows]
+
+    def save(self, results: list[tuple[dict, str | None]], cursor: tuple[str, int, float] | None = None):
+        """Record each (job, error or None) and move the cursor, in one transaction."""
+        now = time.time()
+        with self.db:
+            for job, err in results:
+                self.db.execute(
+                    """INSERT INTO jobs(external_id, shard, status, attempts, error, job, updated_at)
+                       VALUES (?, ?, ?, 1, ?, ?, ?)
+                       ON CONFLICT(external_id) DO UPDATE SET
+                         status = excluded.status, attempts = attempts + 1,
+                         error = excluded.error, job = excluded.job, updated_at = excluded.updated_at""",
+                    (job["external_id"], self.key, "failed" if err else "done", err,
+                     json.dumps(job) if err else None, now))
+            if cursor is not None:
+                self.db.execute("INSERT OR REPLACE INTO cursor(shard, file, offset, mtime) VALUES (?, ?, ?, ?)",
+                                (self.key, *cursor))
+
+
+def iter_jobs(start: tuple[str, int, float] | None = None) -> Iterator[tuple[dict, tuple[str, int, float]]]:
+    """
+    Yield (job, position after its line) over the archive's day files,
+    oldest first, starting at `start`. A file rewritten since the cursor
+    was saved (the archive merges reposts in place) is read again from the
+    top; jobs already done are skipped by the caller. Offsets of .gz/.zst
+    day files count decompressed bytes.
+    """
+    loads = get_codec().loads
+    for path in day_files(ARCHIVE_ROOT):
+        name = path.relative_to(ARCHIVE_ROOT).as_posix()
+        if start and name < start[0]:
+            continue
+        mtime = path.stat().st_mtime
+        pos = start[1] if start and name == start[0] and mtime == start[2] else 0
+        with open_read(path) as f:
+            f.seek(pos)
+            for lines in iter(lambda: f.readlines(BUF), []):
+                for line in lines:
+                    pos += len(line)
+                    try:
+                        job = loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(job, dict):
+                        yield job, (name, pos, mtime)
+
 
 def main():
-    push = _resolve_push(notion_sync)
-    jobs = []
-    for job in iter_jobs():
-        try:
-            job.update(enrich_vibe(job))
-        except Exception as e:
-            job.setdefault("enrichment_errors", []).append(f"vibe:{e.__class__.__name__}")
-        jobs.append(job)
-    if jobs:
-        push(jobs)
+    ap = argparse.ArgumentParser(description="Enrich every archived job with company vibes and push them to Notion.")
+    ap.add_argument("--resume", action="store_true",
+                    help="Continue the last run: retry its failures, then go on from its cursor.")
+    ap.add_argument("--shard", default="0/1", help="Take only shard i of n, e.g. 2/4 (default 0/1).")
+    ap.add_argument("--chunk", type=int, default=CHUNK, help=f"Jobs per checkpoint (default {CHUNK}).")
+    args = ap.parse_args()
+    try:
+        i, n = (int(x) for x in args.shard.split("/"))
+        if not 0 <= i < n:
+            raise ValueError
+    except ValueError:
+        raise SystemExit(f"ERROR: --shard wants i/n with 0 <= i < n, got {args.shard!r}")
+    shard, size = (i, n), max(1, args.chunk)
+
+    cfg = load()
+    ckpt = Checkpoint(shard)
+    if not args.resume:
+        ckpt.reset()
+    notion = RateLimitedNotion(auth=cfg.notion_token)
+    index = NotionIndex.load(cfg.notion_db_id)
+    totals = {"done": 0, "failed": 0, "skipped": 0, "vibes": 0}
+
+    def run_chunk(store: JobStore, jobs: list[dict], refresh: bool):
+        # all jobs share one connection pool; companies are crawled concurrently.
+        # Vibes go through the job store's outbox, which survives a crash here.
+        results = []
+        for job, res in zip(jobs, enrich_many(jobs)):
+            if isinstance(res, Exception):
+                print(f"[err] vibe:{res.__class__.__name__} for {job['external_id']}")
+                results.append((job, f"{res.__class__.__name__}: {res}"))
+                continue
+            store.enqueue(job["external_id"], "vibe", res)
+            results.append((job, None))
+        c = drain_outbox(notion, cfg.notion_db_id, store, index=index, refresh=refresh)
+        totals["vibes"] += c["vibes"]
+        totals["skipped"] += c["skipped"]
+        for _, err in results:
+            totals["failed" if err else "done"] += 1
+        return results
+
+    refresh = True
+    try:
+        with JobStore() as store:
+            if args.resume:
+                retry = ckpt.failed()
+                if retry:
+                    print(f"[info] retrying {len(retry)} failed job(s)")
+                for jobs in chunked(retry, size):
+                    ckpt.save(run_chunk(store, jobs, refresh))
+                    refresh = False
+
+            start = ckpt.cursor() if args.resume else None
+            rows = ((job, pos) for job, pos in iter_jobs(start)
+                    if job.get("external_id") and in_shard(job["external_id"], shard))
+            for chunk in chunked(rows, size):
+                done = ckpt.done(job["external_id"] for job, _ in chunk)
+                jobs = [job for job, _ in chunk if job["external_id"] not in done]
+                results = run_chunk(store, jobs, refresh) if jobs else []
+                refresh = refresh and not jobs
+                ckpt.save(results, cursor=chunk[-1][1])
+                print(f"[info] {chunk[-1][1][0]}: {totals['done']} done, {totals['failed']} failed so far")
+    finally:
+        notion.close()
+        ckpt.close()
+    print(f"[ok] vibes: {totals['vibes']} written, {totals['skipped']} skipped, "
+          f"{totals['done']} enriched, {totals['failed']} failed to enrich")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized dashboard (stats.compute_dashboard_frame) against the
+row-by-row stats.compute_dashboard.
+
+Usage:
+  python3 scripts/bench_dashboard.py [--rows 1000000] [--seed 7]
+
+Checks parity first on a small set of awkward rows (missing/empty fields,
+datetime vs string first_seen, zero salaries, future dates), then on the
+generated rows both as NDJSON-style dicts and as a typed frame like the one
+the columnar archive returns. Any mismatch fails the run.
+"""
+from __future__ import annotations
+
+import argparse, random, sys, time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from pipeline.stats import DASHBOARD_COLUMNS, compute_dashboard, compute_dashboard_frame
+
+COMPANIES = [f"Company {i}" for i in range(400)]
+TITLES = ["Solutions Engineer", "Sales Engineer", "Backend Engineer", "Data Engineer", "SRE",
+          "Customer Success Manager", "Product Manager", "Support Engineer", "ML Engineer", "Frontend Engineer"]
+KEYWORDS = ["python", "aws", "kubernetes", "sql", "react", "sales", "api", "security", "ml", "go", "rust", "remote"]
+
+
+def synthetic_rows(n: int, now: datetime, rng: random.Random):
+    rows = []
+    for i in range(n):
+        fs = now - timedelta(days=rng.randint(0, 364), hours=rng.randint(0, 23))
+        rows.append({
+            "external_id": f"job-{i}",
+            "first_seen": fs.isoformat(timespec="seconds"),
+            "company": rng.choice(COMPANIES) if rng.random() > 0.02 else "",
+            "title": rng.choice(TITLES) if rng.random() > 0.02 else None,
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 4)),
+            "remote": rng.choice([True, False, None]),
+            "salary_min": rng.choice([None, 0.0, float(rng.randrange(60, 200) * 1000)]),
+            "salary_max": rng.choice([None, float(rng.randrange(120, 300) * 1000)]),
+        })
+    return rows
+
+
+def edge_rows(now: datetime):
+    today = now.isoformat(timespec="seconds")
+    return [
+        {"first_seen": today, "company": "A", "title": "T", "keywords": ["x"], "remote": True, "salary_min": 0, "salary_max": 0},
+        {"first_seen": now, "company": "A", "title": "", "keywords": None, "remote": False, "salary_min": 100, "salary_max": None},
+        {"first_seen": "", "company": None, "title": "T", "keywords": [], "remote": None, "salary_min": None, "salary_max": 300},
+        {"first_seen": None, "company": "B", "title": "U", "keywords": ["x", "y"], "remote": None, "salary_min": "50", "salary_max": "70"},
+        {"first_seen": (now + timedelta(days=3)).isoformat(), "company": "B", "title": "U", "keywords": ["y"]},
+        {"first_seen": (now - timedelta(days=30)).isoformat(), "company": "C", "title": "V", "keywords": ["z"], "remote": True},
+    ]
+
+
+def to_frame(rows):
+    return pd.DataFrame.from_records(rows, columns=DASHBOARD_COLUMNS)
+
+
+def typed_frame(df):
+    # the shape ColumnarArchive.read() hands back: real timestamps and floats
+    out = df.copy()
+    out["first_seen"] = pd.to_datetime(out["first_seen"], utc=True)
+    out["salary_min"] = out["salary_min"].astype(float)
+    out["salary_max"] = out["salary_max"].astype(float)
+    return out
+
+
+def check(label, expected, got):
+    if expected != got:
+        for k in expected:
+            if expected[k] != got.get(k):
+                print(f"[!] {label}: {k}: {expected[k]!r} != {got.get(k)!r}")
+        sys.exit(f"[!] {label}: vectorized dashboard differs")
+    print(f"[ok] parity: {label}")
+
+
+def timed(fn, *a, **kw):
+    t0 = time.perf_counter()
+    out = fn(*a, **kw)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    now = datetime.now(timezone.utc)
+    rng = random.Random(args.seed)
+
+    edges = edge_rows(now)
+    check("edge rows", compute_dashboard(edges, now=now), compute_dashboard_frame(to_frame(edges), now=now))
+
+    rows = synthetic_rows(args.rows, now, rng)
+    print(f"[i] {len(rows)} rows")
+    old, t_old = timed(compute_dashboard, rows, now=now)
+    df, t_build = timed(to_frame, rows)
+    new, t_new = timed(compute_dashboard_frame, df, now=now)
+    check("dict rows", old, new)
+
+    tdf = typed_frame(df)
+    typed, t_typed = timed(compute_dashboard_frame, tdf, now=now)
+    check("typed frame", old, typed)
+
+    print(f"[bench] compute_dashboard      : {t_old:7.3f}s")
+    print(f"[bench] compute_dashboard_frame: {t_new:7.3f}s  (+{t_build:.3f}s to build the frame from dicts)")
+    print(f"[bench] typed frame (columnar) : {t_typed:7.3f}s")
+    print(f"[bench] speedup                : {t_old / t_new:.1f}x object columns, {t_old / t_typed:.1f}x typed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Cold-start import time of the pipeline's entry points, with a budget.
+
+Usage:
+  python3 scripts/bench_import_time.py [--budget-ms 100] [--runs 5] [--top 8] [modules ...]
+
+Imports each module (default: pipeline, pipeline.__main__,
+pipeline.transform, pipeline.main, pipeline.serve) in a fresh interpreter
+under `python -X importtime`, --runs times, and takes the fastest run's
+cumulative time for that module, so interpreter startup and site are not
+counted. Prints the heaviest imports of that run. Exits non-zero when a
+module fails to import or takes longer than --budget-ms.
+"""
+from __future__ import annotations
+
+import argparse, os, subprocess, sys
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+
+MODULES = ["pipeline", "pipeline.__main__", "pipeline.transform", "pipeline.main", "pipeline.serve"]
+
+
+def import_times(module: str):
+    """[(name, cumulative us)] for `module` and everything it imported, from one cold import."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    entries = []  # (depth, name, cumulative us), children listed before their parent
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cum_us)))
+    for i in range(len(entries) - 1, -1, -1):
+        depth, name, cum = entries[i]
+        if name == module and depth == 1:
+            out = [(name, cum)]
+            for d, n, c in reversed(entries[:i]):
+                if d <= depth:
+                    break
+                out.append((n, c))
+            return out
+    raise RuntimeError(f"{module} not in -X importtime output")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("--budget-ms", type=float, default=100.0, help="Import budget per module (default 100).")
+    ap.add_argument("--runs", type=int, default=5, help="Cold imports per module; the fastest counts (default 5).")
+    ap.add_argument("--top", type=int, default=8, help="Heaviest imports to list per module (default 8).")
+    args = ap.parse_args()
+
+    failed = []
+    for module in args.modules:
+        try:
+            runs = [import_times(module) for _ in range(max(1, args.runs))]
+        except RuntimeError as e:
+            print(f"[!] {module}: {e}")
+            failed.append(module)
+            continue
+        best = min(runs, key=lambda t: t[0][1])
+        ms = best[0][1] / 1000
+        ok = ms <= args.budget_ms
+        print(f"[{'ok' if ok else '!'}] {module:<20} {ms:7.1f} ms  (budget {args.budget_ms:.0f} ms)")
+        # heaviest third-party/stdlib packages it pulled in, each listed once
+        seen = set()
+        for name, cum in sorted(best[1:], key=lambda e: -e[1]):
+            root = name.split(".")[0]
+            if root in seen or root == "pipeline":
+                continue
+            seen.add(root)
+            print(f"[i]   {name:<30} {cum / 1000:6.1f} ms")
+            if len(seen) >= args.top:
+                break
+        if not ok:
+            failed.append(module)
+    if failed:
+        sys.exit(f"[!] over budget or not importable: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: archive rows held as dicts vs. as records.JobColumns.
+
+Usage:
+  python3 scripts/bench_job_records.py [--rows 1000000] [--days 90] [--seed 7]
+
+Rows are encoded as archive lines and decoded one at a time, as
+iter_ndjson hands them out; bytes per job are measured with tracemalloc for
+a list of those dicts and for the same rows appended to a JobColumns.
+Every row must come back from JobColumns as it went in, and the dashboard
+computed from JobColumns.frame() must match compute_dashboard over the
+dicts; any mismatch fails the run.
+"""
+from __future__ import annotations
+
+import argparse, gc, random, sys, time, tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+from pipeline.codec import get_codec
+from pipeline.records import JobColumns
+from pipeline.stats import DASHBOARD_COLUMNS, compute_dashboard, compute_dashboard_frame
+
+TITLES = ["Solutions Engineer", "Sales Engineer", "Backend Engineer", "Data Engineer", "SRE",
+          "Customer Success Manager", "Product Manager", "Support Engineer", "ML Engineer", "Frontend Engineer"]
+KEYWORDS = ["python", "aws", "kubernetes", "sql", "react", "sales", "api", "security", "ml", "go", "rust", "remote"]
+LOCATIONS = ["Remote", "Berlin, DE", "New York, NY", "London, UK", "San Francisco, CA", None]
+
+
+def archive_lines(n: int, days: int, rng: random.Random, now: datetime):
+    """Encoded rows shaped like the archive: one first_seen per daily run."""
+    enc = get_codec().dumps
+    companies = [f"Company {i}" for i in range(2000)]
+    runs = [(now - timedelta(days=d)).replace(hour=6).isoformat(timespec="seconds") for d in range(days)]
+    for i in range(n):
+        run = rng.choice(runs)
+        posted = (datetime.fromisoformat(run) - timedelta(days=rng.randint(0, 30))).date().isoformat()
+        eid = f"gh-{i:08d}"
+        yield enc({
+            "external_id": eid,
+            "title": rng.choice(TITLES),
+            "company": rng.choice(companies),
+            "location": rng.choice(LOCATIONS),
+            "remote": rng.choice([True, False, None]),
+            "url": f"https://boards.example.com/jobs/{eid}",
+            "posted_at": f"{posted}T00:00:00+00:00",
+            "salary_min": rng.choice([None, float(rng.randrange(60, 200) * 1000)]),
+            "salary_max": rng.choice([None, float(rng.randrange(120, 300) * 1000)]),
+            "currency": rng.choice(["USD", "EUR", None]),
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 4)),
+            "source": rng.choice(["greenhouse", "lever", "ashby"]),
+            "first_seen": run,
+            "last_seen": run,
+            "canonical_id": eid if rng.random() > 0.05 else f"gh-{rng.randrange(max(i, 1)):08d}",
+        })
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = build()
+    elapsed = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, size, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=90, help="Daily runs the rows are spread over (default 90).")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    now = datetime.now(timezone.utc)
+    lines = list(archive_lines(args.rows, args.days, random.Random(args.seed), now))
+    loads = get_codec().loads
+    print(f"[i] {len(lines)} rows over {args.days} daily runs")
+
+    dicts, dict_bytes, t_dicts = measure(lambda: [loads(line) for line in lines])
+    cols, col_bytes, t_cols = measure(lambda: JobColumns(loads(line) for line in lines))
+
+    for i, row in enumerate(dicts):
+        if cols.row(i) != row:
+            sys.exit(f"[!] row {i} differs: {row!r} != {cols.row(i)!r}")
+    print("[ok] parity: every row reads back as it went in")
+    old = compute_dashboard(dicts, now=now)
+    if compute_dashboard_frame(cols.frame(DASHBOARD_COLUMNS), now=now) != old:
+        sys.exit("[!] dashboard from JobColumns.frame() differs")
+    print("[ok] parity: dashboard from JobColumns.frame() matches compute_dashboard")
+
+    n = len(lines)
+    print(f"[bench] list of dicts : {dict_bytes / n:7.0f} bytes/job  ({dict_bytes / 1e6:7.1f} MB, built in {t_dicts:.2f}s)")
+    print(f"[bench] JobColumns    : {col_bytes / n:7.0f} bytes/job  ({col_bytes / 1e6:7.1f} MB, built in {t_cols:.2f}s)")
+    print(f"[bench] saving        : {dict_bytes / col_bytes:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark archive reads and writes through pipeline.codec against the
+original line-by-line stdlib json loop.
+
+Usage:
+  python3 scripts/bench_ndjson_io.py [--mb 1024] [--dir /tmp] [--seed 7] [--keep]
+
+Checks round-trip parity first on a set of awkward rows (non-ASCII and
+control characters, naive and aware datetimes, dates, big integers, nested
+lists, non-string keys): every codec must decode every codec's output, and
+.gz/.zst files, to what the original json.dumps line decoded to. Any
+mismatch fails the run. Then writes a synthetic archive of --mb megabytes
+(plain, gzip and zstd when available) and reports MB/s of uncompressed
+NDJSON for each codec.
+"""
+from __future__ import annotations
+
+import argparse, json, os, random, shutil, sys, tempfile, time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+from pipeline import codec
+from pipeline.io_utils import iter_ndjson, write_ndjson
+
+COMPANIES = [f"Company {i}" for i in range(400)] + ["Zürich Labs", "東京テック", "Café ☕ Co"]
+TITLES = ["Solutions Engineer", "Sales Engineer", "Backend Engineer", "Data Engineer", "SRE",
+          "Customer Success Manager", "Product Manager", "Support Engineer", "ML Engineer", "Frontend Engineer"]
+KEYWORDS = ["python", "aws", "kubernetes", "sql", "react", "sales", "api", "security", "ml", "go", "rust", "remote"]
+WORDS = "we build reliable data platforms for teams that ship fast and care about customers".split()
+
+
+def old_default(o):
+    # the json_default the archive was written with before pipeline.codec
+    if isinstance(o, datetime):
+        if o.tzinfo is None:
+            o = o.replace(tzinfo=timezone.utc)
+        return o.astimezone(timezone.utc).isoformat(timespec="seconds")
+    if isinstance(o, date):
+        return o.isoformat()
+    return str(o)
+
+
+def old_line(row) -> str:
+    return json.dumps(row, ensure_ascii=False, default=old_default)
+
+
+def edge_rows():
+    now = datetime(2026, 10, 18, 9, 5, 7, 123456, tzinfo=timezone.utc)
+    return [
+        {"external_id": "a", "title": "Ingénieur — données 🚀", "company": "東京テック", "remote": True},
+        {"external_id": "b", "posted_at": now, "first_seen": now.replace(tzinfo=None), "day": now.date()},
+        {"external_id": "c", "posted_at": now.astimezone(timezone(timedelta(hours=-7))), "salary_min": 0.1 + 0.2},
+        {"external_id": "d", "text": "tab\there\nnewline \"quoted\" back\\slash \x00\x1f   \x7f"},
+        {"external_id": "e", "big": 2 ** 70, "neg": -2 ** 63, "float": 1e16, "tiny": 5e-324, "zero": -0.0},
+        {"external_id": "f", "keywords": [], "nested": {"a": [1, {"b": None}], "c": [True, False]}},
+        {"external_id": "g", 1: "int key", "none": None, "empty": ""},
+        {"external_id": "h", "salary_max": 250000.0, "currency": "USD", "keywords": ["python", "go"]},
+    ]
+
+
+def synthetic_row(i: int, rng: random.Random, now: datetime) -> dict:
+    fs = now - timedelta(days=rng.randint(0, 364), seconds=rng.randint(0, 86399))
+    return {
+        "external_id": f"job-{i}",
+        "canonical_id": f"job-{i - i % 7}",
+        "title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "location": rng.choice(["Remote", "Berlin, DE", "New York, NY", "São Paulo", None]),
+        "remote": rng.choice([True, False, None]),
+        "url": f"https://jobs.example.com/{i}?src=feed",
+        "posted_at": fs.isoformat(timespec="seconds"),
+        "salary_min": rng.choice([None, float(rng.randrange(60, 200) * 1000)]),
+        "salary_max": rng.choice([None, float(rng.randrange(120, 300) * 1000)]),
+        "currency": rng.choice(["USD", "EUR", None]),
+        "keywords": rng.sample(KEYWORDS, rng.randint(0, 5)),
+        "source": rng.choice(["greenhouse", "lever", "ashby"]),
+        "first_seen": fs.isoformat(timespec="seconds"),
+        "last_seen": now.isoformat(timespec="seconds"),
+        "text": " ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+    }
+
+
+def check_parity(tmp: Path):
+    rows = edge_rows()
+    expected = [json.loads(old_line(r)) for r in rows]
+    names = sorted(codec.CODECS)
+    for name in names:
+        c = codec.get_codec(name)
+        lines = [c.dumps(r) for r in rows]
+        for reader in names:
+            got = [codec.get_codec(reader).loads(line) for line in lines]
+            if got != expected:
+                for e, g in zip(expected, got):
+                    if e != g:
+                        print(f"[!] {name} -> {reader}: {e!r} != {g!r}")
+                sys.exit(f"[!] parity: rows written by {name} read back differently by {reader}")
+        print(f"[ok] parity: {name} round trip, read by {', '.join(names)}")
+    same = {codec.get_codec(n).dumps(r) for n in names for r in rows[:1]}
+    print(f"[i] codecs agree byte for byte on plain rows: {len(same) == 1}")
+
+    suffixes = [".ndjson", ".ndjson.gz"] + ([".ndjson.zst"] if codec.zstd_available() else [])
+    for name in names:
+        os.environ["PIPELINE_JSON_CODEC"] = name
+        for suffix in suffixes:
+            p = tmp / f"parity{suffix}"
+            write_ndjson(p, rows)
+            for reader in names:
+                os.environ["PIPELINE_JSON_CODEC"] = reader
+                if list(iter_ndjson(p)) != expected:
+                    sys.exit(f"[!] parity: {name} file {p.name} read back differently by {reader}")
+            os.environ["PIPELINE_JSON_CODEC"] = name
+        # lines written before pipeline.codec (spaced separators) still read the same
+        old = tmp / "old.ndjson"
+        old.write_text("".join(old_line(r) + "\n" for r in rows) + "\n  \n{broken\n[1]\n", encoding="utf-8")
+        if list(iter_ndjson(old)) != expected:
+            sys.exit(f"[!] parity: {name} reads the original archive format differently")
+    os.environ.pop("PIPELINE_JSON_CODEC", None)
+    print(f"[ok] parity: write_ndjson/iter_ndjson over {', '.join(suffixes)} and the original format")
+
+
+def old_write(path: Path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(old_line(r) + "\n")
+
+
+def old_read(path: Path) -> int:
+    n = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(row, dict):
+                n += 1
+    return n
+
+
+def rows_for(mb: int, seed: int):
+    """Synthetic rows until roughly `mb` megabytes of NDJSON."""
+    rng = random.Random(seed)
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    pool = [synthetic_row(i, rng, now) for i in range(20_000)]
+    avg = sum(len(old_line(r).encode("utf-8")) + 1 for r in pool) / len(pool)
+    for i in range(int(mb * 1_000_000 / avg)):
+        yield pool[i % len(pool)]
+
+
+def timed(fn, *a):
+    t0 = time.perf_counter()
+    out = fn(*a)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=int, default=1024, help="Size of the synthetic archive (default 1024).")
+    ap.add_argument("--dir", default=None, help="Where to write it (default: a temp dir).")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--keep", action="store_true", help="Keep the generated files.")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-ndjson-", dir=args.dir))
+    try:
+        check_parity(tmp)
+        print(f"[i] codecs: {', '.join(sorted(codec.CODECS))}; zstd: {'yes' if codec.zstd_available() else 'no'}")
+
+        base = tmp / "jobs.ndjson"
+        _, t = timed(old_write, base, rows_for(args.mb, args.seed))
+        mb = base.stat().st_size / 1e6
+        print(f"[i] synthetic archive: {mb:.0f} MB uncompressed")
+        print(f"[bench] write  original json loop     : {mb / t:7.1f} MB/s")
+        n_rows, t = timed(old_read, base)
+        print(f"[bench] read   original json loop     : {mb / t:7.1f} MB/s  ({n_rows} rows)")
+
+        for name in sorted(codec.CODECS, key=codec.PREFERENCE.index):
+            os.environ["PIPELINE_JSON_CODEC"] = name
+            out = tmp / f"{name}.ndjson"
+            _, t = timed(write_ndjson, out, rows_for(args.mb, args.seed))
+            print(f"[bench] write  {name:<8} plain          : {mb / t:7.1f} MB/s")
+            n, t = timed(lambda: sum(1 for _ in iter_ndjson(out)))
+            if n != n_rows:
+                sys.exit(f"[!] {name}: read {n} rows, expected {n_rows}")
+            print(f"[bench] read   {name:<8} plain          : {mb / t:7.1f} MB/s")
+            out.unlink()
+
+        name = codec.get_codec(next(n for n in codec.PREFERENCE if n in codec.CODECS)).name
+        os.environ["PIPELINE_JSON_CODEC"] = name
+        for suffix in [".gz"] + ([".zst"] if codec.zstd_available() else []):
+            out = tmp / f"jobs.ndjson{suffix}"
+            write_ndjson(out, iter_ndjson(base))
+            n, t = timed(lambda: sum(1 for _ in iter_ndjson(out)))
+            if n != n_rows:
+                sys.exit(f"[!] {suffix}: read {n} rows, expected {n_rows}")
+            ratio = mb / (out.stat().st_size / 1e6)
+            print(f"[bench] read   {name:<8} {suffix:<4} ({ratio:4.1f}x)  : {mb / t:7.1f} MB/s")
+    finally:
+        os.environ.pop("PIPELINE_JSON_CODEC", None)
+        if args.keep:
+            print(f"[i] kept {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark pipeline.dates against the original per-row dateutil parse of
+posted_at.
+
+Usage:
+  python3 scripts/bench_parse_posted_at.py [--rows 200000] [--distinct 0.2] [--seed 7]
+
+Builds a feed of --rows posted_at values from several sources, each with its
+own format (ISO with offsets, ISO Z, RFC 2822, US dates, "Oct 1, 2026",
+epoch seconds, a few free-form strings), of which --distinct are distinct
+values. Every value parsed by dates.parse() and dates.parse_column() must
+equal the original dateutil result, for the feed and for a set of awkward
+values; any mismatch fails the run. Reports per-row cost in microseconds,
+cold (empty LRU) and warm.
+"""
+from __future__ import annotations
+
+import argparse, random, sys, time, warnings
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from dateutil import parser as dateparse
+
+from pipeline import dates
+
+# source -> how that feed writes a timestamp
+FORMATS = {
+    "greenhouse": lambda d: d.astimezone(timezone(timedelta(hours=-4))).isoformat(),
+    "lever": lambda d: int(d.timestamp()),
+    "ashby": lambda d: d.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    "rss": lambda d: d.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+    "board-us": lambda d: d.strftime("%m/%d/%Y"),
+    "board-blog": lambda d: d.strftime("%b %d, %Y"),
+    "scraper": lambda d: d.strftime("%Y-%m-%d %H:%M:%S UTC"),
+    "misc": lambda d: d.strftime("%d %B %Y at %H:%M"),  # dateutil only
+}
+
+AWKWARD = ["", None, 0, 0.0, True, False, "garbage", "2026-13-01", "13/13/2026", "25/10/2026", "Feb 30, 2026",
+           [1], {"a": 1}, float("nan"), 10 ** 20, -5, 1.5e9 + 0.25, "1696156800", "2026-10", " 2026-10-01 ",
+           "2026-10-01T12:00:00.1234567Z", "20261001T1200", "2026-10-01T12", "Wed, 01 Oct 2026 12:00:00 -0000",
+           "Wed, 01 Oct 2026 12:00:00 EST", "wed, 01 oct 2026 12:00:00 gmt", "Sept 3, 2026", "Oct. 1, 2026",
+           "2026-10-01T09:00:00+0530", "Thursday, October 1, 2026"]
+
+
+def original(value):
+    # original pipeline.transform._parse_posted_at
+    if not value:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(float(value), tz=timezone.utc)
+        if isinstance(value, str):
+            return dateparse.parse(value).astimezone(timezone.utc)
+    except Exception:
+        return None
+    return None
+
+
+def feed(rows: int, distinct: float, rng: random.Random):
+    base = datetime(2026, 10, 18, 6, tzinfo=timezone.utc)
+    pool = []
+    for i in range(max(1, int(rows * distinct))):
+        src = rng.choice(list(FORMATS))
+        d = base - timedelta(seconds=rng.randrange(90 * 86400))
+        pool.append((src, FORMATS[src](d)))
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def as_column(values):
+    return pd.to_datetime(pd.Series(values, dtype=object), utc=True).astype("datetime64[us, UTC]")
+
+
+def same(a: pd.Series, b: pd.Series) -> bool:
+    return bool(((a == b) | (a.isna() & b.isna())).all())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--distinct", type=float, default=0.2, help="Share of distinct values (default 0.2).")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    warnings.simplefilter("ignore")  # dateutil warns on unknown zone names
+
+    rows = feed(args.rows, args.distinct, random.Random(args.seed))
+    n = len(rows)
+
+    for v in AWKWARD:
+        if dates.parse(v, "misc") != original(v):
+            sys.exit(f"[!] parity: {v!r}: {dates.parse(v, 'misc')!r} != {original(v)!r}")
+    if not same(dates.parse_column(AWKWARD), as_column([original(v) for v in AWKWARD])):
+        sys.exit("[!] parity: parse_column differs on the awkward values")
+    print(f"[ok] parity: {len(AWKWARD)} awkward values, parse() and parse_column()")
+
+    expected, t_old = timed(lambda: [original(v) for _, v in rows])
+    dates.cache_clear()
+    got, t_cold = timed(lambda: [dates.parse(v, src) for src, v in rows])
+    _, t_warm = timed(lambda: [dates.parse(v, src) for src, v in rows])
+    for (src, v), e, g in zip(rows, expected, got):
+        if e != g:
+            sys.exit(f"[!] parity: {src} {v!r}: {g!r} != {e!r}")
+    print(f"[ok] parity: {n} feed values, parse()")
+    print(f"[i] learned: {dates.learned()}")
+
+    by_source = {}
+    for i, (src, _) in enumerate(rows):
+        by_source.setdefault(src, []).append(i)
+    dates.cache_clear()
+    t_col = 0.0
+    for src, idx in by_source.items():
+        col, t = timed(lambda: dates.parse_column([rows[i][1] for i in idx], src))
+        t_col += t
+        if not same(col, as_column([expected[i] for i in idx])):
+            sys.exit(f"[!] parity: parse_column differs for {src}")
+    print("[ok] parity: parse_column() per source")
+
+    print(f"[i] {n} rows, {len(set(rows))} distinct values, {len(FORMATS)} sources")
+    print(f"[bench] original dateutil per row : {t_old / n * 1e6:7.2f} us/row")
+    print(f"[bench] dates.parse, cold LRU     : {t_cold / n * 1e6:7.2f} us/row  ({t_old / t_cold:.1f}x)")
+    print(f"[bench] dates.parse, warm LRU     : {t_warm / n * 1e6:7.2f} us/row  ({t_old / t_warm:.1f}x)")
+    print(f"[bench] dates.parse_column        : {t_col / n * 1e6:7.2f} us/row  ({t_old / t_col:.1f}x)")
+
+    # per-format cost with nothing memoized: every value distinct
+    print("[i] per format, all values distinct (no LRU help):")
+    rng = random.Random(args.seed)
+    base = datetime(2026, 10, 18, 6, tzinfo=timezone.utc)
+    for src, fmt in FORMATS.items():
+        vals = [fmt(base - timedelta(seconds=rng.randrange(10 ** 8))) for _ in range(20_000)]
+        _, t_o = timed(lambda: [original(v) for v in vals])
+        dates.cache_clear()
+        _, t_n = timed(lambda: [dates.parse(v, src) for v in vals])
+        print(f"[bench]   {src:<11}: dateutil {t_o / len(vals) * 1e6:6.2f} us  ->  dates {t_n / len(vals) * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
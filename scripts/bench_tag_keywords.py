@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword tagger against the original per-term regex loop.
+
+Usage:
+  python3 scripts/bench_tag_keywords.py [--rows 100000] [--rules keywords.yml]
+
+Uses keywords.yml when present, otherwise a synthetic rule set. Every output
+is compared against the original implementation; any mismatch fails the run.
+"""
+from __future__ import annotations
+
+import argparse, random, re, sys, time
+from pathlib import Path
+
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+from pipeline.keywords import KeywordTagger, load_rules
+
+VOCAB = """
+python golang go rust java javascript typescript node node.js react vue angular aws gcp azure kubernetes k8s docker
+terraform ansible linux sql postgres postgresql mysql redis kafka spark airflow dbt snowflake ml machine learning
+data science data engineering api apis rest graphql grpc c++ c# .net sales engineer solutions presales demo poc
+remote hybrid onsite senior staff principal lead manager customer success support security auth oauth sso saml
+""".split()
+
+FILLER = """
+we are looking for a teammate who loves building products with customers and partners across the globe while
+shipping quality work in a fast paced environment with great benefits and a friendly culture of ownership
+""".split()
+
+
+def legacy_tag(rules, text):
+    # original pipeline.transform.tag_keywords
+    if not text: return []
+    t = text.lower()
+    tags = []
+    for r in rules:
+        name = r.get("name"); terms = r.get("match") or []
+        if any(re.search(r"\b"+re.escape(term.lower())+r"\b", t) for term in terms):
+            tags.append(name)
+    seen=set(); out=[]
+    for k in tags:
+        if k not in seen:
+            seen.add(k); out.append(k)
+    return out
+
+
+def synthetic_rules(rng):
+    phrases = VOCAB + ["machine learning", "data science", "data engineering", "sales engineer", "solutions engineer",
+                       "customer success", "new york", "york city", "new york city"]
+    rules = []
+    for i in range(60):
+        rules.append({"name": f"rule_{i % 45}", "match": rng.sample(phrases, rng.randint(1, 6))})
+    return rules
+
+
+def synthetic_text(rng):
+    words = [rng.choice(FILLER) for _ in range(rng.randint(40, 160))]
+    for _ in range(rng.randint(0, 8)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(VOCAB).upper() if rng.random() < 0.2 else rng.choice(VOCAB))
+    return " ".join(words)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--rules", default=str(ROOT / "keywords.yml"))
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = load_rules(Path(args.rules)) or synthetic_rules(rng)
+    texts = [synthetic_text(rng) for _ in range(args.rows)]
+    n_terms = sum(len(r.get("match") or []) for r in rules)
+    print(f"[i] {len(rules)} rules / {n_terms} terms, {len(texts)} descriptions")
+
+    t0 = time.perf_counter()
+    tagger = KeywordTagger(rules)
+    t_compile = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = [tagger.tag(t) for t in texts]
+    t_new = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    old = [legacy_tag(rules, t) for t in texts]
+    t_old = time.perf_counter() - t0
+
+    bad = sum(1 for a, b in zip(old, new) if a != b)
+    print(f"[bench] legacy  : {t_old:8.2f}s  ({t_old / len(texts) * 1e6:7.1f} µs/row)")
+    print(f"[bench] compiled: {t_new:8.2f}s  ({t_new / len(texts) * 1e6:7.1f} µs/row)  compile {t_compile * 1e3:.1f} ms")
+    print(f"[bench] speedup : {t_old / t_new:.1f}x")
+    if bad:
+        sys.exit(f"[!] {bad} rows differ from the legacy tagger")
+    print("[ok] outputs identical")
+
+
+if __name__ == "__main__":
+    main()
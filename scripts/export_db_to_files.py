@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
-import os, sys, csv, json, datetime
+import os, sys, csv
+from pathlib import Path
 from notion_client import Client
 
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+sys.path.insert(0, str(_find_project_root(Path(__file__).resolve().parent)))
+
+# buffered, batched, codec-backed and atomic (pipeline.codec)
+from pipeline.io_utils import write_ndjson
+
 FIELDS = ["Title","Company","Role","URL","Source","Date","last_edited_time","id"]
 
 def env(k):
@@ -68,11 +83,6 @@ def write_csv(path, rows):
         for r in rows:
             w.writerow({k:r.get(k,"") for k in FIELDS})
 
-def write_ndjson(path, rows):
-    with open(path, "w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False)+"\n")
-
 def main():
     # Args: DB_ENV_KEY OUT_DIR BASENAME
     if len(sys.argv) < 4:
@@ -30,7 +30,8 @@ except Exception as e:
     sys.exit(f"[!] Cannot access NOTION_PAGE_ID={pid}: {e}")
 
 # === Example chart generation below ===
-# Expect a CSV merged/exported by your sync; fall back to Downloads batches if present.
+# Read the pipeline's columnar archive when present; otherwise expect a CSV
+# merged/exported by your sync, falling back to Downloads batches.
 csv_candidates = [
     REPO / "applypilot" / "outputs" / "filtered_jobs.csv",
     Path.home() / "Downloads" / "jobs_batch_1.csv",
@@ -38,7 +39,23 @@ csv_candidates = [
 ]
 
 df = None
-for p in csv_candidates:
+dash = None
+# Prefer the Parquet archive (pipeline.columnar): only the charted columns are decoded
+sys.path.insert(0, str(REPO))
+try:
+    from pipeline import columnar
+    if columnar.available() and (REPO / columnar.COLUMNAR_ROOT).is_dir():
+        from pipeline.stats import dashboard_from_columnar
+        archive = columnar.ColumnarArchive(REPO / columnar.COLUMNAR_ROOT)
+        tmp = archive.read(["source", "company", "location"])
+        if not tmp.empty:
+            df = tmp
+            dash = dashboard_from_columnar(archive)
+            print(f"[ok] Using data from {REPO / columnar.COLUMNAR_ROOT} ({len(tmp)} rows)")
+except Exception as e:
+    print(f"[warn] Columnar archive unavailable: {e}")
+
+for p in ([] if df is not None else csv_candidates):
     if p.exists() and p.stat().st_size > 0:
         try:
             tmp = pd.read_csv(p)
@@ -80,6 +97,16 @@ summary = {
     "unique_companies": df["company"].nunique() if "company" in df.columns else None,
     "unique_sources": df["source"].nunique() if "source" in df.columns else None,
 }
+if dash:
+    # same figures as the Notion dashboard, computed over the Parquet archive
+    summary.update({
+        "today_count": dash["today_count"],
+        "remote_count": dash["remote_count"],
+        "onsite_count": dash["onsite_count"],
+        "avg_salary": dash["avg_salary"],
+        "top_companies_7d": "; ".join(f"{k} ({v})" for k, v in dash["top_companies"]),
+        "top_keywords_7d": "; ".join(f"{k} ({v})" for k, v in dash["top_keywords"]),
+    })
 pd.DataFrame([summary]).to_csv(outdir / "summary.csv", index=False)
 print(f"[ok] Summary: {summary}")
 print("[done] Charts + summary ready under applypilot/outputs/")
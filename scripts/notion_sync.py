@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
-import os, csv, time, argparse, glob, re, sys
+import os, csv, argparse, glob, re, sys
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
-from notion_client import Client
 from slugify import slugify
 
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+ROOT = _find_project_root(Path(__file__).resolve().parent)
+sys.path.insert(0, str(ROOT))
+
+from pipeline.notion_api import RateLimitedNotion
+from pipeline.notion_index import NotionIndex, STATE_DIR, prop_hashes, changed_props
+
 load_dotenv()
 TOKEN   = os.getenv("NOTION_TOKEN")
 DB_ID   = os.getenv("NOTION_DATABASE_ID")
@@ -14,7 +29,7 @@ CSV_GLOBS = os.getenv("CSV_GLOBS","").split()
 if not TOKEN:
     sys.exit("[!] NOTION_TOKEN missing in .env")
 
-notion = Client(auth=TOKEN)
+notion = RateLimitedNotion(auth=TOKEN)
 
 SCHEMA = {
   "Title":     {"title": {}},
@@ -118,33 +133,52 @@ def find_existing(db_id, uid):
     res = q.get("results",[])
     return res[0]["id"] if res else None
 
-def upsert(db_id, row):
+def load_index(db_id):
+    # UID -> page_id plus hashes of what we last wrote; after the first full
+    # pull, only pages edited since the last sync are read
+    path = ROOT / STATE_DIR / f"notion_sync_{db_id.replace('-', '')}.json"
+    index = NotionIndex.load(db_id, path=path, id_prop="UID")
+    index.refresh(notion)
+    return index
+
+def upsert(db_id, row, index):
+    """Runs on the client's pool: reads `index` only. Returns (op, uid, page_id, hashes written)."""
     uid = choose_uid(row)
     props = build_props(row)
-    page = find_existing(db_id, uid)
+    hashes = prop_hashes(props)
+    delta = changed_props(props, hashes, index.hashes.get(uid))
+    if not delta:
+        return "skip", uid, None, None
+    page = index.get(uid) or find_existing(db_id, uid)
     if page:
-        notion.pages.update(page_id=page, properties=props)
-        return "update"
-    notion.pages.create(parent={"database_id": db_id}, properties=props)
-    return "create"
+        notion.pages.update(page_id=page, properties=delta)
+        return "update", uid, page, {k: hashes[k] for k in delta}
+    created = notion.pages.create(parent={"database_id": db_id}, properties=props)
+    return "create", uid, created["id"], hashes
 
-def sync_csv(db_id, path):
+def sync_csv(db_id, path, index):
     with open(path, newline="", encoding="utf-8") as f:
         rdr = csv.DictReader(f)
         rows = list(rdr)
     if not rows:
         print(f"[i] {path}: 0 rows, skipping")
         return
-    c=u=0
-    for r in rows:
+    # one write per UID; rows run concurrently through the shared rate limiter
+    by_uid = {choose_uid(r): r for r in rows}
+    futs = {notion.submit(upsert, db_id, r, index): r for r in by_uid.values()}
+    c=u=s=0
+    for fut, r in futs.items():
         try:
-            op = upsert(db_id, r)
+            op, uid, page, hashes = fut.result()
+            # the index is only written here, on the main thread
+            if page: index.written(uid, page, hashes)
             if op=="create": c+=1
-            else: u+=1
+            elif op=="update": u+=1
+            else: s+=1
         except Exception as e:
             print(f"[warn] {path}: {e} : {r.get('title','')[:80]}")
-        time.sleep(0.1)  # gentle rate limit
-    print(f"[ok] {path}: +{c} created, ~{u} updated")
+    index.save()
+    print(f"[ok] {path}: +{c} created, ~{u} updated, ={s} unchanged")
 
 def main():
     ap = argparse.ArgumentParser()
@@ -161,8 +195,11 @@ def main():
     if not targets:
         sys.exit("[!] No CSVs found. Set CSV_GLOBS in .env or pass --glob/--csv")
 
+    index = load_index(db_id)
     for p in sorted(set(targets)):
-        sync_csv(db_id, os.path.expanduser(p))
+        sync_csv(db_id, os.path.expanduser(p), index)
+    notion.close()
+    print(f"[info] Notion API: {notion.metrics_line()}")
 
 if __name__ == "__main__":
     main()
@@ -10,17 +10,30 @@ Requires:
   - `pip install notion-client python-dotenv`
 """
 
-import os, csv, argparse
-from notion_client import Client
+import os, sys, csv, argparse
+from pathlib import Path
 from dotenv import load_dotenv
 
+# --- Find project root (walk up until we see ./pipeline)
+def _find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(8):
+        if (cur / "pipeline").is_dir():
+            return cur
+        cur = cur.parent
+    return start.resolve()
+
+sys.path.insert(0, str(_find_project_root(Path(__file__).resolve().parent)))
+
+from pipeline.notion_api import RateLimitedNotion
+
 load_dotenv()
 token = os.getenv("NOTION_TOKEN")
 database_id = os.getenv("NOTION_DATABASE_ID")
 if not token or not database_id:
     raise SystemExit("[!] Please set NOTION_TOKEN and NOTION_DATABASE_ID in your .env file")
 
-client = Client(auth=token)
+client = RateLimitedNotion(auth=token)
 
 def push_row(row):
     props = {}
@@ -49,9 +62,17 @@ def main():
         rows = list(reader)
 
     print(f"[i] Pushing {len(rows)} rows into Notion…")
-    for r in rows:
-        push_row(r)
-    print("[ok] Done.")
+    futs = [client.submit(push_row, r) for r in rows]
+    failed = 0
+    for r, fut in zip(rows, futs):
+        try:
+            fut.result()
+        except Exception as e:
+            failed += 1
+            print(f"[warn] {e} : {r.get('title','')[:80]}")
+    client.close()
+    print(f"[info] Notion API: {client.metrics_line()}")
+    print(f"[ok] Done. ({len(rows) - failed} pushed, {failed} failed)")
 
 if __name__ == "__main__":
     main()
@@ -25,7 +25,10 @@ if env_path.exists():
     load_dotenv(dotenv_path=env_path)
 
 from notion_client import Client
-from pipeline.enrichment.vibe import enrich_vibe
+from pipeline.archive_reader import ArchiveReader
+from pipeline.enrichment.vibe import enrich_many
+from pipeline.notion_api import RateLimitedNotion
+from pipeline.notion_index import NotionIndex
 
 # ---- Notion helpers ----
 def _kv_text(content: str) -> dict:
@@ -67,6 +70,26 @@ def _query_today(n: Client, db_id: str, limit: int):
         results.extend(resp.get("results", []))
     return results[:limit]
 
+def _todo_from_archive(db_id: str, company: str, limit: int) -> list:
+    """
+    (page, job) pairs for today's archived jobs at `company`, from the
+    archive's company index and the local Notion page index: no database
+    query, and only the matching archive lines are decoded.
+    """
+    start_iso, end_iso = _today_range_utc()
+    index = NotionIndex.load(db_id)
+    todo = []
+    with ArchiveReader() as archive:
+        for row in archive.company(company, since=start_iso, until=end_iso):
+            page_id = index.get(str(row["external_id"]))
+            if not page_id:
+                continue  # not synced (yet), or folded into another posting
+            job = {"company": row.get("company") or "", "apply_url": row.get("url") or "", "notion_page_id": page_id}
+            todo.append(({"id": page_id}, job))
+            if len(todo) >= limit:
+                break
+    return todo
+
 def _pluck_company(props: dict) -> str:
     # Prefer "Company" (rich_text or title), else title
     v = props.get("Company", {})
@@ -118,14 +141,23 @@ def main():
     if not db_id:
         raise SystemExit("ERROR: NOTION_JOBS_DB_ID missing (set in .env).")
 
-    n = Client(auth=token)
-    pages = _query_today(n, db_id, args.limit * 2)  # overfetch a bit
-    if args.verbose:
-        print(f"[info] fetched {len(pages)} pages created today (limit request: {args.limit})")
+    n = RateLimitedNotion(auth=token)
 
     processed = 0
     updates = 0
     sample = None
+    pending = []
+
+    # --company goes through the archive index when this machine has one
+    todo = _todo_from_archive(db_id, args.company, args.limit) if args.company else []
+    if todo:
+        pages = []
+        if args.verbose:
+            print(f"[info] found {len(todo)} of today's jobs at '{args.company}' in the archive index")
+    else:
+        pages = _query_today(n, db_id, args.limit * 2)  # overfetch a bit
+        if args.verbose:
+            print(f"[info] fetched {len(pages)} pages created today (limit request: {args.limit})")
 
     for p in pages:
         props = p.get("properties", {})
@@ -133,10 +165,19 @@ def main():
         if args.company and args.company.lower() not in company.lower():
             continue
         apply_url = _pluck_apply_url(props)
-        job = {"company": company, "apply_url": apply_url, "notion_page_id": p["id"]}
+        todo.append((p, {"company": company, "apply_url": apply_url, "notion_page_id": p["id"]}))
+        if len(todo) >= args.limit:
+            break
 
-        vibe = enrich_vibe(job)
+    # crawl every company concurrently over one connection pool
+    vibes = enrich_many([job for _, job in todo])
+
+    for (p, job), vibe in zip(todo, vibes):
+        company = job["company"]
         processed += 1
+        if isinstance(vibe, Exception):
+            print(f"[err] enrichment failed for {company[:60]}…: {vibe}")
+            continue
 
         # Build partial update (only vibe fields)
         patch = {
@@ -152,17 +193,17 @@ def main():
             sample = sample or {"company": company, **vibe}
             continue
 
-        # Update Notion page
+        pending.append((company, p["id"], n.submit(n.pages.update, page_id=p["id"], **patch)))
+
+    for company, page_id, fut in pending:
         try:
-            n.pages.update(page_id=p["id"], **patch)
+            fut.result()
             updates += 1
             if args.verbose:
-                print(f"[ok] updated: {company[:60]}…  ({p['id']})")
+                print(f"[ok] updated: {company[:60]}…  ({page_id})")
         except Exception as e:
             print(f"[err] update failed for {company[:60]}…: {e}")
-
-        if updates >= args.limit:
-            break
+    n.close()
 
     if args.dry_run:
         if args.verbose:
@@ -170,6 +211,8 @@ def main():
         print(json.dumps(sample or {"note": "no sample found"}, indent=2)[:2000])
     else:
         print(f"[ok] processed={processed}  updated={updates}")
+        if args.verbose:
+            print(f"[info] Notion API: {n.metrics_line()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+from pipeline.io_utils import write_ndjson
+from pipeline.job_store import JobStore
+
+
+def _row(i, day):
+    ts = f"{day}T06:00:00+00:00"
+    return {"external_id": f"job-{i}", "canonical_id": f"job-{i}", "title": "Engineer", "company": f"Co {i % 7}",
+            "remote": i % 2 == 0, "salary_min": None, "salary_max": None, "keywords": [],
+            "first_seen": ts, "last_seen": ts}
+
+
+def test_bootstrap_leaves_outbox_empty(tmp_path):
+    days = ["2026-10-16", "2026-10-17", "2026-10-18"]
+    for n, day in enumerate(days):
+        write_ndjson(tmp_path / "archive" / day / "jobs.ndjson", [_row(n * 300 + i, day) for i in range(300)])
+    with JobStore(tmp_path / "jobs.sqlite") as store:
+        assert store.bootstrap(tmp_path / "archive") == 900
+        assert len(store) == 900
+        assert store.pending() == []
+
+        # rows merged after the load still queue their Notion write
+        store.upsert([_row(5000, days[-1])])
+        assert [e[1] for e in store.pending()] == ["job-5000"]
+
+
+def test_outbox_triggers_upgrade_existing_store(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    with JobStore(path) as store:
+        store.db.execute("PRAGMA user_version = 0")
+    with JobStore(path) as store:
+        assert store.db.execute("PRAGMA user_version").fetchone()[0] >= 1
+        store.upsert([_row(1, "2026-10-18")])
+        assert len(store.pending()) == 1
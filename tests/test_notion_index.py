@@ -0,0 +1,84 @@
+from pipeline.notion_index import NotionIndex
+from pipeline.notion_sync import upsert_jobs
+
+
+def _read_format(properties):
+    # what databases.query returns for a page we wrote
+    out = {}
+    for name, p in properties.items():
+        kind = next(iter(p))
+        if kind in ("title", "rich_text"):
+            content = p[kind][0]["text"]["content"]
+            value = [{"type": "text", "text": {"content": content, "link": None},
+                      "annotations": {"bold": False}, "plain_text": content, "href": None}] if content else []
+        elif kind == "select":
+            value = {"id": "x1", "name": p["select"]["name"], "color": "default"}
+        elif kind == "date":
+            value = {"start": p["date"]["start"].replace("+00:00", ".000+00:00"), "end": None, "time_zone": None}
+        elif kind == "number" and p["number"] is not None:
+            value = int(p["number"]) if float(p["number"]).is_integer() else p["number"]
+        else:
+            value = p[kind]
+        out[name] = {"id": name[:3], "type": kind, kind: value}
+    return out
+
+
+class _Pages:
+    def __init__(self):
+        self.store, self.writes = {}, []
+
+    def create(self, parent, properties):
+        pid = f"page-{len(self.store) + 1}"
+        self.store[pid] = {"id": pid, "properties": _read_format(properties)}
+        self.writes.append(("create", pid))
+        return {"id": pid}
+
+    def update(self, page_id, properties):
+        self.writes.append(("update", page_id))
+        return {"id": page_id}
+
+
+class _Databases:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def query(self, **kw):
+        return {"results": list(self.pages.store.values()), "has_more": False}
+
+
+class FakeNotion:
+    def __init__(self):
+        self.pages = _Pages()
+        self.databases = _Databases(self.pages)
+
+
+def _job(i):
+    return {"external_id": f"job-{i}", "company": "Acme", "title": "Engineer", "url": f"https://x/{i}",
+            "location": None if i % 2 else "Berlin", "remote": i % 3 == 0,
+            "posted_at": "2026-10-17T09:30:00+00:00", "salary_min": 90000.0 if i % 2 else None,
+            "salary_max": None, "currency": "EUR" if i % 2 else None,
+            "first_seen": "2026-10-18T06:00:00+00:00", "last_seen": "2026-10-18T06:00:00+00:00"}
+
+
+def test_rebuilt_index_does_not_rewrite_pages(tmp_path):
+    notion = FakeNotion()
+    jobs = [_job(i) for i in range(10)]
+    first = NotionIndex("db", path=tmp_path / "a.json")
+    assert upsert_jobs(notion, "db", jobs, index=first)["created"] == 10
+
+    # a fresh index (state lost): the first full pull hashes what it reads
+    notion.pages.writes.clear()
+    rebuilt = NotionIndex("db", path=tmp_path / "b.json")
+    counts = upsert_jobs(notion, "db", jobs, index=rebuilt)
+    assert counts == {"created": 0, "updated": 0, "unchanged": 10}
+    assert notion.pages.writes == []
+
+
+def test_replaced_page_loses_its_hashes(tmp_path):
+    notion = FakeNotion()
+    index = NotionIndex("db", path=tmp_path / "a.json")
+    upsert_jobs(notion, "db", [_job(1)], index=index)
+    index.set("job-1", "page-old")
+    index.refresh(notion, full=True)
+    assert index.get("job-1") == "page-1"
+    assert "job-1" not in index.hashes